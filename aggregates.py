@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+
+# Declarative aggregations computed in one grouped pass.
+#
+# A spec maps output names to aggregations:
+#   {'agg': 'count'}                                   number of rows
+#   {'agg': 'sum'|'mean', 'column': c, 'fill': v}      of column c, with
+#                                                      missing values as v
+# each optionally grouped with 'by': one of the grouping dimensions, and
+# ordered with 'order': 'key' (ascending key) or 'desc' (descending value, ties
+# in order of first appearance, like value_counts). Without an order groups
+# come in order of first appearance.
+#
+# The frame is grouped once by all dimensions together: every row gets a cell
+# code, and the row count and each needed column sum are accumulated per
+# occupied cell. Every aggregation is then a roll-up of those cells, so the
+# cost is one scan of the rows however many outputs the spec asks for. Rows
+# with a missing key are kept in their own cell, so they count towards the
+# totals but not towards the groups (as with groupby and value_counts).
+
+
+def _factorize(series):
+    # Codes in order of first appearance, with missing values coded as the
+    # last slot rather than -1 so they can be part of a cell code
+    codes, uniques = pd.factorize(series)
+    codes = np.where(codes < 0, len(uniques), codes)
+    return codes, pd.Index(uniques, name=series.name)
+
+
+def aggregate(df, spec, dims):
+    """Compute every aggregation of ``spec`` over ``df`` grouped by ``dims``.
+
+    Returns a dict with, for each output name, a Series indexed by the group
+    key (or a scalar for ungrouped aggregations).
+    """
+    for name, item in spec.items():
+        if item.get('by') is not None and item['by'] not in dims:
+            raise ValueError(f"Aggregate {name!r} groups by {item['by']!r}, which is not one of {dims}")
+
+    # One cell code per row over all dimensions
+    keys = [_factorize(df[dim]) for dim in dims]
+    shape = [len(uniques) + 1 for _, uniques in keys]
+    cell_codes = np.ravel_multi_index([codes for codes, _ in keys], shape) if dims else np.zeros(len(df), dtype='int64')
+    cells, inverse = np.unique(cell_codes, return_inverse=True)
+    inverse = inverse.ravel()
+
+    # Row count and column sums of every occupied cell
+    counts = np.bincount(inverse, minlength=len(cells))
+    sums = {}
+    for item in spec.values():
+        if item['agg'] in ('sum', 'mean'):
+            source = (item['column'], item.get('fill'))
+            if source not in sums:
+                values = df[item['column']]
+                if item.get('fill') is not None:
+                    values = values.fillna(item['fill'])
+                sums[source] = np.bincount(inverse, weights=values.to_numpy(dtype='float64'), minlength=len(cells))
+
+    cell_keys = dict(zip(dims, np.unravel_index(cells, shape))) if dims else {}
+
+    results = {}
+    for name, item in spec.items():
+        totals = counts if item['agg'] == 'count' else sums[(item['column'], item.get('fill'))]
+
+        if item.get('by') is None:
+            total = totals.sum()
+            if item['agg'] == 'count':
+                results[name] = int(total)
+            elif item['agg'] == 'sum':
+                results[name] = float(total)
+            else:
+                results[name] = float(total / counts.sum())
+            continue
+
+        uniques = keys[dims.index(item['by'])][1]
+        # Roll the cells up to this dimension, dropping the missing-key slot
+        group_totals = np.bincount(cell_keys[item['by']], weights=totals, minlength=len(uniques) + 1)[:-1]
+        if item['agg'] == 'count':
+            result = pd.Series(group_totals.astype('int64'), index=uniques)
+        elif item['agg'] == 'sum':
+            result = pd.Series(group_totals, index=uniques)
+        else:
+            group_counts = np.bincount(cell_keys[item['by']], weights=counts, minlength=len(uniques) + 1)[:-1]
+            result = pd.Series(group_totals / group_counts, index=uniques)
+
+        if item.get('order') == 'key':
+            result = result.sort_index()
+        elif item.get('order') == 'desc':
+            result = result.sort_values(ascending=False, kind='stable')
+        results[name] = result
+
+    return results
@@ -1,105 +1,64 @@
-import pandas as pd
 import json
 from pathlib import Path
+from ccc_store import read_table, write_table
+from keyword_rules import match_rules, rule_set, tag_column
 
-def main():
-    print("Loading filtered CSV data...")
-    # Load the filtered left-leaning protests data with Latin encoding
-    df = pd.read_csv('ccc-phase3-left.csv', encoding='latin1')
-    print(f"Loaded {len(df)} left-leaning events from CSV")
+def tag_categories():
+    # Tag categories and their keywords come from the 'tags' set of
+    # keyword_rules.json; 'Immigration exclude' is a veto, not a tag
+    return [tag for tag in rule_set('tags') if tag != 'Immigration exclude']
 
-    # Define tag categories and their keywords
-    tag_categories = {
-        'Gaza': ['gaza', 'palestinian', 'palestine', 'israel'],
-        'Abortion': ['abortion', 'reproductive rights', 'pro-choice', 'women\'s rights'],
-        'LGBT+': ['lgbt', 'lgbtq', 'gay', 'trans', 'transgender', 'queer'],
-        'Environment': ['climate', 'environment', 'green', 'fossil fuel', 'pollution'],
-        'Immigration': ['immigration', 'immigrant', ' ICE ', 'ICE,', 'ICE.', 'ICE:', 'border', 'migrant', 'refugee', 'asylum', 'deportation'],
-        'Trump': ['trump', 'president trump', 'donald trump'],
-        'Musk': ['musk', 'elon musk'],
-        'Gun Control': ['gun', 'firearm', 'nra', 'second amendment'],
-        'Healthcare': ['healthcare', 'health care', 'medicare', 'medicaid', 'universal health'],
-        'Workers': ['worker', 'labor', 'union', 'wage', 'strike', 'fair pay'],
-        'Racial Justice': ['racial justice', 'black lives', 'blm', 'police brutality', 'racism']
-    }
+def add_tags(df):
+    # Add a boolean tag_* column per tag category to a frame of events and
+    # return the tag categories. One scan of each distinct claims summary
+    # and target returns the matches of every rule set.
+    claim_matches = match_rules(df['claims_summary'])
+    target_matches = match_rules(df['targets'])['tags']
+    tag_matches = claim_matches['tags']
 
-    # Initialize tag columns
-    for tag in tag_categories.keys():
-        df[f'tag_{tag.lower().replace("+", "plus").replace(" ", "_")}'] = 0
+    tags = tag_categories()
+    for tag in tags:
+        hits = tag_matches[tag]
 
-    # Function to check if a claim contains any of the keywords for a tag
-    def check_tag_keywords(claim_text, keywords, tag_name=None):
-        if not isinstance(claim_text, str):
-            return 0
-        
-        claim_lower = claim_text.lower()
-        
-        # Special handling for Gaza tag - exclude generic anti-war claims
-        if tag_name == 'Gaza':
-            # Only include claims that specifically mention Israel, Gaza, or Palestine
-            # Exclude generic claims like "against all wars" or just "ceasefire" without context
-            if ('gaza' in claim_lower or 'palestinian' in claim_lower or 
-                'palestine' in claim_lower or 'israel' in claim_lower):
-                return 1
-            return 0
-        
-        # Special handling for Immigration tag
-        if tag_name == 'Immigration':
-            # Check for ICE with proper capitalization to avoid matching words ending in 'ice'
-            if ' ICE ' in claim_text or 'ICE,' in claim_text or 'ICE.' in claim_text or 'ICE:' in claim_text:
-                return 1
-        
-            # Check for other immigration-related keywords
-            immigration_keywords = ['immigration', 'immigrant', 'border', 'migrant', 'refugee', 'asylum', 'deportation']
-        
-            # Exclude specific phrases that should not be tagged as immigration
-            exclude_phrases = ['abolishing police', 'against racism']
-            if any(phrase in claim_lower for phrase in exclude_phrases):
-                return 0
-            
-            return 1 if any(keyword.lower() in claim_lower for keyword in immigration_keywords) else 0
-        
-        # Standard keyword check for other tags
-        return 1 if any(keyword.lower() in claim_lower for keyword in keywords) else 0
+        # Immigration is special-cased: ICE only counts with its
+        # capitalization (to avoid matching words ending in 'ice'), the other
+        # keywords are matched case-insensitively, and a few phrases veto the tag
+        if tag == 'Immigration':
+            hits = claim_matches['tags_case_sensitive', 'ICE'] | (hits & ~tag_matches['Immigration exclude'])
+
+        # Trump and Musk are also detected from the targets field
+        if tag in ('Trump', 'Musk'):
+            hits = hits | target_matches[tag]
+
+        df[tag_column(tag)] = hits.astype(bool)
+    return tags
 
-    # Function to check if a target contains any of the keywords for a tag
-    def check_target_keywords(target_text, keywords):
-        if not isinstance(target_text, str):
-            return 0
-        target_lower = target_text.lower()
-        return 1 if any(keyword.lower() in target_lower for keyword in keywords) else 0
+def main():
+    print("Loading filtered data...")
+    # Load the filtered left-leaning protests from the store
+    df = read_table('left')
+    print(f"Loaded {len(df)} left-leaning events from store/left")
 
     # Apply tag detection to claims and targets
     print("Analyzing protest tags...")
-    for tag, keywords in tag_categories.items():
-        tag_col = f'tag_{tag.lower().replace("+", "plus").replace(" ", "_")}'
-        
-        # Check claims
-        df[tag_col] = df['claims_summary'].apply(lambda x: check_tag_keywords(x, keywords, tag_name=tag))
-        
-        # For Trump and Musk, also check targets
-        if tag in ['Trump', 'Musk']:
-            df[tag_col] = df.apply(
-                lambda row: 1 if row[tag_col] == 1 or check_target_keywords(row['targets'], keywords) else 0, 
-                axis=1
-            )
+    tags = add_tags(df)
 
     # Calculate tag statistics - count events and participants
     tag_stats = {}
     
     # Fill missing size values with 11 (default size)
-    df['size_for_stats'] = df['size_mean'].fillna(11)
-    total_participants = df['size_for_stats'].sum()
+    size_for_stats = df['size_mean'].fillna(11)
+    total_participants = size_for_stats.sum()
     
-    for tag in tag_categories.keys():
-        tag_col = f'tag_{tag.lower().replace("+", "plus").replace(" ", "_")}'
+    for tag in tags:
+        tag_col = tag_column(tag)
         
         # Count unique events with this tag
         count = df[tag_col].sum()
         percentage = (count / len(df)) * 100
         
         # Count participants in events with this tag
-        participant_count = df[df[tag_col] == 1]['size_for_stats'].sum()
+        participant_count = size_for_stats[df[tag_col]].sum()
         percentage_by_participants = (participant_count / total_participants) * 100
         
         tag_stats[tag] = {
@@ -123,8 +82,8 @@ def main():
             'percentagesByParticipants': [stats['percentage_by_participants'] for _, stats in sorted_tags]
         }, f)
     
-    # Save tagged data back to CSV
-    df.to_csv('ccc-phase3-left-tagged.csv', index=False)
+    # Save tagged data to the store
+    write_table('tagged', df)
     
     # Print tag statistics
     print("\nProtest Tag Statistics:")
@@ -1,114 +1,243 @@
-import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-from datetime import datetime
-import json
-import re
+import argparse
 import os
-
-# Set up output directory
-os.makedirs('reports', exist_ok=True)
-
-# Load the CSV data
-print("Loading data...")
-df = pd.read_csv("ccc-phase3-public.csv", dtype=str, encoding='latin')
-
-# Convert date to datetime
-df['date'] = pd.to_datetime(df['date'])
-
-# Function to check if Trump is mentioned in targets
-def mentions_trump(target_str):
-    if pd.isna(target_str):
-        return False
-    
-    # Common ways Trump is mentioned in the data
-    trump_patterns = [
-        r'trump', r'donald\s+trump', r'president\s+trump', 
-        r'former\s+president\s+trump', r'45', r'djt'
+import re
+import matplotlib
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ccc_data import load_events
+from claims import load_claims
+
+# Targets to report on. 'patterns' are the ways each target is mentioned in
+# the targets field, as regexes over the lowercased text; every target is
+# matched in the same pass over the data, so adding a target doesn't add
+# another scan. 'label' names its protests in the report ("Anti-Trump
+# protests") and 'slug' its file names. An optional 'description' and
+# 'conclusion' replace the generic wording of the report.
+TARGETS = {
+    'Trump': {
+        'patterns': [r'trump', r'donald\s+trump', r'president\s+trump', r'former\s+president\s+trump', r'45', r'djt'],
+        'label': 'Anti-Trump',
+        'slug': 'anti_trump',
+        'description': 'former President Donald Trump',
+        'conclusion': (
+            "Anti-Trump protests in early 2025 demonstrate continued political polarization following the 2024 election. "
+            "These events were characterized by concerns about democratic institutions, women's rights, and other progressive causes.\n\n"
+            "The geographic distribution shows concentration in traditionally Democratic-leaning states, particularly on the coasts. "
+            "The temporal pattern reveals spikes around key political events and weekends when more people are available to participate.\n"
+        ),
+    },
+    'Musk': {
+        'patterns': [r'musk', r'elon\s+musk', r'doge'],
+        'label': 'Anti-Musk',
+        'slug': 'anti_musk',
+        'description': 'Elon Musk and the Department of Government Efficiency (DOGE)',
+    },
+    'Tesla': {
+        'patterns': [r'tesla'],
+        'label': 'Tesla',
+        'slug': 'tesla',
+    },
+    'ICE': {
+        'patterns': [r'ice', r'immigration\s+and\s+customs\s+enforcement'],
+        'label': 'Anti-ICE',
+        'slug': 'anti_ice',
+        'description': 'U.S. Immigration and Customs Enforcement (ICE)',
+    },
+    'Republicans': {
+        'patterns': [r'republicans?', r'gop'],
+        'label': 'Anti-Republican',
+        'slug': 'anti_republican',
+        'description': 'Republican officials and the Republican Party',
+    },
+    'Congress': {
+        'patterns': [r'congress', r'u\.?s\.?\s+senate', r'house\s+of\s+representatives'],
+        'label': 'Congress',
+        'slug': 'congress',
+        'description': 'members of Congress',
+    },
+}
+
+TARGET_PATTERNS = {target: spec['patterns'] for target, spec in TARGETS.items()}
+
+def compile_targets(target_patterns):
+    # One alternation with a named group per target, matched on word
+    # boundaries (so '45' doesn't match inside '1945')
+    groups = [f"(?P<t{i}>{'|'.join(patterns)})" for i, patterns in enumerate(target_patterns.values())]
+    return re.compile(r'\b(?:' + '|'.join(groups) + r')\b')
+
+def match_targets(targets, target_patterns=TARGET_PATTERNS):
+    # Boolean frame with a column per target of the events mentioning it.
+    # Each distinct targets text is lowercased and scanned once.
+    codes, uniques = pd.factorize(targets)
+    found = (pd.Series(uniques, dtype=object).str.lower()
+             .str.extractall(compile_targets(target_patterns))
+             .notna().groupby(level=0).any())
+
+    # One extra all-False row at the end, which code -1 (missing) selects
+    table = np.zeros((len(uniques) + 1, len(target_patterns)), dtype=bool)
+    table[found.index] = found.to_numpy()
+    return pd.DataFrame(table[codes], index=targets.index, columns=list(target_patterns))
+
+def target_summaries(df, target_matches, claims, claim_dictionary):
+    # Daily counts, top states and top claims of every target, from one
+    # grouped pass over the (target, event) pairs. The pairs are in
+    # target-major order, so each target's events form one contiguous run.
+    target_pos, event_pos = np.nonzero(target_matches.to_numpy().T)
+    pairs = pd.DataFrame({
+        'target': target_matches.columns[target_pos],
+        'date': df['date'].dt.date.to_numpy()[event_pos],
+        'state': df['state'].astype(object).to_numpy()[event_pos],
+    })
+    daily = pairs.groupby(['target', 'date']).size()
+    bounds = np.searchsorted(target_pos, np.arange(len(target_matches.columns) + 1))
+
+    # Claim mentions of the matched events, one column per target
+    mentions = claims[claims['claim_id'] >= 0]
+    mention_hits = target_matches.to_numpy()[mentions['event_id'].to_numpy()]
+
+    summaries = {}
+    for i, target in enumerate(target_matches.columns):
+        if target not in daily.index.get_level_values(0):
+            summaries[target] = None
+            continue
+        daily_counts = daily.xs(target).rename_axis('date').reset_index(name='count')
+        top_claim_counts = mentions['claim_id'][mention_hits[:, i]].value_counts().head(10)
+        summaries[target] = {
+            'events': int(target_matches[target].sum()),
+            'daily_counts': daily_counts,
+            'top_states': pairs['state'].iloc[bounds[i]:bounds[i + 1]].value_counts().head(10),
+            'top_claims': pd.Series(top_claim_counts.to_numpy(), index=claim_dictionary['claim'][top_claim_counts.index]),
+        }
+    return summaries
+
+def render_report(target, spec, summary):
+    # Markdown report of one target, built as a list of lines joined once
+    label = spec['label']
+    # Lowercased mid-sentence: "the number of anti-Trump protests"
+    inline_label = label.replace('Anti-', 'anti-')
+    daily_counts = summary['daily_counts']
+    peak = daily_counts.loc[daily_counts['count'].idxmax()]
+    description = spec.get('description', target)
+
+    lines = [
+        f"# Analysis of {label} Protests in 2025",
+        "",
+        "## Overview",
+        "",
+        f"This report analyzes protest events targeting {description} during the first months of 2025. "
+        "The data comes from the Crowd Counting Consortium's Phase 3 public dataset.",
+        "",
+        "## Key Findings",
+        "",
+        f"- **Total Events**: {summary['events']} protests targeting {target} were identified",
+        f"- **Time Period**: Events occurred from {daily_counts['date'].min()} to {daily_counts['date'].max()}",
+        f"- **Peak Day**: The highest number of {inline_label} protests ({peak['count']}) occurred on {peak['date']}",
+        "",
+        "## Common Claims and Themes",
+        "",
+        f"The most common claims and themes in {inline_label} protests were:",
+        "",
     ]
-    
-    # Case insensitive search
-    for pattern in trump_patterns:
-        if re.search(pattern, str(target_str).lower()):
-            return True
-    return False
-
-# Filter for events targeting Trump
-trump_df = df[df['targets'].apply(mentions_trump)]
-print(f"Found {len(trump_df)} events targeting Trump")
-
-# Group by date and count
-daily_counts = trump_df.groupby(trump_df['date'].dt.date).size().reset_index()
-daily_counts.columns = ['date', 'count']
-daily_counts = daily_counts.sort_values('date')
-
-# Create the markdown report
-report = f"""# Analysis of Anti-Trump Protests in 2025
-
-## Overview
-
-This report analyzes protest events targeting former President Donald Trump during the first months of 2025. The data comes from the Crowd Counting Consortium's Phase 3 public dataset.
-
-## Key Findings
-
-- **Total Events**: {len(trump_df)} protests targeting Trump were identified
-- **Time Period**: Events occurred from {daily_counts['date'].min()} to {daily_counts['date'].max()}
-- **Peak Day**: The highest number of anti-Trump protests ({daily_counts['count'].max()}) occurred on {daily_counts.loc[daily_counts['count'].idxmax(), 'date']}
-
-## Common Claims and Themes
-"""
-
-# Get the most common claims
-claims = trump_df['claims_summary'].dropna().str.split(';').explode().str.strip()
-top_claims = claims.value_counts().head(10)
-
-report += "\nThe most common claims and themes in anti-Trump protests were:\n\n"
-for claim_text, claim_count in top_claims.items():
-    report += f"- {claim_text} ({claim_count} mentions)\n"
-
-report += """
-## Geographic Distribution
-
-"""
-
-# Get top states
-top_states = trump_df['state'].value_counts().head(10)
-report += "**Top States for Anti-Trump Protests:**\n\n"
-for state, count in top_states.items():
-    report += f"- {state}: {count} events\n"
-
-report += """
-## Daily Counts of Anti-Trump Protests
-
-The following table shows the number of anti-Trump protests by day:
-
-| Date | Number of Protests |
-|------|-------------------|
-"""
-
-# Add the daily counts to the table
-for _, row in daily_counts.iterrows():
-    report += f"| {row['date']} | {row['count']} |\n"
-
-report += "## Conclusion\n\n"
-report += "Anti-Trump protests in early 2025 demonstrate continued political polarization following the 2024 election. "
-report += "These events were characterized by concerns about democratic institutions, women's rights, and other progressive causes.\n\n"
-report += "The geographic distribution shows concentration in traditionally Democratic-leaning states, particularly on the coasts. "
-report += "The temporal pattern reveals spikes around key political events and weekends when more people are available to participate.\n"
-
-# Save the report
-with open('reports/anti_trump_protests.md', 'w') as f:
-    f.write(report)
-
-print(f"Report saved to reports/anti_trump_protests.md")
-
-# Create a visualization
-plt.figure(figsize=(12, 6))
-plt.bar(daily_counts['date'].astype(str), daily_counts['count'])
-plt.xticks(rotation=45)
-plt.title('Anti-Trump Protests by Day (2025)')
-plt.xlabel('Date')
-plt.ylabel('Number of Protests')
-plt.tight_layout()
-plt.savefig('reports/anti_trump_timeline.png')
-print("Visualization saved to reports/anti_trump_timeline.png")
+    lines += [f"- {claim_text} ({claim_count} mentions)" for claim_text, claim_count in summary['top_claims'].items()]
+    lines += [
+        "",
+        "## Geographic Distribution",
+        "",
+        f"**Top States for {label} Protests:**",
+        "",
+    ]
+    lines += [f"- {state}: {count} events" for state, count in summary['top_states'].items()]
+    lines += [
+        "",
+        f"## Daily Counts of {label} Protests",
+        "",
+        f"The following table shows the number of {inline_label} protests by day:",
+        "",
+        "| Date | Number of Protests |",
+        "|------|-------------------|",
+    ]
+    lines += [f"| {date} | {count} |" for date, count in zip(daily_counts['date'], daily_counts['count'])]
+
+    top_states = summary['top_states']
+    conclusion = spec.get('conclusion') or (
+        f"{label} protests peaked on {peak['date']} with {peak['count']} events"
+        + (f", and {top_states.index[0]} saw the most of them ({top_states.iloc[0]} events)" if len(top_states) else "")
+        + ".\n"
+    )
+    lines += ["## Conclusion", "", conclusion]
+    return '\n'.join(lines)
+
+def render_timeline(path, title, dates, counts):
+    # Runs in a worker process; the Agg backend needs no display
+    fig = plt.figure(figsize=(12, 6))
+    plt.bar(dates, counts)
+    plt.xticks(rotation=45)
+    plt.title(title)
+    plt.xlabel('Date')
+    plt.ylabel('Number of Protests')
+    plt.tight_layout()
+    fig.savefig(path)
+    plt.close(fig)
+    return path
+
+def main():
+    parser = argparse.ArgumentParser(description="Write protest reports for targets of interest.")
+    parser.add_argument('targets', nargs='*',
+                        help=f"targets to report on (default: Trump). Available: {', '.join(TARGETS)}")
+    parser.add_argument('--batch', action='store_true', help="report on every target")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(),
+                        help="number of processes used to render figures")
+    args = parser.parse_args()
+
+    unknown = [target for target in args.targets if target not in TARGETS]
+    if unknown:
+        parser.error(f"unknown target(s): {', '.join(unknown)}")
+    selected = list(TARGETS) if args.batch else (args.targets or ['Trump'])
+
+    # Set up output directory
+    os.makedirs('reports', exist_ok=True)
+
+    # Load the data once through the shared cached loader
+    print("Loading data...")
+    df = load_events()
+    claims, claim_dictionary = load_claims()
+
+    # Events of every target, matched in one pass
+    target_matches = match_targets(df['targets'], {target: TARGETS[target]['patterns'] for target in selected})
+    summaries = target_summaries(df, target_matches, claims, claim_dictionary)
+
+    figures = []
+    for target in selected:
+        spec, summary = TARGETS[target], summaries[target]
+        if summary is None:
+            print(f"Found no events targeting {target}, skipping")
+            continue
+        print(f"Found {summary['events']} events targeting {target}")
+
+        report_file = f"reports/{spec['slug']}_protests.md"
+        with open(report_file, 'w') as f:
+            f.write(render_report(target, spec, summary))
+        print(f"Report saved to {report_file}")
+
+        daily_counts = summary['daily_counts']
+        figures.append((
+            f"reports/{spec['slug']}_timeline.png",
+            f"{spec['label']} Protests by Day (2025)",
+            daily_counts['date'].astype(str).tolist(),
+            daily_counts['count'].tolist(),
+        ))
+
+    # Figures dominate the run time, so they're drawn in parallel
+    if len(figures) > 1 and args.workers > 1:
+        with ProcessPoolExecutor(max_workers=min(args.workers, len(figures))) as pool:
+            paths = list(pool.map(render_timeline, *zip(*figures)))
+    else:
+        paths = [render_timeline(*figure) for figure in figures]
+    for path in paths:
+        print(f"Visualization saved to {path}")
+
+if __name__ == "__main__":
+    main()
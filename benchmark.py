@@ -0,0 +1,157 @@
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+import pandas as pd
+from synthetic_data import write_dataset
+
+# Benchmarks of the pipeline stages on synthetic datasets.
+#
+# For each size a synthetic dataset (see synthetic_data.py) is written as
+# ccc-phase3-public.csv into a scratch copy of the scripts, and the stages run
+# there in build order, each in its own process, starting from an empty
+# .cache/ like a fresh build. Wall time and peak resident memory of every
+# stage are saved as JSON in benchmarks/, one file per commit, so two commits
+# can be compared with --compare.
+
+BENCH_DIR = Path('.cache') / 'bench'
+RESULTS_DIR = Path('benchmarks')
+
+SIZES = [10_000, 100_000, 1_000_000, 10_000_000]
+
+# Stages in build order; later stages read what earlier ones write
+STAGES = [
+    {'name': 'filter_left_protests', 'script': 'filter_left_protests.py'},
+    {'name': 'analyze_protest_tags', 'script': 'analyze_protest_tags.py'},
+    {'name': 'process_data', 'script': 'process_data.py'},
+    {'name': 'extract_claims_with_tags', 'script': 'extract_claims_with_tags.py'},
+    {'name': 'extract_issue_summary', 'script': 'extract_issue_summary.py'},
+    {'name': 'build_cube', 'script': 'build_cube.py'},
+    {'name': 'publish', 'script': 'publish.py'},
+    {'name': 'data-preparation', 'script': 'data-preparation.py'},
+    {'name': 'ccc-to-json', 'script': 'ccc-to-json.py'},
+]
+
+# Files the stages need besides the scripts and shared modules
+SUPPORT_FILES = ['keyword_rules.json', 'ccc-phase3-public_details.json']
+
+
+def size_label(rows):
+    for suffix, unit in (('M', 1_000_000), ('k', 1_000)):
+        if rows >= unit and rows % unit == 0:
+            return f'{rows // unit}{suffix}'
+    return str(rows)
+
+
+def prepare(workdir, rows, seed):
+    # Scratch copy of the scripts with a synthetic dataset
+    shutil.rmtree(workdir, ignore_errors=True)
+    workdir.mkdir(parents=True)
+    for path in list(Path('.').glob('*.py')) + [Path(name) for name in SUPPORT_FILES]:
+        shutil.copy(path, workdir / path.name)
+    write_dataset(workdir / 'ccc-phase3-public.csv', rows, seed)
+
+
+def run_stage(stage, workdir):
+    # Run one stage and return its wall time and the peak RSS of its
+    # process (worker processes it starts are not included)
+    start = time.perf_counter()
+    with open(workdir / f"{stage['name']}.log", 'w') as log:
+        process = subprocess.Popen([sys.executable, stage['script']], cwd=workdir, stdout=log, stderr=subprocess.STDOUT)
+        _, status, usage = os.wait4(process.pid, 0)
+        process.returncode = os.waitstatus_to_exitcode(status)
+    elapsed = time.perf_counter() - start
+    # ru_maxrss is in kilobytes on Linux and in bytes on macOS
+    peak = usage.ru_maxrss * (1 if sys.platform == 'darwin' else 1024)
+    return {
+        'stage': stage['name'],
+        'seconds': round(elapsed, 3),
+        'peak_rss_mb': round(peak / 2**20, 1),
+        'returncode': process.returncode,
+    }
+
+
+def current_commit():
+    result = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True)
+    return result.stdout.strip() or 'unknown'
+
+
+def compare(results, baseline_path):
+    # Time and memory of each stage relative to a baseline results file
+    with open(baseline_path, 'r') as f:
+        baseline = json.load(f)
+    key = ['rows', 'stage']
+    merged = pd.DataFrame(results['results']).merge(
+        pd.DataFrame(baseline['results']), on=key, suffixes=('', '_base'))
+    merged['time_ratio'] = (merged['seconds'] / merged['seconds_base']).round(2)
+    merged['rss_ratio'] = (merged['peak_rss_mb'] / merged['peak_rss_mb_base']).round(2)
+    print(f"\nCompared with {baseline['commit']} ({baseline_path}):")
+    print(merged[key + ['seconds_base', 'seconds', 'time_ratio', 'peak_rss_mb_base', 'peak_rss_mb', 'rss_ratio']].to_string(index=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the pipeline stages on synthetic CCC-shaped datasets.")
+    parser.add_argument('--sizes', type=int, nargs='+', default=SIZES, help="dataset sizes in rows")
+    parser.add_argument('--stages', nargs='+', choices=[stage['name'] for stage in STAGES],
+                        help="stages to time (default: all; stages they depend on still run)")
+    parser.add_argument('--seed', type=int, default=0, help="random seed of the synthetic data")
+    parser.add_argument('--output', help="results file (default: benchmarks/<commit>.json)")
+    parser.add_argument('--compare', help="results file of another commit to compare with")
+    args = parser.parse_args()
+
+    commit = current_commit()
+    results = {
+        'commit': commit,
+        'date': datetime.now(timezone.utc).isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'pandas': pd.__version__,
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'results': [],
+    }
+
+    # Every stage up to the last one asked for runs, as each needs the
+    # outputs of the ones before it
+    names = [stage['name'] for stage in STAGES]
+    last = max(names.index(name) for name in args.stages) if args.stages else len(STAGES) - 1
+    timed = set(args.stages or names)
+
+    for rows in args.sizes:
+        workdir = BENCH_DIR / size_label(rows)
+        print(f"Generating {size_label(rows)} synthetic events...")
+        prepare(workdir, rows, args.seed)
+
+        failed = False
+        for stage in STAGES[:last + 1]:
+            result = run_stage(stage, workdir)
+            if result['returncode'] != 0:
+                print(f"[{size_label(rows)}] {stage['name']} failed; see {workdir / (stage['name'] + '.log')}")
+            else:
+                print(f"[{size_label(rows)}] {stage['name']}: {result['seconds']:.2f}s, {result['peak_rss_mb']:.0f} MB")
+            if stage['name'] in timed:
+                results['results'].append(dict(result, rows=rows))
+            if result['returncode'] != 0:
+                failed = True
+                break
+
+        # Keep the scratch copy of a failed run for its logs
+        if not failed:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    output = Path(args.output) if args.output else RESULTS_DIR / f'{commit}.json'
+    with open(output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"Saved benchmark results to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+
+if __name__ == "__main__":
+    main()
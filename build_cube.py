@@ -0,0 +1,122 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from ccc_store import read_table, table_columns, table_exists
+from columnar import ColumnBuffers, smallest_int, write_columnar
+from extract_issue_summary import drop_trump_tag, issue_mentions, issue_name
+from tactics import BITS, COLUMNS as TACTIC_COLUMNS, DASHBOARD_TACTICS, TACTICS, tactic_bitmask
+
+# Aggregate cube of the tagged events for the dashboard.
+#
+# Event counts and participant sums over every combination of date, state,
+# issue tag and tactics, stored densely in a columnar file (see columnar.py)
+# so the browser can answer any cross-cut ("Immigration events in Texas by
+# day") by summing typed arrays instead of fetching events. Missing size
+# values count as 11 participants, as in the other dashboard files.
+#
+# Dimensions, in row-major order (date varies slowest):
+#   date     every day from the first to the last event date
+#   state    the states with events
+#   tag      'All' (every event once), then each issue tag as named in
+#            protest_issues_summary.json. An event counts under each of its
+#            tags, so tags must not be summed together; 'All' is the total.
+#   tactics  the tactic bitmasks that occur (see tactics.py). Every event
+#            has exactly one mask, so masks can be summed; an event uses a
+#            tactic when its mask has that tactic's bit. The tactics'
+#            labels and the ones shown in the dashboard's tactics chart are
+#            stored along with the bits.
+# Events without a date or state fall under a trailing null member.
+
+CUBE_FILE = Path('data/cube.bin')
+ALL_TAGS = 'All'
+DEFAULT_SIZE = 11
+
+
+def dimension_codes(values, members):
+    # Position of each value among the members; missing values (and any
+    # value not among them) get the trailing null member
+    codes = pd.Index(members).get_indexer(values)
+    if (codes < 0).any():
+        members = members + [None]
+        codes[codes < 0] = len(members) - 1
+    return codes, members
+
+
+def event_tags(df):
+    # Boolean matrix of each event's tags, with the Trump tag dropped as in
+    # the issues summary, and the tags' display names
+    tag_columns = [col for col in df.columns if col.startswith('tag_')]
+    tags = df[tag_columns] == 1
+    if 'tag_trump' in tag_columns:
+        drop = drop_trump_tag(tags.rename(columns={'tag_trump': 'Trump'}), issue_mentions(df)['Trump'])
+        tags.loc[drop, 'tag_trump'] = False
+    return tags.to_numpy(), [issue_name(tag_col) for tag_col in tag_columns]
+
+
+def build_cube(df):
+    """Return the dimensions and the flat event and participant arrays of the cube."""
+    dates = df['date'].dropna()
+    days = pd.date_range(dates.min(), dates.max()).strftime('%Y-%m-%d').tolist() if len(dates) else []
+    date_codes, days = dimension_codes(df['date'].dt.strftime('%Y-%m-%d'), days)
+    states = df['state'].astype(object)
+    state_codes, states = dimension_codes(states, sorted(states.dropna().unique()))
+
+    masks = tactic_bitmask(df).to_numpy()
+    mask_members = sorted(int(mask) for mask in np.unique(masks))
+    mask_codes, _ = dimension_codes(masks, mask_members)
+
+    tags, tag_names = event_tags(df)
+    tags = np.column_stack([np.ones(len(df), dtype=bool), tags])
+    tag_names = [ALL_TAGS] + tag_names
+
+    # One (event, tag) pair per tag of each event, 'All' included
+    event_pos, tag_pos = np.nonzero(tags)
+    shape = (len(days), len(states), len(tag_names), len(mask_members))
+    cells = np.ravel_multi_index((date_codes[event_pos], state_codes[event_pos], tag_pos, mask_codes[event_pos]), shape)
+    size = df['size_mean'].fillna(DEFAULT_SIZE).to_numpy()
+
+    events = np.bincount(cells, minlength=int(np.prod(shape)))
+    participants = np.bincount(cells, weights=size[event_pos], minlength=int(np.prod(shape)))
+
+    dimensions = [
+        {'name': 'date', 'values': days},
+        {'name': 'state', 'values': states},
+        {'name': 'tag', 'values': tag_names},
+        {'name': 'tactics', 'values': mask_members, 'bits': BITS,
+         'labels': {tactic['name']: tactic['label'] for tactic in TACTICS}, 'shown': DASHBOARD_TACTICS},
+    ]
+    return dimensions, events, participants
+
+
+def write_cube(dimensions, events, participants, path=CUBE_FILE):
+    buffers = ColumnBuffers()
+    columns = [
+        {'name': 'events', 'type': 'numeric',
+         'data': buffers.add(events.astype(smallest_int(events, signed=False)))},
+        # Single precision is plenty for head counts and halves the file
+        {'name': 'participants', 'type': 'numeric', 'data': buffers.add(participants.astype('float32'))},
+    ]
+    metadata = {'dimensions': dimensions, 'defaultSize': DEFAULT_SIZE}
+    # publish.py writes the compressed copies of the published file
+    return write_columnar(path, len(events), columns, buffers, metadata=metadata, compress=False)
+
+
+def main():
+    if not table_exists('tagged'):
+        print("Error: Tagged data not found. Please run analyze_protest_tags.py first.")
+        return
+
+    # Only the columns the cube is built from
+    columns = ['date', 'state', 'size_mean', 'claims_summary', *TACTIC_COLUMNS]
+    columns += [col for col in table_columns('tagged') if col.startswith('tag_')]
+    df = read_table('tagged', columns=columns)
+    print(f"Loaded {len(df)} tagged events")
+
+    dimensions, events, participants = build_cube(df)
+    CUBE_FILE.parent.mkdir(exist_ok=True)
+    write_cube(dimensions, events, participants)
+    shape = ' x '.join(f"{len(dimension['values'])} {dimension['name']}" for dimension in dimensions)
+    print(f"Saved cube of {shape} to {CUBE_FILE}")
+
+if __name__ == "__main__":
+    main()
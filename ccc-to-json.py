@@ -1,86 +1,186 @@
+import argparse
 import pandas as pd
 import json
 import numpy as np
 import logging
+from ccc_data import load_events
+from columnar import ColumnBuffers, encode_dict, encode_list, encode_numeric, encode_string, write_columnar
 
 # Set up logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
+parser = argparse.ArgumentParser(description="Export the CCC dataset as compact JSON.")
+output_format = parser.add_mutually_exclusive_group()
+output_format.add_argument('--ndjson', action='store_true',
+                           help="write one JSON row per line, with the category maps in a separate file")
+output_format.add_argument('--columnar', action='store_true',
+                           help="write a column-oriented binary file with gzip/brotli copies")
+parser.add_argument('--chunk-size', type=int, default=10000,
+                    help="number of rows converted at a time")
+args = parser.parse_args()
+
+# Compact separators: no whitespace between tokens
+SEPARATORS = (",", ":")
+
 # Load CSV
 file_path = "ccc-phase3-public.csv"
 logging.info(f"Loading data from {file_path}")
-df = pd.read_csv(file_path, dtype=str, encoding='latin')  # Read all columns as strings initially to handle missing values
+df = load_events(file_path)  # Typed frame from the shared cached loader
 logging.info(f"Initial dataframe shape: {df.shape}")
 
-# Convert numeric fields to appropriate types
-numeric_fields = ["lat", "lon", "size_low", "size_high", "size_mean", "valence", "conf"]
-for field in numeric_fields:
-    df[field] = pd.to_numeric(df[field], errors='coerce')
+# Dates come back parsed; write them out as plain ISO strings
+df["date"] = df["date"].dt.strftime("%Y-%m-%d")
+
+# Codes, flags and counts come back as floats (the loader parses them as
+# numbers, missing values included); write them as integers, so a FIPS code
+# is 6037 rather than 6037.0
+integer_fields = [
+    "fips_code", "online", "size_cat", "police_injuries", "arrests_any", "participant_casualties_any",
+    "police_casualties_any", "property_damage_any", "participant_deaths", "police_deaths"
+]
+for field in integer_fields:
+    if field in df.columns and (df[field].dropna() % 1 == 0).all():
+        df[field] = df[field].astype("Int64")
 
 # Convert categorical fields to indexed values
 categorical_fields = ["state", "event_type", "macroevent", "coder"]
 category_maps = {field: {val: idx for idx, val in enumerate(df[field].dropna().unique())} for field in categorical_fields}
 for field in categorical_fields:
-    df[field] = df[field].map(category_maps[field])
+    df[field] = df[field].astype(object).map(category_maps[field]).astype("Int64")
+
+# Remove empty category maps, as the row cleaning below does for empty values
+category_maps = {field: values for field, values in category_maps.items() if values}
 
-# Combine source columns into a list and drop empty ones
+# Source columns are combined into a list and location fields nested into an
+# object when each row is written; the original columns are not emitted. The
+# dataset's own text 'location' column is dropped too, so 'location' is
+# always the nested object (and absent when all its fields are empty).
 source_columns = [col for col in df.columns if col.startswith("source")]
-df["sources"] = df[source_columns].apply(lambda row: [s for s in row if pd.notna(s)], axis=1)
-df.drop(columns=source_columns, inplace=True)  # Drop original source columns
-
-# Nest location fields
-df["location"] = df.apply(lambda row: {
-    k: v for k, v in {
-        "locality": row["locality"] if pd.notna(row["locality"]) else None,
-        "state": row["state"] if pd.notna(row["state"]) else None,
-        "county": row["resolved_county"] if pd.notna(row["resolved_county"]) else None,
-        "lat": row["lat"] if pd.notna(row["lat"]) else None,
-        "lon": row["lon"] if pd.notna(row["lon"]) else None
-    }.items() if v is not None and not (isinstance(v, float) and np.isnan(v))
-}, axis=1)
-df.drop(columns=["locality", "resolved_county", "lat", "lon"], inplace=True)
+location_fields = {"locality": "locality", "state": "state", "county": "resolved_county", "lat": "lat", "lon": "lon"}
+nested_columns = set(source_columns) | {"locality", "resolved_county", "lat", "lon", "location"}
 
 # Remove completely empty columns
-df.dropna(axis=1, how="all", inplace=True)
-
-# Convert DataFrame to JSON format
-json_output = {
-    "categories": category_maps,
-    "rows": df.to_dict(orient="records")
-}
-
-# Function to remove empty values recursively
-def remove_empty(d):
-    """ Recursively remove empty values (None, NaN, empty lists, empty dicts). """
-    if isinstance(d, dict):
-        return {k: remove_empty(v) for k, v in d.items() 
-                if v not in [None, [], {}, ""] and not (isinstance(v, float) and np.isnan(v))}
-    elif isinstance(d, list):
-        return [remove_empty(v) for v in d 
-                if v not in [None, [], {}, ""] and not (isinstance(v, float) and np.isnan(v))]
+row_columns = [col for col in df.columns if col not in nested_columns and df[col].notna().any()]
+
+
+def present(frame):
+    """Mask of values that are kept: not missing and not an empty string."""
+    return frame.notna().to_numpy() & ~frame.isin([""]).to_numpy()
+
+
+def iter_rows(df, chunk_size):
+    """Yield cleaned row dicts, converting one chunk of the frame at a time.
+
+    Missing and empty values are dropped, sources become a list of the
+    non-empty source columns and location a dict of the non-empty location
+    fields, so only one chunk's worth of Python objects exists at a time.
+    """
+    for start in range(0, len(df), chunk_size):
+        chunk = df.iloc[start:start + chunk_size]
+
+        rows = chunk[row_columns]
+        row_values = rows.astype(object).to_numpy()
+        row_mask = present(rows)
+
+        locations = chunk[list(location_fields.values())]
+        location_values = locations.astype(object).to_numpy()
+        location_mask = present(locations)
+
+        # Non-empty sources of each row, in column order
+        sources = chunk[source_columns].to_numpy(dtype=object)
+        source_mask = present(chunk[source_columns])
+        source_counts = source_mask.sum(axis=1)
+        source_lists = np.split(sources[source_mask], np.cumsum(source_counts)[:-1])
+
+        for i in range(len(chunk)):
+            row = {col: row_values[i, j] for j, col in enumerate(row_columns) if row_mask[i, j]}
+            if source_counts[i]:
+                row["sources"] = source_lists[i].tolist()
+            location = {key: location_values[i, j] for j, key in enumerate(location_fields) if location_mask[i, j]}
+            if location:
+                row["location"] = location
+            yield row
+
+
+def to_json(value):
+    # numpy and pandas scalars are converted to plain Python values
+    return json.dumps(value, separators=SEPARATORS, default=lambda v: v.item())
+
+
+def write_json():
+    """Stream rows straight to the JSON (or NDJSON) output file."""
+    if args.ndjson:
+        output_path = "ccc-phase3-public-optimized.ndjson"
+        categories_path = "ccc-phase3-public-categories.json"
+        with open(categories_path, "w", encoding="utf-8") as f:
+            f.write(to_json(category_maps))
+        logging.info(f"Category maps saved to {categories_path}")
     else:
-        return d
+        output_path = "ccc-phase3-public-optimized.json"
+
+    row_count = 0
+    field_count = 0
+    with open(output_path, "w", encoding="utf-8") as f:
+        if not args.ndjson:
+            f.write('{"categories":' + to_json(category_maps) + ',"rows":[')
+
+        for row in iter_rows(df, args.chunk_size):
+            if row_count == 0:
+                logging.info("Sample row:")
+                logging.info(json.dumps(row, indent=2, default=lambda v: v.item()))
+            elif not args.ndjson:
+                f.write(",")
+
+            f.write(to_json(row))
+            if args.ndjson:
+                f.write("\n")
+
+            row_count += 1
+            field_count += len(row)
+
+        if not args.ndjson:
+            f.write("]}")
+
+    logging.info(f"Wrote {row_count} rows with {field_count} non-empty fields")
+    logging.info(f"Optimized JSON saved to {output_path}")
+    print(f"Optimized JSON saved to {output_path}")
+
+
+def write_columnar_export():
+    """Write the dataset column by column as typed buffers.
 
-# Apply removal of empty values
-logging.info("Before removing empty values, sample row:")
-if json_output["rows"]:
-    logging.info(json.dumps(json_output["rows"][0], indent=2))
+    Numbers become typed arrays, the category fields keep the codes and
+    dictionaries of category_maps, other text columns are dictionary-encoded
+    when values repeat and stored as offsets into a UTF-8 blob otherwise.
+    """
+    output_path = "ccc-phase3-public-columnar.bin"
+    buffers = ColumnBuffers()
+    columns = []
 
-# Count items before cleaning
-before_count = sum(len(row) for row in json_output["rows"])
-logging.info(f"Total fields before cleaning: {before_count}")
+    for col in row_columns + ["locality", "resolved_county", "lat", "lon"]:
+        series = df[col]
+        if col in category_maps:
+            columns.append(encode_dict(buffers, col, series, category_maps[col]))
+        elif pd.api.types.is_numeric_dtype(series):
+            columns.append(encode_numeric(buffers, col, series))
+        elif series.nunique() <= len(series) // 2:
+            codes, uniques = pd.factorize(series)
+            columns.append(encode_dict(buffers, col, codes, uniques.tolist()))
+        else:
+            columns.append(encode_string(buffers, col, series))
 
-json_output = remove_empty(json_output)
+    # Non-empty sources of each row, in column order
+    sources = df[source_columns].to_numpy(dtype=object)
+    source_mask = present(df[source_columns])
+    source_lists = np.split(sources[source_mask], np.cumsum(source_mask.sum(axis=1))[:-1])
+    columns.append(encode_list(buffers, "sources", source_lists))
 
-# Count items after cleaning
-after_count = sum(len(row) for row in json_output["rows"])
-logging.info(f"Total fields after cleaning: {after_count}")
-logging.info(f"Removed {before_count - after_count} empty fields")
+    for path in write_columnar(output_path, len(df), columns, buffers):
+        logging.info(f"Columnar export saved to {path}")
+    print(f"Columnar export saved to {output_path}")
 
-# Save to file
-output_path = "ccc-phase3-public-optimized.json"
-with open(output_path, "w", encoding="utf-8") as f:
-    json.dump(json_output, f, indent=2)
 
-logging.info(f"Optimized JSON saved to {output_path}")
-print(f"Optimized JSON saved to {output_path}")
+if args.columnar:
+    write_columnar_export()
+else:
+    write_json()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+import pandas as pd
+from pathlib import Path
+
+# Shared loader for the CCC public dataset. The CSV is parsed once with an
+# explicit schema and the typed frame is cached as a Parquet snapshot keyed on
+# the source file's content hash, so every other script reads the snapshot.
+
+SOURCE_FILE = 'ccc-phase3-public.csv'
+CACHE_DIR = Path('.cache')
+
+# Bump when the schema below changes so stale snapshots are not reused
+SCHEMA_VERSION = 1
+
+# Low-cardinality text columns stored as categoricals
+CATEGORICAL_COLUMNS = ['state', 'event_type', 'coder']
+
+# Columns parsed as numbers; anything unparseable becomes NaN
+NUMERIC_COLUMNS = [
+    'fips_code', 'lat', 'lon', 'valence', 'conf', 'online',
+    'size_low', 'size_high', 'size_mean', 'size_cat',
+    'police_injuries', 'arrests_any', 'participant_casualties_any',
+    'police_casualties_any', 'property_damage_any',
+    'participant_deaths', 'police_deaths'
+]
+
+DATE_COLUMNS = ['date']
+
+
+# Digests already computed in this process, keyed on path, size and mtime
+_hashes = {}
+
+
+def file_hash(path):
+    """Return the SHA-256 hex digest of a file's contents.
+
+    A file is read once per process: the digest is reused while its size and
+    modification time are unchanged.
+    """
+    stat = os.stat(path)
+    key = (os.path.abspath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+        _hashes[key] = digest.hexdigest()
+    return _hashes[key]
+
+
+def parse_csv(path):
+    """Parse a CCC CSV export with the shared column schema."""
+    # Read everything as text first so malformed rows cannot change a column's type
+    df = pd.read_csv(path, encoding='latin1', dtype=str)
+
+    for col in NUMERIC_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors='coerce')
+
+    for col in DATE_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.to_datetime(df[col], format='%Y-%m-%d', errors='coerce')
+
+    # Categories are kept in order of first appearance so value_counts ties
+    # come out in the same order as they would for plain strings
+    for col in CATEGORICAL_COLUMNS:
+        if col in df.columns:
+            df[col] = pd.Categorical(df[col], categories=df[col].dropna().unique())
+
+    return df
+
+
+def remove_stale(pattern, keep):
+    """Delete cache files matching ``pattern`` other than those in ``keep``."""
+    for old in CACHE_DIR.glob(pattern):
+        if old not in keep:
+            # Another process may have removed it first
+            old.unlink(missing_ok=True)
+
+
+def write_parquet(df, target, **kwargs):
+    """Write ``df`` to ``target`` through a temporary file.
+
+    An interrupted run never leaves a truncated file behind, and the
+    temporary name is unique to the process since parallel pipeline stages
+    may write the same file at once.
+    """
+    tmp = target.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_parquet(tmp, **kwargs)
+    tmp.replace(target)
+
+
+def snapshot_path(path, digest):
+    """Return the cache file used for a given source file and content hash."""
+    return CACHE_DIR / f"{Path(path).stem}-v{SCHEMA_VERSION}-{digest[:16]}.parquet"
+
+
+def load_events(path=SOURCE_FILE, columns=None):
+    """Load a CCC CSV, reusing the cached Parquet snapshot when it is current.
+
+    ``columns`` limits the returned frame to the listed columns; with a warm
+    cache only those columns are read from disk.
+    """
+    snapshot = snapshot_path(path, file_hash(path))
+
+    if not snapshot.exists():
+        df = parse_csv(path)
+
+        # Drop snapshots of earlier versions of the same file
+        CACHE_DIR.mkdir(exist_ok=True)
+        remove_stale(f"{Path(path).stem}-v*.parquet", keep={snapshot})
+        write_parquet(df, snapshot, index=False)
+
+        return df[columns] if columns is not None else df
+
+    return pd.read_parquet(snapshot, columns=columns)
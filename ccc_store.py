@@ -0,0 +1,164 @@
+import os
+import shutil
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from pathlib import Path
+
+# Month-partitioned Parquet store of processed events.
+#
+# A table is a directory of partitions, one per calendar month of the event
+# date, so an update that only touches recent dates rewrites only the recent
+# partitions, and a reader can skip whole months:
+#   store/<table>/month=YYYY-MM/part.parquet
+#
+# Columns keep their types (dates, numbers, booleans), so readers neither
+# re-parse text nor re-infer types, and being columnar a reader only pays for
+# the columns it asks for. Tables written whole with write_table() also keep
+# each row's position in an 'event_id' column, and read_table() returns the
+# rows in that order.
+#
+# The 'left' and 'tagged' tables are the intermediates of the pipeline:
+# filter_left_protests.py writes the left-leaning events and
+# analyze_protest_tags.py the same events with their tag_* columns.
+
+STORE_DIR = Path('store')
+
+
+def month_of(dates):
+    """Partition name ('YYYY-MM') of each date in a Series; 'unknown' for missing dates."""
+    return dates.dt.strftime('%Y-%m').fillna('unknown')
+
+
+def table_dir(table, store_dir=STORE_DIR):
+    return Path(store_dir) / table
+
+
+def table_exists(table, store_dir=STORE_DIR):
+    return any(table_dir(table, store_dir).glob('month=*/part.parquet'))
+
+
+def partition_path(table, month, store_dir=STORE_DIR):
+    return table_dir(table, store_dir) / f'month={month}' / 'part.parquet'
+
+
+def partition_months(table, store_dir=STORE_DIR):
+    """Months that have a partition in a table, in order."""
+    return sorted(path.parent.name.split('=', 1)[1] for path in table_dir(table, store_dir).glob('month=*/part.parquet'))
+
+
+def read_partition(table, month, store_dir=STORE_DIR):
+    """Return the rows of one partition, or None if it doesn't exist."""
+    path = partition_path(table, month, store_dir)
+    if path.exists():
+        return pd.read_parquet(path)
+    return None
+
+
+def storable(df):
+    # Categoricals are stored as plain strings: their categories differ
+    # between partitions
+    df = df.copy()
+    for col in df.columns[df.dtypes == 'category']:
+        df[col] = df[col].astype(object)
+    return df
+
+
+def frame_schema(df):
+    """Arrow schema of a frame (categoricals already stored as strings).
+
+    Text columns without any value come out as Arrow's null type, which
+    can't be read back together with the same column holding strings in
+    other partitions, so they are stored as strings.
+    """
+    schema = pa.Schema.from_pandas(df, preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            schema = schema.set(i, field.with_type(pa.string()))
+    return schema
+
+
+def write_partition(table, month, df, store_dir=STORE_DIR, schema=None):
+    """Replace one partition with ``df``; an empty frame removes it.
+
+    ``schema`` is the Arrow schema of the whole table, so every partition
+    stores a column with the same type; by default it comes from ``df``.
+    """
+    path = partition_path(table, month, store_dir)
+    if df.empty:
+        if path.exists():
+            path.unlink()
+            path.parent.rmdir()
+        return
+
+    df = storable(df)
+    if schema is None:
+        schema = frame_schema(df)
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # Unique temporary name so an interrupted run never leaves a truncated
+    # partition behind
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    df.to_parquet(tmp, index=False, schema=schema)
+    tmp.replace(path)
+
+
+def write_table(table, df, store_dir=STORE_DIR):
+    """Replace a whole table with ``df``, partitioned by the month of its 'date' column."""
+    df = df.assign(event_id=np.arange(len(df), dtype='int32'))
+    # One schema for every partition, whatever columns a month lacks
+    schema = frame_schema(storable(df))
+    months = month_of(df['date']).to_numpy()
+    for month, rows in df.groupby(months, sort=True):
+        write_partition(table, month, rows, store_dir, schema)
+
+    # Months no longer in the table
+    for month in set(partition_months(table, store_dir)) - set(months):
+        shutil.rmtree(partition_path(table, month, store_dir).parent)
+
+
+def _stored_columns(table, store_dir):
+    # Columns in the files of a table, from the schema of one partition
+    month = partition_months(table, store_dir)[0]
+    return pq.read_schema(partition_path(table, month, store_dir)).names
+
+
+def table_schema(table, store_dir=STORE_DIR):
+    """Arrow schema of a table, with the 'month' partition column.
+
+    The schemas of the partitions are unified, so partitions written at
+    different times (see ingest.py) read back together even when a column
+    that has no value in one month was stored with Arrow's null type.
+    """
+    schemas = [pq.read_schema(partition_path(table, month, store_dir))
+               for month in partition_months(table, store_dir)]
+    schema = pa.unify_schemas(schemas, promote_options='permissive')
+    return schema.append(pa.field('month', pa.string()))
+
+
+def table_columns(table, store_dir=STORE_DIR):
+    """Names of the columns of a table."""
+    return [name for name in _stored_columns(table, store_dir) if name != 'event_id']
+
+
+def read_table(table, columns=None, filters=None, store_dir=STORE_DIR):
+    """Read a table of the store.
+
+    ``columns`` limits the frame to the listed columns; only those are read
+    from disk. ``filters`` are pushed down to the Parquet reader (pyarrow's
+    [(column, op, value), ...] form): filters on 'month' skip whole
+    partitions, filters on other columns skip row groups by their statistics
+    before rows are filtered. Rows come back in the order they were written.
+    """
+    path = table_dir(table, store_dir)
+    if columns is not None and 'event_id' in _stored_columns(table, store_dir):
+        columns = list(columns) + ['event_id']
+    df = pd.read_parquet(path, columns=columns, filters=filters, schema=table_schema(table, store_dir))
+
+    # The partition column only comes back when asked for
+    if columns is None and 'month' in df.columns:
+        df = df.drop(columns='month')
+    if 'event_id' in df.columns:
+        df = df.sort_values('event_id', kind='stable').drop(columns='event_id').reset_index(drop=True)
+    return df
@@ -0,0 +1,103 @@
+import os
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor
+from ccc_data import CACHE_DIR
+from keyword_rules import match_rules, rules_hash
+
+# Claim-level keyword classification shared by the claims scripts and
+# filter_left_protests.py.
+#
+# Every claim is scanned once against all rule sets of the keyword registry
+# (keyword_rules.json) and its raw matches are kept in a persistent memo in
+# .cache/, keyed on the claim text with surrounding whitespace stripped.
+# Claims repeat verbatim across events and data releases, so classifying a
+# new release only touches claims never seen before. The memo is tied to a
+# hash of the registry: editing any keyword list starts a fresh memo.
+
+
+def memo_path():
+    return CACHE_DIR / f'claim-flags-{rules_hash()}.parquet'
+
+
+def normalize(texts):
+    # Case is kept: some rule sets are case-sensitive
+    return texts.astype(object).str.strip()
+
+
+def load_memo(path):
+    if path.exists():
+        return pd.read_parquet(path)
+    return None
+
+
+def save_memo(memo, path):
+    CACHE_DIR.mkdir(exist_ok=True)
+    # Memos of earlier keyword lists can't be reused
+    for old in CACHE_DIR.glob('claim-flags-*.parquet'):
+        if old != path:
+            old.unlink()
+    # Unique temporary name: parallel pipeline stages may save at once
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    memo.to_parquet(tmp)
+    tmp.replace(path)
+
+
+def claim_flags(claims, workers=1):
+    """Return the keyword matches of each claim text in a Series.
+
+    The result is a boolean frame like that of match_rules(), with one
+    (set, rule) column per rule of the registry, aligned to the Series index.
+    Only claims missing from the memo are matched, split across ``workers``
+    processes when there are more than one, and the memo is updated with
+    them. Missing claims match nothing.
+    """
+    keys = normalize(claims)
+    path = memo_path()
+    memo = load_memo(path)
+    seen = memo.index if memo is not None else pd.Index([])
+    unseen = pd.Series(pd.Index(keys.dropna().unique()).difference(seen), dtype=object)
+
+    if len(unseen):
+        if workers > 1:
+            size = -(-len(unseen) // (workers * 4))
+            chunks = [unseen.iloc[i:i + size] for i in range(0, len(unseen), size)]
+            with ProcessPoolExecutor(max_workers=workers) as pool:
+                flags = pd.concat(pool.map(match_rules, chunks))
+        else:
+            flags = match_rules(unseen)
+        flags.index = pd.Index(unseen, name='claim')
+        memo = pd.concat([memo, flags]) if memo is not None else flags
+        save_memo(memo, path)
+
+    result = memo.reindex(keys, fill_value=False).astype(bool)
+    result.index = claims.index
+    return result
+
+
+def political_sentiment(flags):
+    """Label each claim 'left', 'right', 'ambiguous' or 'neutral' from its flags.
+
+    ``flags`` are the matches of the 'political' rule set.
+    """
+    contested = flags['against'] & flags['contested']
+    left, right = flags['left'], flags['right']
+    labels = np.select(
+        [contested, left & ~right, right & ~left, left & right],
+        ['right', 'left', 'right', 'ambiguous'],
+        default='neutral'
+    )
+    return pd.Series(labels, index=flags.index)
+
+
+def event_flags(claims, flags, event_count):
+    """Combine claim flags per event: an event matches a rule if any of its claims do.
+
+    ``claims`` is the mentions table of claims.load_claims() and ``flags`` the
+    claim_flags() of its dictionary (or some of its columns). Returns one row
+    per event position.
+    """
+    mentions = claims[claims['claim_id'] >= 0]
+    table = np.zeros((event_count, len(flags.columns)), dtype=bool)
+    np.logical_or.at(table, mentions['event_id'].to_numpy(), flags.to_numpy()[mentions['claim_id'].to_numpy()])
+    return pd.DataFrame(table, columns=flags.columns)
@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+from pathlib import Path
+from ccc_data import CACHE_DIR, SOURCE_FILE, file_hash, load_events, remove_stale, write_parquet
+
+# Normalized claims of the CCC dataset, shared by the claims scripts.
+#
+# Each claims_summary holds one or more claims separated by semicolons. They
+# are split once into two tables, cached in .cache/ next to the events
+# snapshot and keyed on the same content hash:
+#   claims      event_id (row position in load_events()), claim_id; one row
+#               per claim mention in event order, and a single row with
+#               claim_id -1 for events without a claims summary
+#   dictionary  claim text and number of mentions, indexed by claim_id;
+#               IDs are assigned in order of first appearance
+
+# Bump when the tables below change so stale caches are not reused
+CLAIMS_VERSION = 1
+
+
+def build_claims(summaries):
+    """Split a Series of claims summaries into the claims and dictionary tables."""
+    mentions = summaries.reset_index(drop=True).str.split(';').explode()
+    claim_ids, texts = pd.factorize(mentions.str.strip())
+
+    claims = pd.DataFrame({
+        'event_id': mentions.index.to_numpy(dtype='int32'),
+        'claim_id': claim_ids.astype('int32'),
+    })
+    dictionary = pd.DataFrame({
+        'claim': pd.Series(texts, dtype=object),
+        'count': np.bincount(claim_ids[claim_ids >= 0], minlength=len(texts)),
+    })
+    dictionary.index.name = 'claim_id'
+    return claims, dictionary
+
+
+def claims_paths(path, digest):
+    """Return the cache files of the claims tables for a source file and hash."""
+    stem = f"{Path(path).stem}-claims-v{CLAIMS_VERSION}-{digest[:16]}"
+    return CACHE_DIR / f"{stem}.parquet", CACHE_DIR / f"{stem}-dictionary.parquet"
+
+
+def load_claims(path=SOURCE_FILE):
+    """Return the (claims, dictionary) tables of a CCC CSV, building them once."""
+    claims_path, dictionary_path = claims_paths(path, file_hash(path))
+
+    if claims_path.exists() and dictionary_path.exists():
+        return pd.read_parquet(claims_path), pd.read_parquet(dictionary_path)
+
+    claims, dictionary = build_claims(load_events(path, columns=['claims_summary'])['claims_summary'])
+
+    # Drop tables built from earlier versions of the same file
+    CACHE_DIR.mkdir(exist_ok=True)
+    remove_stale(f"{Path(path).stem}-claims-v*.parquet", keep={claims_path, dictionary_path})
+
+    for table, target in [(claims, claims_path), (dictionary, dictionary_path)]:
+        write_parquet(table, target)
+
+    return claims, dictionary
+
+
+def label_missing(claims, dictionary, label):
+    """Treat events without a claims summary as mentioning the claim ``label``.
+
+    Returns the claim IDs of every mention, with the missing summaries given
+    the ID of ``label`` (a new ID if no claim has that text), and the claim
+    texts indexed by ID.
+    """
+    texts = dictionary['claim']
+    existing = np.flatnonzero(texts.to_numpy() == label)
+    if len(existing):
+        label_id = int(existing[0])
+    else:
+        label_id = len(texts)
+        texts = pd.concat([texts, pd.Series([label], index=[label_id], dtype=object)])
+    claim_ids = claims['claim_id'].where(claims['claim_id'] >= 0, label_id)
+    return claim_ids, texts
@@ -0,0 +1,162 @@
+import gzip
+import json
+import logging
+import numpy as np
+import pandas as pd
+
+# Column-oriented binary container shared by the exports that the browser
+# reads as typed-array views (see js/columnar.js for the reader).
+#
+# Layout:
+#   bytes 0-3   magic b'CCCB'
+#   bytes 4-7   header length H (uint32, little-endian)
+#   bytes 8-    UTF-8 JSON header, space-padded to a multiple of 8 bytes
+#   then the column buffers, each starting on an 8-byte boundary so it can be
+#   viewed directly as a typed array. Buffer offsets are relative to the end
+#   of the header.
+#
+# The header lists the row count and one entry per column:
+#   numeric  {"name", "type": "numeric", "data": buffer}
+#            floats keep NaN for missing values; integer columns without
+#            missing values use the smallest integer type that fits
+#   dict     {"name", "type": "dict", "dictionary": [...], "codes": buffer}
+#            codes index into the dictionary, -1 for missing values
+#   string   {"name", "type": "string", "offsets": buffer, "data": buffer}
+#            uint32 offsets (rows + 1) into a UTF-8 blob; missing is empty
+#   list     {"name", "type": "list", "offsets": buffer, "items": string column}
+#            uint32 offsets (rows + 1) into a flat string column
+# where a buffer is {"dtype", "offset", "length"} with length in elements.
+
+MAGIC = b'CCCB'
+VERSION = 1
+ALIGN = 8
+
+# numpy dtype names and their JavaScript typed-array counterparts
+TYPED_ARRAYS = {
+    'int8': 'Int8Array', 'uint8': 'Uint8Array', 'int16': 'Int16Array', 'uint16': 'Uint16Array',
+    'int32': 'Int32Array', 'uint32': 'Uint32Array', 'float32': 'Float32Array', 'float64': 'Float64Array',
+}
+
+
+def smallest_int(values, signed=True):
+    """Return the smallest integer dtype that holds every value."""
+    candidates = ['int8', 'int16', 'int32', 'int64'] if signed else ['uint8', 'uint16', 'uint32']
+    low, high = (values.min(), values.max()) if len(values) else (0, 0)
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= low and high <= info.max:
+            return dtype
+    return candidates[-1]
+
+
+class ColumnBuffers:
+    """Collects column buffers and their aligned offsets."""
+
+    def __init__(self):
+        self.parts = []
+        self.size = 0
+
+    def add(self, array):
+        array = np.ascontiguousarray(array)
+        if array.dtype.name not in TYPED_ARRAYS:
+            raise ValueError(f"Unsupported buffer dtype: {array.dtype}")
+        entry = {'dtype': array.dtype.name, 'offset': self.size, 'length': int(array.size)}
+        data = array.astype(array.dtype.newbyteorder('<'), copy=False).tobytes()
+        padding = -len(data) % ALIGN
+        self.parts.append(data + b'\0' * padding)
+        self.size += len(data) + padding
+        return entry
+
+    def add_strings(self, values):
+        # values: sequence of str; missing values must already be ''
+        encoded = [value.encode('utf-8') for value in values]
+        offsets = np.zeros(len(encoded) + 1, dtype='uint32')
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+        return self.add(offsets), self.add(np.frombuffer(b''.join(encoded), dtype='uint8'))
+
+
+def encode_numeric(buffers, name, series):
+    values = pd.to_numeric(series, errors='coerce')
+    if values.isna().any() or values.dtype.kind == 'f':
+        data = values.astype('float64').to_numpy()
+    else:
+        dtype = smallest_int(values.to_numpy())
+        # JavaScript has no plain 64-bit integer typed array
+        data = values.to_numpy().astype('float64' if dtype == 'int64' else dtype)
+    return {'name': name, 'type': 'numeric', 'data': buffers.add(data)}
+
+
+def encode_dict(buffers, name, codes, dictionary):
+    codes = pd.Series(codes).fillna(-1).to_numpy(dtype='int64')
+    return {
+        'name': name,
+        'type': 'dict',
+        'dictionary': list(dictionary),
+        'codes': buffers.add(codes.astype(smallest_int(np.append(codes, -1)))),
+    }
+
+
+def encode_string(buffers, name, series):
+    values = series.astype(object).where(series.notna(), '').astype(str)
+    offsets, data = buffers.add_strings(values)
+    return {'name': name, 'type': 'string', 'offsets': offsets, 'data': data}
+
+
+def encode_list(buffers, name, lists):
+    lengths = np.array([len(items) for items in lists], dtype='int64')
+    offsets = np.zeros(len(lists) + 1, dtype='uint32')
+    np.cumsum(lengths, out=offsets[1:])
+    items = [item for items in lists for item in items]
+    item_offsets, item_data = buffers.add_strings(items)
+    return {
+        'name': name,
+        'type': 'list',
+        'offsets': buffers.add(offsets),
+        'items': {'type': 'string', 'offsets': item_offsets, 'data': item_data},
+    }
+
+
+def write_columnar(path, row_count, columns, buffers, metadata=None, compress=True):
+    """Write encoded columns to ``path``, plus .gz/.br siblings if requested.
+
+    ``columns`` are the header entries returned by the encode_* functions for
+    the given ``buffers``. Returns the paths written.
+    """
+    header = {'version': VERSION, 'rows': int(row_count), 'columns': columns}
+    if metadata:
+        header['metadata'] = metadata
+    header_bytes = json.dumps(header, separators=(',', ':')).encode('utf-8')
+    header_bytes += b' ' * (-(len(MAGIC) + 4 + len(header_bytes)) % ALIGN)
+
+    payload = MAGIC + len(header_bytes).to_bytes(4, 'little') + header_bytes + b''.join(buffers.parts)
+    with open(path, 'wb') as f:
+        f.write(payload)
+    written = [str(path)]
+
+    if compress:
+        written += write_precompressed(path, payload)
+    return written
+
+
+def write_precompressed(path, payload, brotli_quality=11):
+    """Write gzip and (when the brotli package is installed) brotli copies.
+
+    Brotli's top quality is slow on large files; pass a lower
+    ``brotli_quality`` for files rewritten on every build.
+    """
+    written = []
+    # mtime=0 keeps the compressed bytes identical for identical input
+    with open(f"{path}.gz", 'wb') as f:
+        f.write(gzip.compress(payload, compresslevel=9, mtime=0))
+    written.append(f"{path}.gz")
+
+    try:
+        import brotli
+    except ImportError:
+        logging.info("brotli is not installed; skipping the .br copy")
+        return written
+
+    with open(f"{path}.br", 'wb') as f:
+        f.write(brotli.compress(payload, quality=brotli_quality))
+    written.append(f"{path}.br")
+    return written
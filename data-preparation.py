@@ -1,15 +1,24 @@
+import argparse
 import pandas as pd
 import json
 import numpy as np
 from datetime import datetime
-
-# Load the dataset
-df = pd.read_csv('ccc-phase3-public.csv', encoding='latin')
-
-# Basic cleaning
-# Convert date to datetime
-df['date'] = pd.to_datetime(df['date'])
-
+from scipy import sparse
+from ccc_data import load_events
+from claim_classifier import claim_flags, event_flags
+from claims import label_missing, load_claims
+
+parser = argparse.ArgumentParser(description="Prepare dashboard data and the claim co-occurrence network.")
+parser.add_argument('--top-k', type=int, default=20,
+                    help="number of most frequent claims included in the claim network")
+parser.add_argument('--min-weight', type=int, default=1,
+                    help="minimum number of shared events for a link in the claim network")
+args = parser.parse_args()
+
+# Load the dataset through the shared cached loader
+df = load_events()
+
+# Basic cleaning (dates are already parsed by the loader)
 # Extract month and year for aggregation
 df['month'] = df['date'].dt.month
 df['year'] = df['date'].dt.year
@@ -17,34 +26,20 @@ df['month_year'] = df['date'].dt.strftime('%Y-%m')
 
 # Handle missing values for key columns
 df['size_mean'] = df['size_mean'].fillna(0)
-df['event_type'] = df['event_type'].fillna('unknown')
+df['event_type'] = df['event_type'].astype(object).fillna('unknown')
 df['claims_summary'] = df['claims_summary'].fillna('unspecified')
 
-# Create simplified claim categories
-def categorize_claims(claim_text):
-    if pd.isna(claim_text):
-        return 'Other'
-    
-    claim_text = claim_text.lower()
-    
-    categories = {
-        'trump': ['trump', 'president trump'],
-        'women': ['women', 'reproductive', 'abortion'],
-        'palestine': ['palestine', 'gaza', 'palestinian'],
-        'climate': ['climate', 'environmental'],
-        'lgbtq': ['lgbtq', 'queer', 'trans'],
-        'immigration': ['immigra', 'migrant', 'border'],
-        'racial justice': ['black lives', 'racial justice', 'blm'],
-        'labor': ['labor', 'worker', 'union', 'wage']
-    }
-    
-    for category, keywords in categories.items():
-        if any(keyword in claim_text for keyword in keywords):
-            return category
-    
-    return 'Other'
-
-df['claim_category'] = df['claims_summary'].apply(categorize_claims)
+# Create simplified claim categories: the first rule of the
+# 'event_categories' set of keyword_rules.json that any of an event's claims
+# match, or 'Other'. Each distinct claim is classified once.
+claims, claim_dictionary = load_claims()
+category_flags = claim_flags(claim_dictionary['claim'])['event_categories']
+event_categories = event_flags(claims, category_flags, len(df)).to_numpy()
+df['claim_category'] = np.where(
+    event_categories.any(axis=1),
+    category_flags.columns.to_numpy()[event_categories.argmax(axis=1)],
+    'Other'
+)
 
 # Prepare event type data for visualization
 event_type_counts = df['event_type'].value_counts().reset_index()
@@ -103,41 +98,39 @@ print("Data preparation complete. Dashboard data saved to dashboard_data.json")
 org_counts = df['organizations'].str.split(';').explode().str.strip().value_counts().head(20).reset_index()
 org_counts.columns = ['organization', 'count']
 
-# Create claim co-occurrence matrix
-def extract_claims(claim_text):
-    if pd.isna(claim_text):
-        return []
-    
-    claims = [c.strip() for c in claim_text.split(';')]
-    return claims
-
-df['claim_list'] = df['claims_summary'].apply(extract_claims)
-all_claims = [claim for sublist in df['claim_list'].dropna() for claim in sublist]
-unique_claims = pd.Series(all_claims).value_counts().head(20).index.tolist()
-
-claim_matrix = []
-for claim1 in unique_claims:
-    row = []
-    for claim2 in unique_claims:
-        # Count co-occurrences
-        co_occur = sum(1 for claims in df['claim_list'] if claim1 in claims and claim2 in claims)
-        row.append(co_occur)
-    claim_matrix.append(row)
+# Create claim co-occurrence matrix from the shared claims tables, with
+# events without a summary mentioning 'unspecified' as above
+claim_mentions, claim_texts = label_missing(claims, claim_dictionary, 'unspecified')
+
+# Event x claim incidence matrix over the top-k claims, built once
+top_ids = claim_mentions.value_counts().head(args.top_k).index
+unique_claims = claim_texts[top_ids].tolist()
+claim_ids = pd.Index(top_ids).get_indexer(claim_mentions)
+event_ids = claims['event_id'].to_numpy()
+in_top = claim_ids >= 0
+incidence = sparse.csr_matrix(
+    (np.ones(in_top.sum(), dtype=np.int32), (event_ids[in_top], claim_ids[in_top])),
+    shape=(len(df), len(unique_claims))
+)
+# An event mentioning a claim twice still counts once
+incidence.data[:] = 1
+
+# Co-occurrence counts are the claim x claim product; only nonzero pairs are stored
+claim_matrix = (incidence.T @ incidence).tocoo()
+
+# Keep off-diagonal pairs that meet the weight threshold, ordered by source then target
+keep = (claim_matrix.row != claim_matrix.col) & (claim_matrix.data >= args.min_weight)
+sources, targets, weights = claim_matrix.row[keep], claim_matrix.col[keep], claim_matrix.data[keep]
+link_order = np.lexsort((targets, sources))
 
 claim_network = {
     'nodes': [{'id': claim, 'group': 1} for claim in unique_claims],
-    'links': []
+    'links': [
+        {'source': unique_claims[i], 'target': unique_claims[j], 'value': int(value)}
+        for i, j, value in zip(sources[link_order], targets[link_order], weights[link_order])
+    ]
 }
 
-for i, claim1 in enumerate(unique_claims):
-    for j, claim2 in enumerate(unique_claims):
-        if i != j and claim_matrix[i][j] > 0:
-            claim_network['links'].append({
-                'source': claim1,
-                'target': claim2,
-                'value': claim_matrix[i][j]
-            })
-
 # Export advanced data
 advanced_data = {
     'top_organizations': org_counts.to_dict(orient='records'),
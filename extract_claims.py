@@ -1,27 +1,18 @@
 import pandas as pd
 import json
-from pathlib import Path
+from claims import label_missing, load_claims
 
 def main():
-    print("Loading CSV data...")
-    # Load the CSV data with Latin encoding
-    df = pd.read_csv('ccc-phase3-public.csv', encoding='latin1')
-    print(f"Loaded {len(df)} events from CSV")
+    print("Loading claims...")
+    # Split claims from the shared claims tables (built once per data release)
+    claims, dictionary = load_claims()
+    print(f"Loaded {len(claims)} claim mentions of {claims['event_id'].nunique()} events")
 
-    # Extract claims and count frequencies
+    # Count frequencies, counting events without a summary as 'Unknown'
     print("Analyzing claims...")
-    claims_series = df['claims_summary'].fillna('Unknown')
-    
-    # Some claims are combined with semicolons, so we'll split them
-    all_claims = []
-    for claim_text in claims_series:
-        # Split by semicolons and strip whitespace
-        individual_claims = [c.strip() for c in claim_text.split(';')]
-        all_claims.extend(individual_claims)
-    
-    # Count frequencies
-    claims_counts = pd.Series(all_claims).value_counts().reset_index()
-    claims_counts.columns = ['claim', 'count']
+    claim_ids, texts = label_missing(claims, dictionary, 'Unknown')
+    counts = claim_ids.value_counts()
+    claims_counts = pd.DataFrame({'claim': texts[counts.index].to_numpy(), 'count': counts.to_numpy()})
     
     # Save to CSV
     output_file = 'data/claims_counts.csv'
@@ -1,34 +1,18 @@
 import pandas as pd
 import json
 from pathlib import Path
-from collections import Counter
+from claim_classifier import claim_flags
+from claims import load_claims
 
 def main():
-    print("Loading CSV data...")
-    # Load the CSV data with Latin encoding
-    df = pd.read_csv('ccc-phase3-public.csv', encoding='latin1')
-    print(f"Loaded {len(df)} events from CSV")
+    print("Loading claims...")
+    # Split claims from the shared claims tables (built once per data release)
+    claims, dictionary = load_claims()
+    print(f"Loaded {len(claims)} claim mentions of {claims['event_id'].nunique()} events")
 
-    # Extract claims and split by semicolons
+    # The dictionary holds every individual claim with its number of mentions
     print("Analyzing claims_summary field...")
-    claims_series = df['claims_summary'].fillna('Unknown')
-    
-    # Split all claims by semicolons and create a flat list
-    all_claims = []
-    for claim_text in claims_series:
-        # Split by semicolons and strip whitespace
-        if claim_text != 'Unknown':
-            individual_claims = [c.strip() for c in claim_text.split(';')]
-            all_claims.extend(individual_claims)
-    
-    # Count frequencies using Counter
-    claims_counter = Counter(all_claims)
-    
-    # Convert to DataFrame for easier analysis
-    claims_df = pd.DataFrame({
-        'claim': list(claims_counter.keys()),
-        'count': list(claims_counter.values())
-    }).sort_values('count', ascending=False)
+    claims_df = dictionary[['claim', 'count']].reset_index(drop=True).sort_values('count', ascending=False)
     
     # Save to CSV
     Path('data').mkdir(exist_ok=True)
@@ -49,26 +33,14 @@ def main():
     # Create a summary table showing claim categories
     print("\nAnalyzing claim categories...")
     
-    # Define some common claim categories to look for
-    categories = {
-        'trump': ['trump', 'donald trump'],
-        'palestine': ['palestine', 'gaza', 'palestinian'],
-        'women': ['women', 'reproductive', 'abortion'],
-        'climate': ['climate', 'environment'],
-        'lgbtq': ['lgbtq', 'gay', 'trans'],
-        'immigration': ['immigra', 'border', 'migrant'],
-        'racial_justice': ['racial justice', 'black lives', 'blm'],
-        'gun_control': ['gun', 'firearm'],
-        'healthcare': ['healthcare', 'health care', 'medicare'],
-        'economic': ['economic', 'wage', 'poverty', 'inequality']
+    # Count claim mentions in each category (the 'claim_categories' set of
+    # keyword_rules.json), classifying each distinct claim once
+    categories = claim_flags(dictionary['claim'])['claim_categories']
+    category_counts = {
+        category: int(dictionary['count'][categories[category]].sum())
+        for category in categories.columns
     }
     
-    # Count claims in each category
-    category_counts = {}
-    for category, keywords in categories.items():
-        count = sum(1 for claim in all_claims if any(keyword.lower() in claim.lower() for keyword in keywords))
-        category_counts[category] = count
-    
     # Save category counts
     category_df = pd.DataFrame({
         'category': list(category_counts.keys()),
@@ -1,24 +1,23 @@
 import pandas as pd
 from pathlib import Path
+from ccc_store import read_table, table_columns, table_exists
 
 def main():
-    print("Loading tagged CSV data...")
-    # Check if tagged data exists, otherwise use the filtered data
-    if Path('ccc-phase3-left-tagged.csv').exists():
-        df = pd.read_csv('ccc-phase3-left-tagged.csv', encoding='latin1')
-        print(f"Loaded {len(df)} tagged events from CSV")
-    else:
-        df = pd.read_csv('ccc-phase3-left.csv', encoding='latin1')
-        print(f"Loaded {len(df)} events from CSV (untagged)")
+    print("Loading tagged data...")
+    # Check if tagged data exists
+    if not table_exists('tagged'):
+        print("Tagged data not found in store/tagged")
         print("Please run analyze_protest_tags.py first to generate tags")
         return
 
+    # Only the claims and tags are needed
+    tag_columns = [col for col in table_columns('tagged') if col.startswith('tag_')]
+    df = read_table('tagged', columns=['claims_summary'] + tag_columns)
+    print(f"Loaded {len(df)} tagged events")
+
     # Extract all claims and split by semicolons
     print("Extracting claims and their tags...")
     
-    # Get all tag columns
-    tag_columns = [col for col in df.columns if col.startswith('tag_')]
-    
     # Create a list to store all claims and their tags
     claims_with_tags = []
     
@@ -1,15 +1,15 @@
-import pandas as pd
 from pathlib import Path
+from ccc_data import load_events
 
 def main():
     print("Loading CSV data...")
-    # Load the CSV data with Latin encoding
-    df = pd.read_csv('ccc-phase3-public.csv', encoding='latin1')
+    # Load the CSV data through the shared cached loader
+    df = load_events()
     print(f"Loaded {len(df)} events from CSV")
 
     # Extract event types and count frequencies
     print("Analyzing event types...")
-    event_types_series = df['event_type'].fillna('Unknown')
+    event_types_series = df['event_type'].astype(object).fillna('Unknown')
     
     # Count frequencies
     event_types_counts = event_types_series.value_counts().reset_index()
@@ -1,106 +1,107 @@
 import pandas as pd
 import json
 from pathlib import Path
+from ccc_store import read_table, table_columns, table_exists
+from keyword_rules import match_rules, rule_set, tag_column
+
+def issue_name(tag_col):
+    # Convert tag column names to readable issue names
+    name = tag_col[4:].replace('_', ' ').title().replace('Lgbt', 'LGBT').replace('Lgbtplus', 'LGBT+')
+
+    # Update tag names to match new naming conventions
+    return 'Musk/DOGE' if name == 'Musk' else name
+
+def issue_keywords(tag_col):
+    # Keywords of the tag behind a tag column, from the 'tags' set of
+    # keyword_rules.json (Immigration also matches a case-sensitive ICE),
+    # plus the 'issue_mentions' keywords that also add Musk/DOGE to an event
+    tags = {tag_column(tag): tag for tag in rule_set('tags')}
+    if tag_col not in tags:
+        return []
+    keywords = list(rule_set('tags')[tags[tag_col]])
+    if tags[tag_col] == 'Immigration':
+        keywords.append('ICE')
+    if issue_name(tag_col) == 'Musk/DOGE':
+        keywords += [keyword for keyword in rule_set('issue_mentions')['Musk/DOGE'] if keyword not in keywords]
+    return keywords
+
+def issue_mentions(df):
+    # Matches of the 'issue_mentions' rules of keyword_rules.json in the
+    # target or the claims summary of each event
+    matches = match_rules(df['claims_summary'])['issue_mentions']
+    if 'target' in df.columns:
+        matches = matches | match_rules(df['target'])['issue_mentions']
+    return matches
+
+def drop_trump_tag(tags, trump_mentioned):
+    # Only keep the Trump tag if it's the ONLY tag AND Trump is specifically
+    # mentioned in target or claim. `tags` is a boolean frame of tag columns.
+    return tags['Trump'] & ((tags.sum(axis=1) > 1) | ~trump_mentioned)
+
+def issue_counts(df, tag_columns, mentioned):
+    # Number of events and participants of each tag column, with the Trump
+    # tag filtering applied, plus both over all events in the 'total' row.
+    # Missing size values count as 11 (default size).
+    tags = df[tag_columns] == 1
+    if 'tag_trump' in tag_columns:
+        drop = drop_trump_tag(tags.rename(columns={'tag_trump': 'Trump'}), mentioned['Trump'])
+        tags.loc[drop, 'tag_trump'] = False
+    size = df['size_mean'].fillna(11)
+    counts = pd.DataFrame({'events': tags.sum(), 'participants': tags.mul(size, axis=0).sum()})
+    total = pd.DataFrame({'events': [len(df)], 'participants': [size.sum()]}, index=['total'])
+    return pd.concat([counts, total])
+
+def issues_table(counts):
+    # One row per tag column of issue_counts() with its share of all events
+    # and participants
+    total = counts.loc['total']
+    counts = counts.drop('total')
+    return pd.DataFrame({
+        'Issue': [issue_name(tag_col) for tag_col in counts.index],
+        'Event Count': counts['events'].astype(int).to_numpy(),
+        'Event Percentage': (counts['events'] / total['events'] * 100).round(2).to_numpy(),
+        'Participant Count': counts['participants'].astype(int).to_numpy(),
+        'Participant Percentage': (counts['participants'] / total['participants'] * 100).round(2).to_numpy(),
+    })
+
+def issues_json(issues_df):
+    # Dashboard form of the issues table
+    return {
+        'tags': issues_df['Issue'].tolist(),
+        'counts': issues_df['Event Count'].tolist(),
+        'percentages': issues_df['Event Percentage'].tolist(),
+        'participantCounts': issues_df['Participant Count'].tolist(),
+        'percentagesByParticipants': issues_df['Participant Percentage'].tolist()
+    }
 
 def main():
     print("Generating protest issues summary...")
     
     # Check if tagged data exists
-    if not Path('ccc-phase3-left-tagged.csv').exists():
+    if not table_exists('tagged'):
         print("Error: Tagged data not found. Please run analyze_protest_tags.py first.")
         return
     
-    # Load the tagged data
-    df = pd.read_csv('ccc-phase3-left-tagged.csv', encoding='latin1')
+    # Load only the claims, sizes and tags of the tagged data
+    tag_columns = [col for col in table_columns('tagged') if col.startswith('tag_')]
+    df = read_table('tagged', columns=['claims_summary', 'size_mean'] + tag_columns)
     print(f"Loaded {len(df)} tagged events")
     
-    # Get all tag columns
-    tag_columns = [col for col in df.columns if col.startswith('tag_')]
+    # Trump and Musk/DOGE mentions of every event, matched once
+    mentioned = issue_mentions(df)
     
-    # Create a dictionary to store issue information
-    issues_data = []
+    # Event and participant counts of every tag
+    issues_df = issues_table(issue_counts(df, tag_columns, mentioned))
     
-    # Create a copy of the dataframe for tag processing
-    processed_df = df.copy()
+    # Keywords used for each tag and its top 5 claims
+    issues_df['Keywords'] = [', '.join(issue_keywords(tag_col)) for tag_col in tag_columns]
+    issues_df['Top Claims'] = [
+        '; '.join([f"{claim} ({count})" for claim, count in df[df[tag_col] == 1]['claims_summary'].value_counts().head(5).items()])
+        for tag_col in tag_columns
+    ]
     
-    # Apply the same Trump tag filtering logic to the summary calculation
-    # First, identify events where Trump should be removed as a tag
-    for idx, event in processed_df.iterrows():
-        # Get all tags for this event
-        event_tags = []
-        for tag_col in tag_columns:
-            if event[tag_col] == 1:
-                event_tags.append(tag_col)
-        
-        # Special handling for Trump tag
-        if 'tag_trump' in event_tags:
-            target = str(event.get('target', '')).lower()
-            claim = str(event.get('claims_summary', '')).lower()
-            
-            # Only keep Trump tag if it's the ONLY tag AND Trump is specifically mentioned in target or claim
-            if len(event_tags) > 1 or ('trump' not in target and 'trump' not in claim):
-                processed_df.at[idx, 'tag_trump'] = 0
-    
-    # Process each tag
-    for tag_col in tag_columns:
-        # Convert tag names to readable format
-        tag_name = tag_col[4:].replace('_', ' ').title().replace('Lgbt', 'LGBT').replace('Lgbtplus', 'LGBT+')
-        
-        # Update tag names to match new naming conventions
-        if tag_name == 'Musk':
-            tag_name = 'Musk/DOGE'
-        
-        # Count events with this tag using the processed dataframe
-        event_count = processed_df[tag_col].sum()
-        event_percentage = (event_count / len(processed_df)) * 100
-        
-        # Calculate total participants for this tag
-        processed_df['size_for_stats'] = processed_df['size_mean'].fillna(11)
-        participant_count = processed_df[processed_df[tag_col] == 1]['size_for_stats'].sum()
-        total_participants = processed_df['size_for_stats'].sum()
-        participant_percentage = (participant_count / total_participants) * 100
-        
-        # Get keywords used for this tag
-        keywords = []
-        if tag_name == 'Gaza':
-            keywords = ['gaza', 'palestinian', 'palestine', 'israel']
-        elif tag_name == 'Abortion':
-            keywords = ['abortion', 'reproductive rights', 'pro-choice', 'women\'s rights']
-        elif tag_name == 'LGBT+':
-            keywords = ['lgbt', 'lgbtq', 'gay', 'trans', 'transgender', 'queer']
-        elif tag_name == 'Environment':
-            keywords = ['climate', 'environment', 'green', 'fossil fuel', 'pollution']
-        elif tag_name == 'Immigration':
-            keywords = ['immigration', 'immigrant', 'ICE', 'border', 'migrant', 'refugee', 'asylum', 'deportation']
-        elif tag_name == 'Trump':
-            keywords = ['trump', 'president trump', 'donald trump']
-        elif tag_name == 'Musk/DOGE':
-            keywords = ['musk', 'elon musk', 'federal budget', 'budget cuts', 'doge']
-        elif tag_name == 'Gun Control':
-            keywords = ['gun', 'firearm', 'nra', 'second amendment']
-        elif tag_name == 'Healthcare':
-            keywords = ['healthcare', 'health care', 'medicare', 'medicaid', 'universal health']
-        elif tag_name == 'Workers':
-            keywords = ['worker', 'labor', 'union', 'wage', 'strike', 'fair pay']
-        elif tag_name == 'Racial Justice':
-            keywords = ['racial justice', 'black lives', 'blm', 'police brutality', 'racism']
-        
-        # Get top 5 claims for this tag
-        top_claims = df[df[tag_col] == 1]['claims_summary'].value_counts().head(5).to_dict()
-        
-        # Add to issues data
-        issues_data.append({
-            'Issue': tag_name,
-            'Event Count': int(event_count),
-            'Event Percentage': round(event_percentage, 2),
-            'Participant Count': int(participant_count),
-            'Participant Percentage': round(participant_percentage, 2),
-            'Keywords': ', '.join(keywords),
-            'Top Claims': '; '.join([f"{claim} ({count})" for claim, count in top_claims.items()])
-        })
-    
-    # Convert to DataFrame and sort by event count
-    issues_df = pd.DataFrame(issues_data).sort_values('Event Count', ascending=False)
+    # Sort by event count
+    issues_df = issues_df.sort_values('Event Count', ascending=False)
     
     # Save to CSV
     Path('data').mkdir(exist_ok=True)
@@ -109,13 +110,7 @@ def main():
     print(f"Saved protest issues summary to {output_file}")
     
     # Also save as JSON for the dashboard
-    json_output = {
-        'tags': issues_df['Issue'].tolist(),
-        'counts': issues_df['Event Count'].tolist(),
-        'percentages': issues_df['Event Percentage'].tolist(),
-        'participantCounts': issues_df['Participant Count'].tolist(),
-        'percentagesByParticipants': issues_df['Participant Percentage'].tolist()
-    }
+    json_output = issues_json(issues_df)
     
     json_output_file = 'data/protest_issues_summary.json'
     with open(json_output_file, 'w') as f:
@@ -142,64 +137,40 @@ def main():
         # Count unique claims
         claim_counts = claims_df['claim'].value_counts().to_dict()
         
-        # Create a mapping of claims to their actual issues
-        claim_to_issues = {}
-        
-        # For each event in the original dataset
-        for _, event in events_df.iterrows():
-            claim = event['claims_summary']
-            
-            # Skip events without claims
-            if pd.isna(claim):
-                continue
-                
-            # Initialize this claim in our mapping if needed
-            if claim not in claim_to_issues:
-                claim_to_issues[claim] = set()
-            
-            # Get all tags for this event
-            event_tags = set()
-            for tag_col in tag_columns:
-                if event[tag_col] == 1:
-                    # Convert tag column name to readable issue name
-                    issue_name = tag_col[4:].replace('_', ' ').title().replace('Lgbt', 'LGBT').replace('Lgbtplus', 'LGBT+')
-                    if issue_name == 'Musk':
-                        issue_name = 'Musk/DOGE'
-                    event_tags.add(issue_name)
-            
-            # Check for federal budget cuts or Musk mentions to add Musk/DOGE tag
-            target = str(event.get('target', '')).lower()
-            claim_lower = str(claim).lower()
-            
-            if ('federal budget' in target or 'budget cut' in target or 
-                'federal budget' in claim_lower or 'budget cut' in claim_lower or
-                'musk' in target or 'musk' in claim_lower) and 'Musk/DOGE' not in event_tags:
-                event_tags.add('Musk/DOGE')
-            
-            # Special handling for Trump tag
-            if 'Trump' in event_tags:
-                target = str(event.get('target', '')).lower()
-                claim_lower = str(claim).lower()
-                
-                # Only keep Trump tag if it's the ONLY tag AND Trump is specifically mentioned in target or claim
-                if len(event_tags) > 1 or ('trump' not in target and 'trump' not in claim_lower):
-                    event_tags.remove('Trump')
-            
-            # Add all remaining tags to this claim
-            claim_to_issues[claim].update(event_tags)
+        # Issues of every event with a claim, as a boolean frame keyed by issue name
+        events_df = events_df[events_df['claims_summary'].notna()]
+        event_issues = (events_df[tag_columns] == 1)
+        event_issues.columns = [issue_name(tag_col) for tag_col in tag_columns]
         
-        # Create detailed claims data
-        detailed_claims = []
-        for claim, issues in claim_to_issues.items():
-            for issue in issues:
-                detailed_claims.append({
-                    'Claim': claim,
-                    'Claim Count': claim_counts.get(claim, 0) if claim in claim_counts else 0,
-                    'Issue': issue
-                })
+        # Federal budget cuts or Musk mentions also add the Musk/DOGE tag
+        event_issues['Musk/DOGE'] = event_issues.get('Musk/DOGE', False) | mentioned.loc[events_df.index, 'Musk/DOGE']
         
-        # Convert to DataFrame and remove duplicates
-        detailed_df = pd.DataFrame(detailed_claims).drop_duplicates()
+        # Special handling for Trump tag
+        if 'Trump' in event_issues.columns:
+            trump_mentioned = mentioned.loc[events_df.index, 'Trump']
+            event_issues.loc[drop_trump_tag(event_issues, trump_mentioned), 'Trump'] = False
+        
+        # Explode to (claim, issue) pairs and collect each claim's issues,
+        # keeping claims in order of first appearance
+        pairs = event_issues.stack()
+        pairs = pairs[pairs].index
+        pairs = pd.DataFrame({
+            'Claim': events_df['claims_summary'].loc[pairs.get_level_values(0)].values,
+            'Issue': pairs.get_level_values(1)
+        }).drop_duplicates()
+        claim_to_issues = (
+            pairs.groupby('Claim', sort=False)['Issue'].agg(sorted)
+            .reindex(pd.unique(events_df['claims_summary']))
+        )
+        claim_to_issues = claim_to_issues.apply(lambda issues: issues if isinstance(issues, list) else [])
+        claim_count = claim_to_issues.index.map(lambda claim: claim_counts.get(claim, 0))
+        
+        # Create detailed claims data, one row per claim and issue
+        detailed_df = pd.DataFrame({
+            'Claim': claim_to_issues.index,
+            'Claim Count': claim_count,
+            'Issue': claim_to_issues.values
+        }).explode('Issue').dropna(subset=['Issue']).drop_duplicates()
         
         # Save to CSV
         output_file = 'data/detailed_claims_by_issue.csv'
@@ -207,15 +178,11 @@ def main():
         print(f"Saved detailed claims by issue to {output_file}")
         
         # Create a simplified version with claims, counts, and their issues
-        simplified_data = []
-        for claim, issues in claim_to_issues.items():
-            simplified_data.append({
-                'Claim': claim,
-                'Claim Count': claim_counts.get(claim, 0) if claim in claim_counts else 0,
-                'Issues': ', '.join(sorted(issues))  # Join all issues for this claim
-            })
-        
-        simplified_df = pd.DataFrame(simplified_data).sort_values('Claim Count', ascending=False)
+        simplified_df = pd.DataFrame({
+            'Claim': claim_to_issues.index,
+            'Claim Count': claim_count,
+            'Issues': [', '.join(issues) for issues in claim_to_issues]  # Join all issues for this claim
+        }).sort_values('Claim Count', ascending=False)
         
         simplified_output_file = 'data/claims_issue_check.csv'
         simplified_df.to_csv(simplified_output_file, index=False)
@@ -1,110 +1,22 @@
-import pandas as pd
-import json
 from pathlib import Path
-from collections import Counter
+from claim_classifier import claim_flags, political_sentiment
+from claims import load_claims
 
 def main():
-    print("Loading CSV data...")
-    # Load the CSV data with Latin encoding
-    df = pd.read_csv('ccc-phase3-public.csv', encoding='latin1')
-    print(f"Loaded {len(df)} events from CSV")
+    print("Loading claims...")
+    # Split claims from the shared claims tables (built once per data release)
+    claims, dictionary = load_claims()
+    print(f"Loaded {len(claims)} claim mentions of {claims['event_id'].nunique()} events")
 
-    # Extract claims and split by semicolons
+    # The dictionary holds every individual claim with its number of mentions
     print("Analyzing claims_summary field for political orientation...")
-    claims_series = df['claims_summary'].fillna('Unknown')
+    claims_df = dictionary[['claim', 'count']].reset_index(drop=True).sort_values('count', ascending=False)
     
-    # Split all claims by semicolons and create a flat list
-    all_claims = []
-    for claim_text in claims_series:
-        # Split by semicolons and strip whitespace
-        if claim_text != 'Unknown':
-            individual_claims = [c.strip() for c in claim_text.split(';')]
-            all_claims.extend(individual_claims)
-    
-    # Count frequencies using Counter
-    claims_counter = Counter(all_claims)
-    
-    # Convert to DataFrame for easier analysis
-    claims_df = pd.DataFrame({
-        'claim': list(claims_counter.keys()),
-        'count': list(claims_counter.values())
-    }).sort_values('count', ascending=False)
-    
-    # Define keywords for anti-Trump claims
-    anti_trump_keywords = [
-        'against trump', 'against donald trump', 'anti-trump', 'anti trump', 
-        'trump abuse', 'trump\'s abuse', 'against president trump', 
-        'impeach', 'resist', 'resistance', 'not my president'
-    ]
-    
-    # Define keywords for left-leaning claims
-    left_keywords = [
-        'reproductive rights', 'abortion', 'women\'s rights', 'lgbtq', 'gay rights',
-        'trans rights', 'transgender', 'blm', 'black lives matter', 'racial justice',
-        'police brutality', 'defund', 'climate', 'environment', 'green new deal',
-        'healthcare', 'medicare for all', 'universal healthcare', 'living wage',
-        'minimum wage', 'worker', 'union', 'labor rights', 'income inequality',
-        'tax the rich', 'wealth tax', 'student debt', 'free college', 'immigration',
-        'immigrant', 'refugee', 'asylum', 'ice', 'border', 'gun control', 'gun violence',
-        'gun safety', 'palestine', 'palestinian', 'gaza', 'ceasefire', 'against genocide',
-        'indigenous', 'native american', 'voting rights', 'gerrymandering', 'democracy',
-        'progressive', 'liberal', 'socialist', 'social justice', 'equity', 'equality',
-        'against capitalism', 'against pro-life', 'against deportations', 'against border security'
-    ]
-    
-    # Define keywords for right-leaning claims
-    right_keywords = [
-        'pro-trump', 'support trump', 'maga', 'america first', 'stop the steal',
-        'election fraud', 'pro-life', 'against abortion', 'traditional values',
-        'family values', 'religious freedom', 'second amendment', 'gun rights',
-        'border security', 'illegal immigration', 'law and order', 'blue lives matter',
-        'support police', 'anti-socialism', 'anti-communism', 'lower taxes',
-        'small government', 'deregulation', 'free market', 'capitalism',
-        'against cancel culture', 'free speech', 'anti-woke', 'anti-crt',
-        'parental rights', 'school choice', 'against mask mandates', 'against vaccine mandates',
-        'medical freedom', 'pro-israel', 'in solidarity with israel', 'against antisemitism',
-        'against lgbt', 'against lgbtq', 'against transgender', 'against gay', 
-        'against same-sex', 'against gender', 'against pro-choice', 'against reproductive rights',
-        'against women\'s rights', 'pro-life', 'anti-abortion'
-    ]
-    
-    # Helper function to better analyze claim sentiment
-    def analyze_claim_sentiment(claim_text, left_keywords, right_keywords):
-        claim_lower = claim_text.lower()
-        
-        # Check for specific patterns that might be misclassified
-        if ('against' in claim_lower and 'abortion' in claim_lower) or \
-           ('against' in claim_lower and 'pro-choice' in claim_lower) or \
-           ('against' in claim_lower and 'reproductive rights' in claim_lower):
-            return 'right'
-            
-        if ('against' in claim_lower and 'lgbt' in claim_lower) or \
-           ('against' in claim_lower and 'gay' in claim_lower) or \
-           ('against' in claim_lower and 'transgender' in claim_lower):
-            return 'right'
-            
-        # Check for standard keywords
-        left_match = any(keyword.lower() in claim_lower for keyword in left_keywords)
-        right_match = any(keyword.lower() in claim_lower for keyword in right_keywords)
-        
-        if left_match and not right_match:
-            return 'left'
-        elif right_match and not left_match:
-            return 'right'
-        elif left_match and right_match:
-            return 'ambiguous'
-        else:
-            return 'neutral'
-    
-    # Flag claims
-    claims_df['anti_trump'] = claims_df['claim'].apply(
-        lambda x: any(keyword.lower() in x.lower() for keyword in anti_trump_keywords)
-    )
-    
-    # Apply the sentiment analysis function
-    claims_df['sentiment'] = claims_df['claim'].apply(
-        lambda x: analyze_claim_sentiment(x, left_keywords, right_keywords)
-    )
+    # Classify each distinct claim once; claims seen in earlier runs come
+    # from the memo (see the 'political' set of keyword_rules.json)
+    flags = claim_flags(claims_df['claim'])['political']
+    claims_df['anti_trump'] = flags['anti_trump']
+    claims_df['sentiment'] = political_sentiment(flags)
     
     claims_df['left_leaning'] = claims_df['sentiment'] == 'left'
     claims_df['right_leaning'] = claims_df['sentiment'] == 'right'
@@ -1,10 +1,10 @@
-import pandas as pd
 from pathlib import Path
+from ccc_data import load_events
 
 def main():
     print("Loading CSV data...")
-    # Load the CSV data with Latin encoding
-    df = pd.read_csv('ccc-phase3-public.csv', encoding='latin1')
+    # Load the CSV data through the shared cached loader
+    df = load_events()
     print(f"Loaded {len(df)} events from CSV")
 
     # Extract tactics and count frequencies
@@ -0,0 +1,222 @@
+import argparse
+import json
+import re
+import shutil
+import pandas as pd
+from pathlib import Path
+from analyze_protest_tags import add_tags
+from ccc_data import SOURCE_FILE, load_events
+from ccc_store import STORE_DIR, month_of, partition_months, read_partition, write_partition
+from claims import build_claims
+from extract_issue_summary import issue_counts, issue_mentions, issues_json, issues_table
+from filter_left_protests import left_leaning
+from keyword_rules import rules_hash
+from timeline import TIMELINE_DIR, write_timeline
+
+# Incremental ingest of a new CCC release.
+#
+# Every row of a release gets a stable key, and the keys of the previously
+# ingested release are kept in the store. A new release is diffed against
+# them: only added or changed rows are filtered for left-leaning events and
+# tagged, and only the month partitions of the tagged store (see ccc_store.py)
+# that gain or lose rows are rewritten. Each partition keeps partial
+# aggregates (events and participants by date and by tag), so the dashboard's
+# timeline series (with date_counts.json) and protest_issues_summary.json are
+# rebuilt from the partials of unchanged months and the recomputed partials
+# of changed ones.
+#
+# Only those summaries are refreshed: the store is kept apart from the
+# pipeline's tables and no pipeline stage reads it, so every other dashboard
+# file (events table, states, tactics, cube, ...) and the claims analyses
+# still come from the last full build.
+#
+# The store is rebuilt from scratch when the keyword registry changes, since
+# the stored filter and tag results depend on it.
+
+# Kept apart from the pipeline's own tables
+INGEST_DIR = STORE_DIR / 'ingest'
+TABLE = 'tagged'
+KEYS_FILE = INGEST_DIR / 'keys.parquet'
+STATE_FILE = INGEST_DIR / 'ingest-state.json'
+
+# Bump when the stored rows or partials change so old stores are rebuilt
+INGEST_VERSION = 1
+
+# A row is identified by its date, locality, title and sources
+KEY_COLUMNS = ['date', 'locality', 'title']
+SOURCE_COLUMN = re.compile(r'source\d+')
+ID_COLUMNS = ['row_key', 'row_occurrence']
+
+
+def row_keys(df):
+    # Key hash, occurrence and content digest of every row. Recurring events
+    # (weekly vigils and the like) can share all of the key fields, so the
+    # n-th row with a given key hash is told apart by its occurrence n. The
+    # digest covers every column and tells whether a row changed.
+    sources = [col for col in df.columns if SOURCE_COLUMN.fullmatch(col)]
+    key = pd.util.hash_pandas_object(df[KEY_COLUMNS + sources], index=False).to_numpy()
+    return pd.DataFrame({
+        'row_key': key,
+        'row_occurrence': pd.Series(key).groupby(key).cumcount().to_numpy(),
+        'row_digest': pd.util.hash_pandas_object(df, index=False).to_numpy(),
+        'month': month_of(df['date']).to_numpy(),
+    })
+
+
+def row_ids(frame, columns=ID_COLUMNS):
+    return pd.MultiIndex.from_frame(frame[columns])
+
+
+def month_partials(rows):
+    # Events and participants of one partition by date and by tag column
+    # (see extract_issue_summary.issue_counts). Missing size values count as
+    # 11, as in the dashboard.
+    tag_columns = [col for col in rows.columns if col.startswith('tag_')]
+    issues = issue_counts(rows, tag_columns, issue_mentions(rows))
+    dates = (pd.DataFrame({'events': 1, 'participants': rows['size_mean'].fillna(11)})
+             .groupby(rows['date'].dt.strftime('%Y-%m-%d').to_numpy()).sum())
+    return {
+        'dates': {date: [int(row.events), float(row.participants)] for date, row in dates.iterrows()},
+        'issues': {tag_col: [int(row.events), float(row.participants)] for tag_col, row in issues.iterrows()},
+    }
+
+
+def load_state(store_dir):
+    path = Path(store_dir) / STATE_FILE.name
+    if path.exists():
+        with open(path, 'r') as f:
+            state = json.load(f)
+        if (state.get('version') == INGEST_VERSION and state.get('rules') == rules_hash()
+                and state.get('complete')):
+            return state
+    return None
+
+
+def save_state(state, store_dir):
+    with open(Path(store_dir) / STATE_FILE.name, 'w') as f:
+        json.dump(state, f)
+
+
+def ingest(path=SOURCE_FILE, store_dir=INGEST_DIR, workers=1, rebuild=False):
+    """Merge a CCC release into the tagged store; return the store's partials by month."""
+    store_dir = Path(store_dir)
+    keys_file = store_dir / KEYS_FILE.name
+    state = None if rebuild else load_state(store_dir)
+
+    if state is None or not keys_file.exists():
+        # Nothing reusable: start from an empty store
+        print("Starting a new tagged store...")
+        shutil.rmtree(store_dir / TABLE, ignore_errors=True)
+        state = {'version': INGEST_VERSION, 'rules': rules_hash(), 'partials': {}}
+        previous = pd.DataFrame({
+            'row_key': pd.Series(dtype='uint64'), 'row_occurrence': pd.Series(dtype='int64'),
+            'row_digest': pd.Series(dtype='uint64'), 'month': pd.Series(dtype=object),
+            'left': pd.Series(dtype=bool),
+        })
+    else:
+        previous = pd.read_parquet(keys_file)
+
+    df = load_events(path)
+    keys = row_keys(df)
+    print(f"Loaded {len(df)} events from {path}")
+
+    # Rows whose key and content are unchanged keep their earlier result;
+    # earlier rows that are gone or changed are stale
+    versions = ID_COLUMNS + ['row_digest']
+    kept = row_ids(keys, versions).isin(row_ids(previous, versions))
+    stale = previous[~row_ids(previous, versions).isin(row_ids(keys, versions))]
+    keys['left'] = keys.merge(previous[versions + ['left']], on=versions, how='left')['left'].to_numpy()
+    print(f"{int(kept.sum())} unchanged, {int((~kept).sum())} added or changed, {len(stale)} removed or changed events")
+
+    # Filter and tag only the added and changed rows
+    fresh = df[~kept]
+    new_left = fresh.iloc[:0]
+    if len(fresh):
+        is_left = left_leaning(fresh, *build_claims(fresh['claims_summary']), workers=workers)
+        keys.loc[~kept, 'left'] = is_left.to_numpy()
+        new_left = fresh[is_left].copy()
+        add_tags(new_left)
+        new_left['row_key'] = keys.loc[~kept, 'row_key'].to_numpy()[is_left.to_numpy()]
+        new_left['row_occurrence'] = keys.loc[~kept, 'row_occurrence'].to_numpy()[is_left.to_numpy()]
+    keys['left'] = keys['left'].astype(bool)
+
+    # Rewrite the partitions that lose stale rows or gain new ones. The
+    # store is marked incomplete meanwhile, so a run interrupted halfway
+    # through is followed by a full rebuild.
+    store_dir.mkdir(parents=True, exist_ok=True)
+    save_state(dict(state, complete=False), store_dir)
+    stale = stale[stale['left']]
+    new_months = month_of(new_left['date'])
+    months = sorted(set(stale['month']) | set(new_months))
+    for month in months:
+        rows = read_partition(TABLE, month, store_dir)
+        if rows is not None:
+            rows = rows[~row_ids(rows).isin(row_ids(stale))]
+        rows = pd.concat([rows, new_left[(new_months == month).to_numpy()]], ignore_index=True)
+        write_partition(TABLE, month, rows, store_dir)
+        if len(rows):
+            state['partials'][month] = month_partials(rows)
+        else:
+            state['partials'].pop(month, None)
+    print(f"Updated {len(months)} of {len(partition_months(TABLE, store_dir))} monthly partitions")
+
+    keys.to_parquet(keys_file, index=False)
+    save_state(dict(state, complete=True), store_dir)
+
+    return state['partials']
+
+
+def date_counts(partials):
+    # data/date_counts.json from the partials of every month
+    dates = {date: values for month in sorted(partials) for date, values in partials[month]['dates'].items()}
+    return {
+        'counts': {date: dates[date][0] for date in sorted(dates)},
+        'participants': {date: int(round(dates[date][1])) for date in sorted(dates)},
+    }
+
+
+def daily_totals(partials):
+    # Events and participants of every day, as timeline.daily_totals() gives
+    # them, from the partials of every month
+    dates = {date: values for partial in partials.values() for date, values in partial['dates'].items()}
+    daily = pd.DataFrame.from_dict(dates, orient='index', columns=['events', 'participants'])
+    daily.index = pd.DatetimeIndex(daily.index)
+    return daily.sort_index().resample('D').sum()
+
+
+def issues_summary(partials):
+    # data/protest_issues_summary.json from the partials of every month
+    counts = pd.concat([
+        pd.DataFrame.from_dict(partial['issues'], orient='index', columns=['events', 'participants'])
+        for partial in partials.values()
+    ]).groupby(level=0, sort=False).sum()
+    return issues_json(issues_table(counts).sort_values('Event Count', ascending=False))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge a new CCC release into the ingest store, processing only new or changed events, and rebuild the timeline and issue summaries.")
+    parser.add_argument('path', nargs='?', default=SOURCE_FILE, help=f"CCC release CSV (default: {SOURCE_FILE})")
+    parser.add_argument('--workers', type=int, default=1,
+                        help="number of processes used to classify claims not seen in earlier runs")
+    parser.add_argument('--rebuild', action='store_true', help="discard the store and ingest every event")
+    args = parser.parse_args()
+
+    partials = ingest(args.path, workers=args.workers, rebuild=args.rebuild)
+    if not partials:
+        print("No left-leaning events in the store")
+        return
+
+    Path('data').mkdir(exist_ok=True)
+    with open('data/date_counts.json', 'w') as f:
+        json.dump(date_counts(partials), f)
+    print("Saved date counts to data/date_counts.json")
+
+    write_timeline(daily_totals(partials))
+    print(f"Saved timeline series to {TIMELINE_DIR}")
+
+    with open('data/protest_issues_summary.json', 'w') as f:
+        json.dump(issues_summary(partials), f)
+    print("Saved protest issues summary JSON to data/protest_issues_summary.json")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+// Reader for the column-oriented binary files written by columnar.py.
+// Numeric columns and dictionary codes are returned as typed-array views over
+// the downloaded buffer, so nothing is copied or parsed per row.
+
+const COLUMNAR_MAGIC = 'CCCB';
+
+const TYPED_ARRAYS = {
+    int8: Int8Array, uint8: Uint8Array, int16: Int16Array, uint16: Uint16Array,
+    int32: Int32Array, uint32: Uint32Array, float32: Float32Array, float64: Float64Array
+};
+
+// Decode a string column: get(i) returns the i-th value
+function stringColumn(bodyView, entry) {
+    const offsets = bodyView(entry.offsets);
+    const data = bodyView(entry.data);
+    const decoder = new TextDecoder();
+    return {
+        offsets,
+        data,
+        get: i => decoder.decode(data.subarray(offsets[i], offsets[i + 1]))
+    };
+}
+
+// Parse a columnar file into {rows, metadata, columns}
+function readColumnar(buffer) {
+    const bytes = new Uint8Array(buffer);
+    const magic = String.fromCharCode(...bytes.subarray(0, 4));
+    if (magic !== COLUMNAR_MAGIC) {
+        throw new Error('Not a columnar data file');
+    }
+
+    const headerLength = new DataView(buffer).getUint32(4, true);
+    const header = JSON.parse(new TextDecoder().decode(bytes.subarray(8, 8 + headerLength)));
+    const bodyStart = 8 + headerLength;
+
+    // Typed-array view of one buffer described in the header
+    const bodyView = ({ dtype, offset, length }) =>
+        new TYPED_ARRAYS[dtype](buffer, bodyStart + offset, length);
+
+    const columns = {};
+    for (const entry of header.columns) {
+        if (entry.type === 'numeric') {
+            columns[entry.name] = bodyView(entry.data);
+        } else if (entry.type === 'dict') {
+            const codes = bodyView(entry.codes);
+            const dictionary = entry.dictionary;
+            columns[entry.name] = {
+                codes,
+                dictionary,
+                get: i => (codes[i] < 0 ? null : dictionary[codes[i]])
+            };
+        } else if (entry.type === 'string') {
+            columns[entry.name] = stringColumn(bodyView, entry);
+        } else if (entry.type === 'list') {
+            const offsets = bodyView(entry.offsets);
+            const items = stringColumn(bodyView, entry.items);
+            columns[entry.name] = {
+                offsets,
+                items,
+                get: i => {
+                    const values = [];
+                    for (let k = offsets[i]; k < offsets[i + 1]; k++) {
+                        values.push(items.get(k));
+                    }
+                    return values;
+                }
+            };
+        }
+    }
+
+    return { rows: header.rows, metadata: header.metadata || {}, columns };
+}
+
+// Fetch and parse a columnar file
+async function fetchColumnar(url) {
+    const response = await fetch(url);
+    return readColumnar(await response.arrayBuffer());
+}
@@ -0,0 +1,102 @@
+// Web Worker behind the dashboard's crossfilter mode. It holds the aggregate
+// cube (see build_cube.py) and answers each selection with the data of every
+// chart, in the shapes of the published JSON files, so the main thread only
+// has to draw.
+importScripts('columnar.js', 'cube.js', 'timeline.js');
+
+let cube = null;
+
+// Cube filters of a selection ({dateRange, state, tag}), optionally leaving
+// out one dimension
+function cubeFilters(filters, except = null) {
+    const result = {};
+    if (filters.dateRange && except !== 'date') {
+        const [start, end] = filters.dateRange;
+        result.date = date => date !== null && date >= start && date <= end;
+    }
+    if (filters.state && except !== 'state') {
+        result.state = [filters.state];
+    }
+    if (filters.tag && except !== 'tag') {
+        result.tag = [filters.tag];
+    }
+    return result;
+}
+
+// Data of every chart under a selection, with the events chart's series in
+// the named resolution. Each chart is filtered by every selection but its
+// own, which it highlights instead.
+function dashboardData(filters, timelineName) {
+    const byDate = queryCube(cube, cubeFilters(filters, 'date'), 'date');
+    const byState = queryCube(cube, cubeFilters(filters, 'state'), 'state');
+    const byTag = queryCube(cube, cubeFilters(filters, 'tag'), 'tag');
+    const byTactics = queryCube(cube, cubeFilters(filters), 'tactics');
+
+    // The events chart's series at the requested resolution (see
+    // timeline.js), over every day of the cube
+    const days = [];
+    const dayCounts = [];
+    const dayParticipants = [];
+    byDate.members.forEach((date, i) => {
+        if (date !== null) {
+            days.push(date);
+            dayCounts.push(byDate.events[i]);
+            dayParticipants.push(byDate.participants[i]);
+        }
+    });
+    const timeline = timelineSeries(days, dayCounts, dayParticipants, timelineName);
+
+    // As in states.json and states_size.json
+    const states = {};
+    const statesSize = {};
+    byState.members.forEach((state, i) => {
+        if (state !== null && byState.events[i] > 0) {
+            states[state] = byState.events[i];
+            statesSize[state] = byState.participants[i] / byState.events[i];
+        }
+    });
+
+    // As in tactics_analysis.json
+    const tacticsDimension = cube.dimensions.find(dimension => dimension.name === 'tactics');
+    const totalEvents = byTactics.events.reduce((sum, count) => sum + count, 0);
+    const tacticCounts = tacticsDimension.shown.map(name => {
+        const bit = tacticsDimension.bits[name];
+        return byTactics.members.reduce((sum, mask, i) => ((mask & bit) !== 0 ? sum + byTactics.events[i] : sum), 0);
+    });
+    const tactics = {
+        labels: tacticsDimension.shown.map(name => tacticsDimension.labels[name]),
+        percentages: tacticCounts.map(count => (totalEvents ? (count / totalEvents) * 100 : 0)),
+        counts: tacticCounts
+    };
+
+    // As in protest_issues_summary.json, in the cube's tag order
+    const all = byTag.members.indexOf(CUBE_ALL_TAGS);
+    const percentage = (value, total) => (total ? Math.round((value / total) * 10000) / 100 : 0);
+    const issues = { tags: [], counts: [], percentages: [], participantCounts: [], percentagesByParticipants: [] };
+    byTag.members.forEach((tag, i) => {
+        if (i !== all) {
+            issues.tags.push(tag);
+            issues.counts.push(byTag.events[i]);
+            issues.percentages.push(percentage(byTag.events[i], byTag.events[all]));
+            issues.participantCounts.push(Math.floor(byTag.participants[i]));
+            issues.percentagesByParticipants.push(percentage(byTag.participants[i], byTag.participants[all]));
+        }
+    });
+
+    return { timeline, states, statesSize, tactics, issues };
+}
+
+onmessage = async ({ data }) => {
+    if (data.type === 'load') {
+        try {
+            cube = await fetchCube(data.url);
+            postMessage({ type: 'ready' });
+        } catch (error) {
+            postMessage({ type: 'error', message: error.message });
+        }
+    } else if (data.type === 'query') {
+        const start = performance.now();
+        const results = dashboardData(data.filters, data.timeline);
+        postMessage({ type: 'result', id: data.id, results, elapsed: performance.now() - start });
+    }
+};
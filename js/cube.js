@@ -0,0 +1,86 @@
+// Reader for the aggregate cube written by build_cube.py: event counts and
+// participant sums over date x state x tag x tactics, as flat typed arrays in
+// row-major order (see build_cube.py for the dimensions). Any slice of the
+// data is answered by summing cells, without fetching events. Needs
+// columnar.js.
+
+const CUBE_ALL_TAGS = 'All';
+
+// Parse a cube file into {dimensions, strides, events, participants}
+function readCube(buffer) {
+    const { metadata, columns } = readColumnar(buffer);
+    const dimensions = metadata.dimensions;
+
+    // Distance between consecutive members of each dimension in the flat arrays
+    const strides = new Array(dimensions.length);
+    let stride = 1;
+    for (let d = dimensions.length - 1; d >= 0; d--) {
+        strides[d] = stride;
+        stride *= dimensions[d].values.length;
+    }
+
+    return { dimensions, strides, events: columns.events, participants: columns.participants };
+}
+
+// Fetch and parse a cube file
+async function fetchCube(url) {
+    const response = await fetch(url);
+    return readCube(await response.arrayBuffer());
+}
+
+// Filter of the tactics dimension: the masks that include the named tactic
+function cubeHasTactic(cube, name) {
+    const bit = cube.dimensions.find(dimension => dimension.name === 'tactics').bits[name];
+    return mask => (mask & bit) !== 0;
+}
+
+// Sum events and participants over the cells kept by the filters, either in
+// total or per member of the groupBy dimension. Filters map a dimension name
+// to a list of members or a predicate on a member. Events count once under
+// each of their tags, so unless it is filtered or grouped by, the tag
+// dimension is limited to the 'All' member.
+// Returns {members, events, participants}; members is null without groupBy.
+function queryCube(cube, filters = {}, groupBy = null) {
+    const groupDim = groupBy === null ? -1 : cube.dimensions.findIndex(dimension => dimension.name === groupBy);
+    if (groupBy !== null && groupDim < 0) {
+        throw new Error(`Unknown cube dimension: ${groupBy}`);
+    }
+
+    // Positions of the kept members of each dimension
+    const selected = cube.dimensions.map(dimension => {
+        let filter = filters[dimension.name];
+        if (filter === undefined && dimension.name === 'tag' && groupBy !== 'tag') {
+            filter = [CUBE_ALL_TAGS];
+        }
+        const kept = [];
+        dimension.values.forEach((member, i) => {
+            if (filter === undefined || (typeof filter === 'function' ? filter(member) : filter.includes(member))) {
+                kept.push(i);
+            }
+        });
+        return kept;
+    });
+
+    const size = groupDim < 0 ? 1 : cube.dimensions[groupDim].values.length;
+    const events = new Float64Array(size);
+    const participants = new Float64Array(size);
+    const last = selected.length - 1;
+
+    // Walk the kept cells dimension by dimension, adding up the innermost ones
+    const visit = (d, offset, group) => {
+        const stride = cube.strides[d];
+        for (const i of selected[d]) {
+            const cell = offset + i * stride;
+            const g = d === groupDim ? i : group;
+            if (d === last) {
+                events[g] += cube.events[cell];
+                participants[g] += cube.participants[cell];
+            } else {
+                visit(d + 1, cell, g);
+            }
+        }
+    };
+    visit(0, 0, 0);
+
+    return { members: groupDim < 0 ? null : cube.dimensions[groupDim].values, events, participants };
+}
@@ -1,11 +1,37 @@
-// Function to fetch JSON data
-async function fetchData(url) {
-    // Add a timestamp to prevent caching issues on GitHub Pages
-    const cacheBuster = `?t=${new Date().getTime()}`;
-    const response = await fetch(url + cacheBuster);
+// Manifest of the published data files (written by publish.py). Every file
+// it points to has its content hash in its name and never changes, so only
+// the manifest itself is revalidated on each visit.
+let dataManifest = null;
+
+function loadDataManifest() {
+    if (!dataManifest) {
+        dataManifest = fetch('data/manifest.json', { cache: 'no-cache' })
+            .then(response => response.json())
+            .catch(error => {
+                dataManifest = null; // allow a retry on the next request
+                throw error;
+            });
+    }
+    return dataManifest;
+}
+
+// Function to fetch a published JSON file by its path under data/
+async function fetchFile(path) {
+    const response = await fetch(`data/${path}`);
     return response.json();
 }
 
+// Function to fetch JSON data by its name in the manifest. The data of the
+// summary cards and charts comes bundled in the manifest, so the first paint
+// needs no request besides the manifest itself.
+async function fetchData(name) {
+    const manifest = await loadDataManifest();
+    if (manifest.bundle && name in manifest.bundle) {
+        return manifest.bundle[name];
+    }
+    return fetchFile(manifest.files[name]);
+}
+
 // Function to format numbers
 function formatNumber(num) {
     return num ? num.toLocaleString() : 'N/A';
@@ -20,7 +46,7 @@ function truncateText(text, maxLength = 50) {
 // Load and display summary statistics
 async function loadSummaryStats() {
     try {
-        const stats = await fetchData('data/summary_stats.json');
+        const stats = await fetchData('summary_stats');
         const statsContainer = document.getElementById('summary-stats');
         
         // Create stats cards
@@ -70,24 +96,23 @@ async function loadSummaryStats() {
         `;
         statsContainer.innerHTML += protestTagsHtml;
         
-        // Load the protest issues chart after a short delay to ensure the DOM is updated
-        setTimeout(() => {
-            loadProtestIssuesChart();
-            
-            // Add event listener to the second switch
-            const issuesViewSwitch = document.getElementById('protestIssuesViewSwitch');
-            if (issuesViewSwitch) {
-                issuesViewSwitch.addEventListener('change', function() {
-                    // Update the main switch to match
-                    const mainSwitch = document.getElementById('protestTagsViewSwitch');
-                    if (mainSwitch) {
-                        mainSwitch.checked = this.checked;
-                        // Trigger the change event on the main switch
-                        mainSwitch.dispatchEvent(new Event('change'));
-                    }
-                });
-            }
-        }, 100);
+        // The chart's canvas is in the DOM as soon as innerHTML is set, so
+        // the chart is drawn right away
+        loadProtestIssuesChart();
+        
+        // Add event listener to the second switch
+        const issuesViewSwitch = document.getElementById('protestIssuesViewSwitch');
+        if (issuesViewSwitch) {
+            issuesViewSwitch.addEventListener('change', function() {
+                // Update the main switch to match
+                const mainSwitch = document.getElementById('protestTagsViewSwitch');
+                if (mainSwitch) {
+                    mainSwitch.checked = this.checked;
+                    // Trigger the change event on the main switch
+                    mainSwitch.dispatchEvent(new Event('change'));
+                }
+            });
+        }
     } catch (error) {
         console.error('Error loading summary stats:', error);
         document.getElementById('summary-stats').innerHTML = `
@@ -100,81 +125,136 @@ async function loadSummaryStats() {
     }
 }
 
-// Load and display events by day chart with toggle for events/participants
-async function loadEventsChart() {
-    try {
-        const dateData = await fetchData('data/date_counts.json');
-        
-        // Prepare data for Chart.js
-        const dates = Object.keys(dateData.counts).sort();
-        const eventCounts = dates.map(date => dateData.counts[date]);
-        const participantCounts = dates.map(date => dateData.participants[date] || 0);
-        
-        // Create chart
-        const ctx = document.getElementById('eventsChart').getContext('2d');
-        let eventsChart;
-        
-        // Function to create or update the chart
-        const updateChart = (byParticipants = false) => {
-            const data = byParticipants ? participantCounts : eventCounts;
-            const label = byParticipants ? 'Number of Participants' : 'Number of Events';
-            const color = byParticipants ? 
-                { bg: 'rgba(255, 99, 132, 0.5)', border: 'rgba(255, 99, 132, 1)' } : 
-                { bg: 'rgba(54, 162, 235, 0.5)', border: 'rgba(54, 162, 235, 1)' };
-            
-            // If chart exists, destroy it first
-            if (eventsChart) {
-                eventsChart.destroy();
-            }
-            
-            // Create new chart
-            eventsChart = new Chart(ctx, {
-                type: 'bar',
-                data: {
-                    labels: dates,
-                    datasets: [{
-                        label: label,
-                        data: data,
-                        backgroundColor: color.bg,
-                        borderColor: color.border,
-                        borderWidth: 1
-                    }]
+// Colors of the bars of a chart, dimming the bars outside the crossfilter
+// selection of the chart (see crossfilterSelected); all bars keep their
+// color while nothing is selected
+function selectionColors(labels, isSelected, color) {
+    return labels.map((label, i) => {
+        if (isSelected && !isSelected(label)) {
+            return 'rgba(200, 200, 200, 0.5)';
+        }
+        return typeof color === 'function' ? color(i) : color;
+    });
+}
+
+// Events over time chart and the series it shows (see js/timeline.js)
+let eventsChart = null;
+let eventsChartSeries = null;
+
+// Series the events chart shows: the resolution picked in its selector, or
+// in 'auto' the overview series that fits the chart's width
+function eventsTimelineName() {
+    const selector = document.getElementById('eventsResolution');
+    const resolution = selector ? selector.value : 'auto';
+    if (resolution !== 'auto') {
+        return resolution;
+    }
+    const canvas = document.getElementById('eventsChart');
+    return timelineOverview(canvas && canvas.clientWidth ? canvas.clientWidth : 1200);
+}
+
+// Name of a timeline series in the data manifest
+function timelineDataName(name) {
+    return `timeline_${name.replace('-', '_')}`;
+}
+
+// Draw the events chart, or update it in place with a new series
+function renderEventsChart(series = eventsChartSeries) {
+    eventsChartSeries = series;
+    const viewSwitch = document.getElementById('eventsByDayViewSwitch');
+    const byParticipants = viewSwitch ? viewSwitch.checked : false;
+
+    // Prepare data for Chart.js
+    const { dates, values: data } = byParticipants ? series.participants : series.counts;
+    const label = byParticipants ? 'Number of Participants' : 'Number of Events';
+    const color = byParticipants ? 
+        { bg: 'rgba(255, 99, 132, 0.5)', border: 'rgba(255, 99, 132, 1)' } : 
+        { bg: 'rgba(54, 162, 235, 0.5)', border: 'rgba(54, 162, 235, 1)' };
+
+    const backgroundColor = selectionColors(dates, crossfilterSelected('date', series.resolution), color.bg);
+
+    if (eventsChart) {
+        eventsChart.data.labels = dates;
+        Object.assign(eventsChart.data.datasets[0], { label, data, backgroundColor, borderColor: color.border });
+        eventsChart.options.scales.y.title.text = label;
+        eventsChart.update();
+        return;
+    }
+
+    // Create chart
+    const ctx = document.getElementById('eventsChart').getContext('2d');
+    eventsChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: dates,
+            datasets: [{
+                label: label,
+                data: data,
+                backgroundColor: backgroundColor,
+                borderColor: color.border,
+                borderWidth: 1
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            // In crossfilter mode a click selects the days of a bar,
+            // shift-click extends the selection to them
+            onClick: (event, elements) => {
+                if (elements.length) {
+                    const date = eventsChart.data.labels[elements[0].index];
+                    selectDates(timelineRange(date, eventsChartSeries.resolution), event.native.shiftKey);
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    title: {
+                        display: true,
+                        text: label
+                    }
                 },
-                options: {
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    scales: {
-                        y: {
-                            beginAtZero: true,
-                            title: {
-                                display: true,
-                                text: label
-                            }
-                        },
-                        x: {
-                            title: {
-                                display: true,
-                                text: 'Date'
-                            },
-                            ticks: {
-                                maxRotation: 90,
-                                minRotation: 45
-                            }
-                        }
+                x: {
+                    title: {
+                        display: true,
+                        text: 'Date'
+                    },
+                    ticks: {
+                        maxRotation: 90,
+                        minRotation: 45
                     }
                 }
-            });
-        };
-        
-        // Initial chart creation
-        updateChart(false);
+            }
+        }
+    });
+}
+
+// Fetch and draw the series picked for the events chart; in crossfilter
+// mode the worker computes it instead
+async function loadEventsTimeline() {
+    if (crossfilter.enabled) {
+        applyCrossfilter();
+        return;
+    }
+    renderEventsChart(await fetchData(timelineDataName(eventsTimelineName())));
+}
+
+// Load and display events over time chart with toggles for the resolution
+// and for events/participants
+async function loadEventsChart() {
+    try {
+        await loadEventsTimeline();
         
         // Add event listener to the switch
         const viewSwitch = document.getElementById('eventsByDayViewSwitch');
         if (viewSwitch) {
-            viewSwitch.addEventListener('change', function() {
-                updateChart(this.checked);
-            });
+            viewSwitch.addEventListener('change', () => renderEventsChart());
+        }
+        const selector = document.getElementById('eventsResolution');
+        if (selector) {
+            selector.addEventListener('change', () => loadEventsTimeline().catch(error => {
+                console.error('Error loading events timeline:', error);
+            }));
         }
     } catch (error) {
         console.error('Error loading events chart:', error);
@@ -182,113 +262,284 @@ async function loadEventsChart() {
 }
 
 
-// Load and display states chart
-async function loadStatesChart() {
-    try {
-        const statesData = await fetchData('data/states.json');
-        const statesSizeData = await fetchData('data/states_size.json');
-        
-        // Sort by count and take top 15
-        const sortedStates = Object.entries(statesData)
-            .sort((a, b) => b[1] - a[1])
-            .slice(0, 15);
-        
-        const labels = sortedStates.map(item => item[0]);
-        const eventCounts = sortedStates.map(item => item[1]);
-        
-        // Get average sizes for the top 15 states by event count
-        const avgSizes = labels.map(state => 
-            statesSizeData[state] ? Math.round(statesSizeData[state]) : 0
-        );
-        
-        // Create chart
-        const ctx = document.getElementById('statesChart').getContext('2d');
-        new Chart(ctx, {
-            type: 'bar',
-            data: {
-                labels: labels,
-                datasets: [
-                    {
-                        label: 'Events by State',
-                        data: eventCounts,
-                        backgroundColor: 'rgba(75, 192, 192, 0.7)',
-                        borderColor: 'rgba(75, 192, 192, 1)',
-                        borderWidth: 1,
-                        yAxisID: 'y'
-                    },
-                    {
-                        label: 'Average Protest Size',
-                        data: avgSizes,
-                        backgroundColor: 'rgba(255, 99, 132, 0.7)',
-                        borderColor: 'rgba(255, 99, 132, 1)',
-                        borderWidth: 1,
-                        type: 'line',
-                        yAxisID: 'y1'
-                    }
-                ]
+// Events by state chart
+let statesChart = null;
+
+// Draw the states chart, or update it in place with new data
+function renderStatesChart(statesData, statesSizeData) {
+    // Sort by count and take top 15
+    const sortedStates = Object.entries(statesData)
+        .sort((a, b) => b[1] - a[1])
+        .slice(0, 15);
+    
+    const labels = sortedStates.map(item => item[0]);
+    const eventCounts = sortedStates.map(item => item[1]);
+    
+    // Get average sizes for the top 15 states by event count
+    const avgSizes = labels.map(state => 
+        statesSizeData[state] ? Math.round(statesSizeData[state]) : 0
+    );
+    const backgroundColor = selectionColors(labels, crossfilterSelected('state'), 'rgba(75, 192, 192, 0.7)');
+
+    if (statesChart) {
+        statesChart.data.labels = labels;
+        Object.assign(statesChart.data.datasets[0], { data: eventCounts, backgroundColor });
+        statesChart.data.datasets[1].data = avgSizes;
+        statesChart.update();
+        return;
+    }
+
+    // Create chart
+    const ctx = document.getElementById('statesChart').getContext('2d');
+    statesChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: labels,
+            datasets: [
+                {
+                    label: 'Events by State',
+                    data: eventCounts,
+                    backgroundColor: backgroundColor,
+                    borderColor: 'rgba(75, 192, 192, 1)',
+                    borderWidth: 1,
+                    yAxisID: 'y'
+                },
+                {
+                    label: 'Average Protest Size',
+                    data: avgSizes,
+                    backgroundColor: 'rgba(255, 99, 132, 0.7)',
+                    borderColor: 'rgba(255, 99, 132, 1)',
+                    borderWidth: 1,
+                    type: 'line',
+                    yAxisID: 'y1'
+                }
+            ]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            // In crossfilter mode a click selects a state
+            onClick: (event, elements) => {
+                if (elements.length) {
+                    selectState(statesChart.data.labels[elements[0].index]);
+                }
             },
-            options: {
-                responsive: true,
-                maintainAspectRatio: false,
-                scales: {
-                    y: {
-                        beginAtZero: true,
-                        position: 'left',
-                        title: {
-                            display: true,
-                            text: 'Number of Events'
-                        }
-                    },
-                    y1: {
-                        beginAtZero: true,
-                        position: 'right',
-                        grid: {
-                            drawOnChartArea: false
-                        },
-                        title: {
-                            display: true,
-                            text: 'Average Protest Size'
-                        }
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    position: 'left',
+                    title: {
+                        display: true,
+                        text: 'Number of Events'
+                    }
+                },
+                y1: {
+                    beginAtZero: true,
+                    position: 'right',
+                    grid: {
+                        drawOnChartArea: false
                     },
-                    x: {
-                        title: {
-                            display: true,
-                            text: 'State'
-                        }
+                    title: {
+                        display: true,
+                        text: 'Average Protest Size'
+                    }
+                },
+                x: {
+                    title: {
+                        display: true,
+                        text: 'State'
                     }
                 }
             }
-        });
+        }
+    });
+}
+
+// Load and display states chart
+async function loadStatesChart() {
+    try {
+        const statesData = await fetchData('states');
+        const statesSizeData = await fetchData('states_size');
+        crossfilter.staticData.states = statesData;
+        crossfilter.staticData.statesSize = statesSizeData;
+        renderStatesChart(statesData, statesSizeData);
     } catch (error) {
         console.error('Error loading states chart:', error);
     }
 }
 
 // Table pagination and search variables
-let allEvents = [];
+let eventsManifest = null;
+const eventShards = new Map();
+let searchIndex = null;
 let currentPage = 1;
 const eventsPerPage = 25;
-let filteredEvents = [];
+let filteredIds = null; // IDs of the matching events; null while no search is active
+let renderToken = 0;
+
+// Fetch one shard of the events table; each shard is requested only once
+function loadEventShard(index) {
+    if (!eventShards.has(index)) {
+        const shard = fetchFile(eventsManifest.pages[index]).catch(error => {
+            eventShards.delete(index); // allow a retry on the next request
+            throw error;
+        });
+        eventShards.set(index, shard);
+    }
+    return eventShards.get(index);
+}
+
+// Events with the given IDs (positions in the date-sorted table), fetching
+// only the shards they fall in
+async function getEventsByIds(ids) {
+    const pageSize = eventsManifest.pageSize;
+    const shardIndexes = [...new Set(ids.map(id => Math.floor(id / pageSize)))];
+    const shards = new Map(await Promise.all(
+        shardIndexes.map(async index => [index, await loadEventShard(index)])
+    ));
+    return ids.map(id => shards.get(Math.floor(id / pageSize))[id % pageSize]);
+}
+
+// Fetch the search index on first use
+function loadSearchIndex() {
+    if (!searchIndex) {
+        searchIndex = fetchFile(eventsManifest.searchIndex)
+            .then(index => ({ tokens: index.tokens, postings: index.postings, decoded: new Map() }))
+            .catch(error => {
+                searchIndex = null; // allow a retry on the next search
+                throw error;
+            });
+    }
+    return searchIndex;
+}
+
+// Sorted event IDs of one token, decoded from its gaps on first use
+function tokenPostings(index, position) {
+    let ids = index.decoded.get(position);
+    if (!ids) {
+        const gaps = index.postings[position];
+        ids = new Uint32Array(gaps.length);
+        let id = 0;
+        for (let i = 0; i < gaps.length; i++) {
+            id += gaps[i];
+            ids[i] = id;
+        }
+        index.decoded.set(position, ids);
+    }
+    return ids;
+}
+
+// Position of the first token not less than value
+function lowerBound(tokens, value) {
+    let low = 0;
+    let high = tokens.length;
+    while (low < high) {
+        const mid = (low + high) >>> 1;
+        if (tokens[mid] < value) {
+            low = mid + 1;
+        } else {
+            high = mid;
+        }
+    }
+    return low;
+}
+
+// Sorted IDs of the events with any token starting with prefix
+function prefixPostings(index, prefix) {
+    const first = lowerBound(index.tokens, prefix);
+    const last = lowerBound(index.tokens, prefix + '\uffff');
+    if (last - first === 1) {
+        return tokenPostings(index, first);
+    }
+
+    // Union of several lists: mark every ID, then collect them in order
+    const seen = new Uint8Array(eventsManifest.total);
+    for (let position = first; position < last; position++) {
+        for (const id of tokenPostings(index, position)) {
+            seen[id] = 1;
+        }
+    }
+    const ids = [];
+    for (let id = 0; id < seen.length; id++) {
+        if (seen[id]) ids.push(id);
+    }
+    return ids;
+}
+
+// Intersection of two sorted ID lists
+function intersectSorted(a, b) {
+    const result = [];
+    let i = 0;
+    let j = 0;
+    while (i < a.length && j < b.length) {
+        if (a[i] < b[j]) {
+            i++;
+        } else if (a[i] > b[j]) {
+            j++;
+        } else {
+            result.push(a[i]);
+            i++;
+            j++;
+        }
+    }
+    return result;
+}
+
+// Split a search into the prefixes to look up. Tokens are runs of letters and
+// digits as in process_data.py, except that a date like 2025-03 is kept whole
+// to match the indexed dates.
+function searchTerms(query) {
+    const terms = [];
+    for (const word of query.toLowerCase().split(/\s+/)) {
+        if (/^\d{4}-[\d-]*$/.test(word)) {
+            terms.push(word);
+        } else {
+            terms.push(...(word.match(/[\p{L}\p{N}]+/gu) || []));
+        }
+    }
+    return terms;
+}
+
+// Sorted IDs of the events matching every term, smallest lists first
+function searchEvents(index, terms) {
+    const lists = [...new Set(terms)]
+        .map(term => prefixPostings(index, term))
+        .sort((a, b) => a.length - b.length);
+    return lists.slice(1).reduce(intersectSorted, Array.from(lists[0]));
+}
+
+// Number of events in the current (possibly filtered) table
+function totalEvents() {
+    return filteredIds ? filteredIds.length : eventsManifest.total;
+}
 
 // Load and display events table with pagination
 async function loadEventsTable() {
     try {
-        // Fetch all events
-        allEvents = await fetchData('data/events_table.json');
-        filteredEvents = [...allEvents];
+        // Fetch the manifest; event shards are fetched as pages are displayed
+        eventsManifest = await fetchData('events');
         
         // Set up search functionality
         const searchInput = document.getElementById('tableSearch');
-        searchInput.addEventListener('input', function() {
-            const searchTerm = this.value.toLowerCase();
-            filteredEvents = allEvents.filter(event => 
-                (event.date && event.date.toLowerCase().includes(searchTerm)) ||
-                (event.locality && event.locality.toLowerCase().includes(searchTerm)) ||
-                (event.state && event.state.toLowerCase().includes(searchTerm)) ||
-                (event.event_type && event.event_type.toLowerCase().includes(searchTerm)) ||
-                (event.targets && event.targets.toLowerCase().includes(searchTerm)) ||
-                (event.claims_summary && event.claims_summary.toLowerCase().includes(searchTerm))
-            );
+        searchInput.addEventListener('input', async function() {
+            const query = this.value;
+            const terms = searchTerms(query);
+            if (terms.length === 0) {
+                filteredIds = null;
+            } else {
+                let index;
+                try {
+                    index = await loadSearchIndex();
+                } catch (error) {
+                    console.error('Error loading search index:', error);
+                    return;
+                }
+                
+                // Ignore results for a search that has since changed
+                if (this.value !== query) return;
+                
+                filteredIds = searchEvents(index, terms);
+            }
             currentPage = 1;
             displayEventsPage();
         });
@@ -302,7 +553,7 @@ async function loadEventsTable() {
         });
         
         document.getElementById('nextPage').addEventListener('click', () => {
-            const totalPages = Math.ceil(filteredEvents.length / eventsPerPage);
+            const totalPages = Math.ceil(totalEvents() / eventsPerPage);
             if (currentPage < totalPages) {
                 currentPage++;
                 displayEventsPage();
@@ -310,7 +561,7 @@ async function loadEventsTable() {
         });
         
         // Display first page
-        displayEventsPage();
+        await displayEventsPage();
     } catch (error) {
         console.error('Error loading events table:', error);
         const tableBody = document.querySelector('#eventsTable tbody');
@@ -325,12 +576,23 @@ async function loadEventsTable() {
 }
 
 // Display current page of events
-function displayEventsPage() {
-    const tableBody = document.querySelector('#eventsTable tbody');
+async function displayEventsPage() {
+    const token = ++renderToken;
+    const total = totalEvents();
     const startIndex = (currentPage - 1) * eventsPerPage;
-    const endIndex = Math.min(startIndex + eventsPerPage, filteredEvents.length);
-    const pageEvents = filteredEvents.slice(startIndex, endIndex);
+    const endIndex = Math.min(startIndex + eventsPerPage, total);
     
+    // IDs of the events on this page
+    const pageIds = [];
+    for (let i = startIndex; i < endIndex; i++) {
+        pageIds.push(filteredIds ? filteredIds[i] : i);
+    }
+    const pageEvents = await getEventsByIds(pageIds);
+    
+    // A newer page was requested while this one was loading
+    if (token !== renderToken) return;
+    
+    const tableBody = document.querySelector('#eventsTable tbody');
     if (pageEvents.length === 0) {
         tableBody.innerHTML = `
             <tr>
@@ -353,87 +615,111 @@ function displayEventsPage() {
     }
     
     // Update pagination info
-    const totalPages = Math.ceil(filteredEvents.length / eventsPerPage);
+    const totalPages = Math.ceil(total / eventsPerPage);
     document.getElementById('pageInfo').textContent = `Page ${currentPage} of ${totalPages || 1}`;
     document.getElementById('tableInfo').textContent = 
-        `Showing ${startIndex + 1}-${endIndex} of ${filteredEvents.length} events`;
+        `Showing ${startIndex + 1}-${endIndex} of ${total} events`;
     
     // Update button states
     document.getElementById('prevPage').disabled = currentPage === 1;
     document.getElementById('nextPage').disabled = currentPage >= totalPages;
+    
+    // Prefetch the shard holding the next page
+    if (endIndex < total) {
+        const nextId = filteredIds ? filteredIds[endIndex] : endIndex;
+        loadEventShard(Math.floor(nextId / eventsManifest.pageSize)).catch(() => {});
+    }
 }
 
 
-// Load and display tactics analysis chart
-async function loadTacticsAnalysisChart() {
-    try {
-        const tacticsData = await fetchData('data/tactics_analysis.json');
-        
-        // Create chart
-        const ctx = document.getElementById('tacticsAnalysisChart').getContext('2d');
-        new Chart(ctx, {
-            type: 'bar',
-            data: {
-                labels: tacticsData.labels,
-                datasets: [{
-                    label: 'Percentage of Events',
-                    data: tacticsData.percentages,
-                    backgroundColor: [
-                        'rgba(255, 99, 132, 0.7)',
-                        'rgba(54, 162, 235, 0.7)',
-                        'rgba(255, 206, 86, 0.7)',
-                        'rgba(75, 192, 192, 0.7)',
-                        'rgba(153, 102, 255, 0.7)',
-                        'rgba(255, 159, 64, 0.7)'
-                    ],
-                    borderColor: [
-                        'rgba(255, 99, 132, 1)',
-                        'rgba(54, 162, 235, 1)',
-                        'rgba(255, 206, 86, 1)',
-                        'rgba(75, 192, 192, 1)',
-                        'rgba(153, 102, 255, 1)',
-                        'rgba(255, 159, 64, 1)'
-                    ],
-                    borderWidth: 1
-                }]
-            },
-            options: {
-                responsive: true,
-                maintainAspectRatio: false,
-                plugins: {
-                    tooltip: {
-                        callbacks: {
-                            label: function(context) {
-                                const label = context.dataset.label || '';
-                                const value = context.raw.toFixed(2) + '%';
-                                const count = tacticsData.counts[context.dataIndex];
-                                return `${label}: ${value} (${count} events)`;
-                            }
+// Tactics analysis chart and the data it shows
+let tacticsChart = null;
+let tacticsChartData = null;
+
+// Draw the tactics analysis chart, or update it in place with new data
+function renderTacticsChart(tacticsData) {
+    tacticsChartData = tacticsData;
+
+    if (tacticsChart) {
+        tacticsChart.data.labels = tacticsData.labels;
+        tacticsChart.data.datasets[0].data = tacticsData.percentages;
+        tacticsChart.update();
+        return;
+    }
+
+    // Create chart
+    const ctx = document.getElementById('tacticsAnalysisChart').getContext('2d');
+    tacticsChart = new Chart(ctx, {
+        type: 'bar',
+        data: {
+            labels: tacticsData.labels,
+            datasets: [{
+                label: 'Percentage of Events',
+                data: tacticsData.percentages,
+                backgroundColor: [
+                    'rgba(255, 99, 132, 0.7)',
+                    'rgba(54, 162, 235, 0.7)',
+                    'rgba(255, 206, 86, 0.7)',
+                    'rgba(75, 192, 192, 0.7)',
+                    'rgba(153, 102, 255, 0.7)',
+                    'rgba(255, 159, 64, 0.7)'
+                ],
+                borderColor: [
+                    'rgba(255, 99, 132, 1)',
+                    'rgba(54, 162, 235, 1)',
+                    'rgba(255, 206, 86, 1)',
+                    'rgba(75, 192, 192, 1)',
+                    'rgba(153, 102, 255, 1)',
+                    'rgba(255, 159, 64, 1)'
+                ],
+                borderWidth: 1
+            }]
+        },
+        options: {
+            responsive: true,
+            maintainAspectRatio: false,
+            plugins: {
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.dataset.label || '';
+                            const value = context.raw.toFixed(2) + '%';
+                            const count = tacticsChartData.counts[context.dataIndex];
+                            return `${label}: ${value} (${count} events)`;
                         }
                     }
-                },
-                scales: {
-                    y: {
-                        beginAtZero: true,
-                        title: {
-                            display: true,
-                            text: 'Percentage of Events'
-                        },
-                        ticks: {
-                            callback: function(value) {
-                                return value + '%';
-                            }
-                        }
+                }
+            },
+            scales: {
+                y: {
+                    beginAtZero: true,
+                    title: {
+                        display: true,
+                        text: 'Percentage of Events'
                     },
-                    x: {
-                        title: {
-                            display: true,
-                            text: 'Tactic'
+                    ticks: {
+                        callback: function(value) {
+                            return value + '%';
                         }
                     }
+                },
+                x: {
+                    title: {
+                        display: true,
+                        text: 'Tactic'
+                    }
                 }
             }
-        });
+        }
+    });
+}
+
+// Load and display tactics analysis chart
+async function loadTacticsAnalysisChart() {
+    try {
+        const tacticsData = await fetchData('tactics_analysis');
+        crossfilter.staticData.tactics = tacticsData;
+        renderTacticsChart(tacticsData);
     } catch (error) {
         console.error('Error loading tactics analysis chart:', error);
     }
@@ -441,140 +727,345 @@ async function loadTacticsAnalysisChart() {
 
 
 
-// Load and display protest issues chart in the summary section
-async function loadProtestIssuesChart() {
-    try {
-        // Use the updated protest_issues_summary.json file instead of protest_tags.json
-        const tagsData = await fetchData('data/protest_issues_summary.json');
-        
-        // Create chart
-        const ctx = document.getElementById('protestIssuesChart');
-        if (!ctx) {
-            console.error('protestIssuesChart element not found');
-            return; // Exit if element doesn't exist yet
-        }
-        
-        // Get the canvas context for 2d drawing
-        const context = ctx.getContext('2d');
-        let protestIssuesChart;
-        
-        // Function to create or update the chart
-        const updateChart = (byParticipants = false) => {
-            const data = byParticipants ? tagsData.percentagesByParticipants : tagsData.percentages;
-            const counts = byParticipants ? tagsData.participantCounts : tagsData.counts;
-            const label = byParticipants ? 'Percentage of Participants' : 'Percentage of Events';
-            const tooltipLabel = byParticipants ? 'participants' : 'events';
-            
-            // Create arrays for sorting while preserving color mapping
-            const sortedIndices = Array.from(Array(tagsData.tags.length).keys())
-                .sort((a, b) => (byParticipants ? 
-                    tagsData.percentagesByParticipants[b] - tagsData.percentagesByParticipants[a] : 
-                    tagsData.percentages[b] - tagsData.percentages[a]));
-            
-            const sortedLabels = sortedIndices.map(i => tagsData.tags[i]);
-            const sortedData = sortedIndices.map(i => data[i]);
-            const sortedCounts = sortedIndices.map(i => counts[i]);
-            
-            // Original color array to maintain consistent colors
-            const colorArray = [
-                'rgba(255, 99, 132, 0.7)',
-                'rgba(54, 162, 235, 0.7)',
-                'rgba(255, 206, 86, 0.7)',
-                'rgba(75, 192, 192, 0.7)',
-                'rgba(153, 102, 255, 0.7)',
-                'rgba(255, 159, 64, 0.7)',
-                'rgba(199, 199, 199, 0.7)',
-                'rgba(83, 102, 255, 0.7)',
-                'rgba(40, 159, 64, 0.7)',
-                'rgba(210, 199, 199, 0.7)',
-                'rgba(255, 99, 132, 0.7)'
-            ];
-            
-            // Map the original colors to the sorted indices
-            const sortedColors = sortedIndices.map(i => colorArray[i % colorArray.length]);
-            
-            // If chart exists, destroy it first
-            if (protestIssuesChart) {
-                protestIssuesChart.destroy();
-            }
-            
-            // Create new chart
-            protestIssuesChart = new Chart(context, {
-                type: 'bar',
-                data: {
-                    labels: sortedLabels,
-                    datasets: [{
-                        label: label,
-                        data: sortedData,
-                        backgroundColor: sortedColors,
-                        borderWidth: 1
-                    }]
-                },
-                options: {
-                    indexAxis: 'y',
-                    responsive: true,
-                    maintainAspectRatio: false,
-                    plugins: {
-                        tooltip: {
-                            callbacks: {
-                                label: function(context) {
-                                    const label = context.dataset.label || '';
-                                    const value = context.raw.toFixed(2) + '%';
-                                    const count = sortedCounts[context.dataIndex];
-                                    return `${label}: ${value} (${count} ${tooltipLabel})`;
-                                }
-                            }
+// Protest issues chart and the data it shows
+let protestIssuesChart = null;
+let protestIssuesData = null;
+
+// Draw the protest issues chart, or update it in place with new data
+function renderProtestIssuesChart(tagsData = protestIssuesData) {
+    protestIssuesData = tagsData;
+    const viewSwitch = document.getElementById('protestIssuesViewSwitch');
+    const byParticipants = viewSwitch ? viewSwitch.checked : false;
+
+    const data = byParticipants ? tagsData.percentagesByParticipants : tagsData.percentages;
+    const counts = byParticipants ? tagsData.participantCounts : tagsData.counts;
+    const label = byParticipants ? 'Percentage of Participants' : 'Percentage of Events';
+    const tooltipLabel = byParticipants ? 'participants' : 'events';
+    
+    // Create arrays for sorting while preserving color mapping
+    const sortedIndices = Array.from(Array(tagsData.tags.length).keys())
+        .sort((a, b) => data[b] - data[a]);
+    
+    const sortedLabels = sortedIndices.map(i => tagsData.tags[i]);
+    const sortedData = sortedIndices.map(i => data[i]);
+    const sortedCounts = sortedIndices.map(i => counts[i]);
+    
+    // Original color array to maintain consistent colors
+    const colorArray = [
+        'rgba(255, 99, 132, 0.7)',
+        'rgba(54, 162, 235, 0.7)',
+        'rgba(255, 206, 86, 0.7)',
+        'rgba(75, 192, 192, 0.7)',
+        'rgba(153, 102, 255, 0.7)',
+        'rgba(255, 159, 64, 0.7)',
+        'rgba(199, 199, 199, 0.7)',
+        'rgba(83, 102, 255, 0.7)',
+        'rgba(40, 159, 64, 0.7)',
+        'rgba(210, 199, 199, 0.7)',
+        'rgba(255, 99, 132, 0.7)'
+    ];
+    
+    // Map the original colors to the sorted indices
+    const sortedColors = selectionColors(sortedLabels, crossfilterSelected('tag'),
+        i => colorArray[sortedIndices[i] % colorArray.length]);
+
+    if (protestIssuesChart) {
+        protestIssuesChart.data.labels = sortedLabels;
+        Object.assign(protestIssuesChart.data.datasets[0], { label, data: sortedData, backgroundColor: sortedColors });
+        protestIssuesChart.options.scales.x.title.text = label;
+        protestIssuesChart.sortedCounts = sortedCounts;
+        protestIssuesChart.tooltipLabel = tooltipLabel;
+        protestIssuesChart.update();
+        return;
+    }
+    
+    // Create chart
+    const ctx = document.getElementById('protestIssuesChart');
+    if (!ctx) {
+        console.error('protestIssuesChart element not found');
+        return; // Exit if element doesn't exist yet
+    }
+    
+    // Get the canvas context for 2d drawing
+    const context = ctx.getContext('2d');
+    protestIssuesChart = new Chart(context, {
+        type: 'bar',
+        data: {
+            labels: sortedLabels,
+            datasets: [{
+                label: label,
+                data: sortedData,
+                backgroundColor: sortedColors,
+                borderWidth: 1
+            }]
+        },
+        options: {
+            indexAxis: 'y',
+            responsive: true,
+            maintainAspectRatio: false,
+            // In crossfilter mode a click selects an issue
+            onClick: (event, elements) => {
+                if (elements.length) {
+                    selectIssue(protestIssuesChart.data.labels[elements[0].index]);
+                }
+            },
+            plugins: {
+                tooltip: {
+                    callbacks: {
+                        label: function(context) {
+                            const label = context.dataset.label || '';
+                            const value = context.raw.toFixed(2) + '%';
+                            const count = protestIssuesChart.sortedCounts[context.dataIndex];
+                            return `${label}: ${value} (${count} ${protestIssuesChart.tooltipLabel})`;
                         }
+                    }
+                }
+            },
+            scales: {
+                x: {
+                    beginAtZero: true,
+                    title: {
+                        display: true,
+                        text: label
                     },
-                    scales: {
-                        x: {
-                            beginAtZero: true,
-                            title: {
-                                display: true,
-                                text: label
-                            },
-                            ticks: {
-                                callback: function(value) {
-                                    return value + '%';
-                                }
-                            }
-                        },
-                        y: {
-                            title: {
-                                display: true,
-                                text: 'Issue'
-                            }
+                    ticks: {
+                        callback: function(value) {
+                            return value + '%';
                         }
                     }
+                },
+                y: {
+                    title: {
+                        display: true,
+                        text: 'Issue'
+                    }
                 }
-            });
-        };
-        
-        // Initial chart creation
-        updateChart(false);
+            }
+        }
+    });
+    // Counts shown in the tooltips, kept with the chart for in-place updates
+    protestIssuesChart.sortedCounts = sortedCounts;
+    protestIssuesChart.tooltipLabel = tooltipLabel;
+}
+
+// Load and display protest issues chart in the summary section
+async function loadProtestIssuesChart() {
+    try {
+        // Use the updated protest_issues_summary.json file instead of protest_tags.json
+        const tagsData = await fetchData('protest_issues_summary');
+        crossfilter.staticData.issues = tagsData;
+        renderProtestIssuesChart(tagsData);
         
         // Add event listener to the switch
         const viewSwitch = document.getElementById('protestIssuesViewSwitch');
         if (viewSwitch) {
-            viewSwitch.addEventListener('change', function() {
-                updateChart(this.checked);
-            });
+            viewSwitch.addEventListener('change', () => renderProtestIssuesChart());
         }
     } catch (error) {
         console.error('Error loading protest issues chart:', error);
     }
 }
 
+// Crossfilter mode: clicking a day, week or month (shift-click to extend
+// the range), a state or an issue filters every chart by it. The charts are re-aggregated
+// from the aggregate cube (see build_cube.py) in a Web Worker
+// (js/crossfilter-worker.js), so the page stays responsive while it sums.
+// Each chart is filtered by the selections in the other charts and
+// highlights its own.
+const crossfilter = {
+    enabled: false,
+    worker: null,
+    ready: null, // resolves once the worker has loaded the cube
+    filters: { dateRange: null, state: null, tag: null },
+    queryId: 0,
+    staticData: {} // published chart data, shown outside crossfilter mode
+};
+
+// Test for the members selected in one chart's dimension, or null. Dates
+// are labels of the given timeline resolution; a week or month is selected
+// when any of its days is.
+function crossfilterSelected(dimension, resolution = 'day') {
+    const { dateRange, state, tag } = crossfilter.filters;
+    if (dimension === 'date' && dateRange) {
+        return label => {
+            const [first, last] = timelineRange(label, resolution);
+            return first <= dateRange[1] && last >= dateRange[0];
+        };
+    }
+    if (dimension === 'state' && state) {
+        return value => value === state;
+    }
+    if (dimension === 'tag' && tag) {
+        return value => value === tag;
+    }
+    return null;
+}
+
+// Start the worker and load the cube into it on first use
+function startCrossfilterWorker() {
+    if (!crossfilter.ready) {
+        const worker = new Worker('js/crossfilter-worker.js');
+        crossfilter.worker = worker;
+        crossfilter.ready = new Promise((resolve, reject) => {
+            worker.onmessage = ({ data }) => {
+                if (data.type === 'ready') {
+                    resolve();
+                } else if (data.type === 'error') {
+                    reject(new Error(data.message));
+                } else if (data.type === 'result') {
+                    showCrossfilterResult(data);
+                }
+            };
+            worker.onerror = event => reject(new Error(event.message));
+        });
+        // The worker resolves URLs against its own location
+        loadDataManifest().then(manifest => worker.postMessage({
+            type: 'load',
+            url: new URL(`data/${manifest.files.cube}`, document.baseURI).href
+        }));
+    }
+    return crossfilter.ready;
+}
+
+// Describe the active filters next to the crossfilter switch
+function updateCrossfilterStatus(message = null) {
+    const { dateRange, state, tag } = crossfilter.filters;
+    const parts = [];
+    if (dateRange) {
+        parts.push(dateRange[0] === dateRange[1] ? dateRange[0] : `${dateRange[0]} to ${dateRange[1]}`);
+    }
+    if (state) parts.push(state);
+    if (tag) parts.push(tag);
+
+    document.getElementById('crossfilterStatus').textContent =
+        message || (parts.length ? `Filtered to ${parts.join(', ')}` : (crossfilter.enabled ? 'No filters' : ''));
+    document.getElementById('clearFilters').disabled = parts.length === 0;
+}
+
+// Ask the worker for the charts' data under the current filters
+function applyCrossfilter() {
+    updateCrossfilterStatus();
+    crossfilter.worker.postMessage({
+        type: 'query',
+        id: ++crossfilter.queryId,
+        filters: crossfilter.filters,
+        timeline: eventsTimelineName()
+    });
+}
+
+// Draw the charts from a worker result
+function showCrossfilterResult({ id, results, elapsed }) {
+    // Skip results overtaken by a newer selection
+    if (id !== crossfilter.queryId || !crossfilter.enabled) return;
+
+    // Issues keep their published order, which their colors follow
+    const order = crossfilter.staticData.issues ? crossfilter.staticData.issues.tags : [];
+    const rank = tag => (order.includes(tag) ? order.indexOf(tag) : order.length);
+    const indices = results.issues.tags.map((tag, i) => i).sort((a, b) => rank(results.issues.tags[a]) - rank(results.issues.tags[b]));
+    const issues = {};
+    for (const [key, values] of Object.entries(results.issues)) {
+        issues[key] = indices.map(i => values[i]);
+    }
+
+    renderEventsChart(results.timeline);
+    renderStatesChart(results.states, results.statesSize);
+    renderTacticsChart(results.tactics);
+    renderProtestIssuesChart(issues);
+    console.debug(`Crossfilter aggregation took ${elapsed.toFixed(1)} ms`);
+}
+
+// Selection handlers of the charts; a second click on a selection clears it
+function selectDates(range, extend) {
+    if (!crossfilter.enabled) return;
+    const current = crossfilter.filters.dateRange;
+    if (extend && current) {
+        crossfilter.filters.dateRange = [
+            range[0] < current[0] ? range[0] : current[0],
+            range[1] > current[1] ? range[1] : current[1]
+        ];
+    } else if (current && current[0] === range[0] && current[1] === range[1]) {
+        crossfilter.filters.dateRange = null;
+    } else {
+        crossfilter.filters.dateRange = range;
+    }
+    applyCrossfilter();
+}
+
+function selectState(state) {
+    if (!crossfilter.enabled) return;
+    crossfilter.filters.state = crossfilter.filters.state === state ? null : state;
+    applyCrossfilter();
+}
+
+function selectIssue(tag) {
+    if (!crossfilter.enabled) return;
+    crossfilter.filters.tag = crossfilter.filters.tag === tag ? null : tag;
+    applyCrossfilter();
+}
+
+// Switch crossfilter mode on or off; off shows the published data again
+async function setCrossfilterMode(enabled) {
+    crossfilter.enabled = enabled;
+    crossfilter.filters = { dateRange: null, state: null, tag: null };
+
+    if (!enabled) {
+        const data = crossfilter.staticData;
+        // The resolution may have changed while the mode was on
+        loadEventsTimeline().catch(error => console.error('Error loading events timeline:', error));
+        if (data.states && data.statesSize) renderStatesChart(data.states, data.statesSize);
+        if (data.tactics) renderTacticsChart(data.tactics);
+        if (data.issues) renderProtestIssuesChart(data.issues);
+        updateCrossfilterStatus();
+        return;
+    }
+
+    updateCrossfilterStatus('Loading...');
+    try {
+        await startCrossfilterWorker();
+    } catch (error) {
+        console.error('Error starting crossfilter mode:', error);
+        crossfilter.worker.terminate();
+        crossfilter.ready = null;
+        crossfilter.enabled = false;
+        document.getElementById('crossfilterSwitch').checked = false;
+        updateCrossfilterStatus(`Error loading crossfilter data: ${error.message}`);
+        return;
+    }
+    if (crossfilter.enabled) {
+        applyCrossfilter();
+    }
+}
+
+// Wire up the crossfilter switch and clear button
+function setUpCrossfilter() {
+    const crossfilterSwitch = document.getElementById('crossfilterSwitch');
+    if (!crossfilterSwitch) return;
+    if (!window.Worker) {
+        crossfilterSwitch.disabled = true;
+        return;
+    }
+    crossfilterSwitch.addEventListener('change', function() {
+        setCrossfilterMode(this.checked);
+    });
+    document.getElementById('clearFilters').addEventListener('click', () => {
+        crossfilter.filters = { dateRange: null, state: null, tag: null };
+        applyCrossfilter();
+    });
+}
+
 // Initialize the dashboard
 async function initDashboard() {
+    setUpCrossfilter();
     try {
+        // The cards and charts draw from the data bundled in the manifest
         await Promise.all([
             loadSummaryStats(),
             loadEventsChart(),
             loadStatesChart(),
-            loadTacticsAnalysisChart(),
-            loadEventsTable()
+            loadTacticsAnalysisChart()
         ]);
+        // The events table then loads on its own, one shard at a time
+        await loadEventsTable();
     } catch (error) {
         console.error('Error initializing dashboard:', error);
     }
@@ -0,0 +1,127 @@
+// Timeline series of the events chart at several resolutions, as written by
+// timeline.py: {resolution, counts: {dates, values}, participants: {dates, values}}.
+// The build writes the series of the published data; this file builds the
+// same series from daily totals for the crossfilter mode, and maps the
+// labels of a series back to the days they cover.
+
+// Points of the overview series (OVERVIEW_POINTS in timeline.py)
+const TIMELINE_OVERVIEW_POINTS = [150, 300, 600];
+
+// Screen pixels per point that keep a bar chart legible
+const TIMELINE_PIXELS_PER_POINT = 4;
+
+// Name of the overview series that fits a chart width
+function timelineOverview(width) {
+    const budget = Math.floor(width / TIMELINE_PIXELS_PER_POINT);
+    const fitting = TIMELINE_OVERVIEW_POINTS.filter(points => points <= budget);
+    return `overview-${fitting.length ? fitting[fitting.length - 1] : TIMELINE_OVERVIEW_POINTS[0]}`;
+}
+
+// Day number of a 'YYYY-MM-DD' date, and back
+function dayNumber(date) {
+    return Date.parse(`${date}T00:00:00Z`) / 86400000;
+}
+
+function dayDate(day) {
+    return new Date(day * 86400000).toISOString().slice(0, 10);
+}
+
+// Label of the period a day falls in: weeks by their Monday, months as 'YYYY-MM'
+function timelineLabel(date, resolution) {
+    if (resolution === 'week') {
+        const day = dayNumber(date);
+        // Day 0 (1970-01-01) was a Thursday
+        return dayDate(day - ((day + 3) % 7));
+    }
+    if (resolution === 'month') {
+        return date.slice(0, 7);
+    }
+    return date;
+}
+
+// First and last day of the period of a label
+function timelineRange(label, resolution) {
+    if (resolution === 'week') {
+        return [label, dayDate(dayNumber(label) + 6)];
+    }
+    if (resolution === 'month') {
+        const [year, month] = label.split('-').map(Number);
+        return [`${label}-01`, new Date(Date.UTC(year, month, 0)).toISOString().slice(0, 10)];
+    }
+    return [label, label];
+}
+
+// Indices of the points kept by Largest-Triangle-Three-Buckets downsampling
+// to threshold points (see lttb() in timeline.py)
+function lttbIndices(x, y, threshold) {
+    const n = x.length;
+    if (threshold >= n || threshold < 3) {
+        return Array.from(x.keys());
+    }
+
+    const buckets = threshold - 2;
+    const picked = [0];
+    let a = 0;
+    for (let i = 0; i < buckets; i++) {
+        const start = Math.floor(i * (n - 2) / buckets) + 1;
+        const end = Math.floor((i + 1) * (n - 2) / buckets) + 1;
+        const nextEnd = Math.min(Math.floor((i + 2) * (n - 2) / buckets) + 1, n);
+
+        let avgX = 0;
+        let avgY = 0;
+        for (let j = end; j < nextEnd; j++) {
+            avgX += x[j];
+            avgY += y[j];
+        }
+        avgX /= nextEnd - end;
+        avgY /= nextEnd - end;
+
+        let best = start;
+        let bestArea = -1;
+        for (let j = start; j < end; j++) {
+            const area = Math.abs((x[a] - avgX) * (y[j] - y[a]) - (x[a] - x[j]) * (avgY - y[a]));
+            if (area > bestArea) {
+                bestArea = area;
+                best = j;
+            }
+        }
+        a = best;
+        picked.push(a);
+    }
+    picked.push(n - 1);
+    return picked;
+}
+
+// Series of a resolution ('day', 'week', 'month' or 'overview-N') from
+// daily totals over consecutive days
+function timelineSeries(dates, counts, participants, name) {
+    if (name.startsWith('overview-')) {
+        const points = Number(name.slice('overview-'.length));
+        const x = dates.map(dayNumber);
+        const downsample = values => {
+            const kept = lttbIndices(x, values, points);
+            return { dates: kept.map(i => dates[i]), values: kept.map(i => Math.round(values[i])) };
+        };
+        return { resolution: 'overview', counts: downsample(counts), participants: downsample(participants) };
+    }
+
+    // Totals per period, in date order
+    const labels = [];
+    const periodCounts = [];
+    const periodParticipants = [];
+    dates.forEach((date, i) => {
+        const label = timelineLabel(date, name);
+        if (labels[labels.length - 1] !== label) {
+            labels.push(label);
+            periodCounts.push(0);
+            periodParticipants.push(0);
+        }
+        periodCounts[periodCounts.length - 1] += counts[i];
+        periodParticipants[periodParticipants.length - 1] += participants[i];
+    });
+    return {
+        resolution: name,
+        counts: { dates: labels, values: periodCounts },
+        participants: { dates: labels.slice(), values: periodParticipants.map(Math.round) }
+    };
+}
@@ -0,0 +1,84 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Multi-keyword matcher used by the tagging and filtering scripts.
+#
+# All keywords of all rules are merged into one trie-shaped regex, so a text is
+# scanned once regardless of how many rules or keywords there are. At each
+# position the regex reports the longest keyword starting there; every shorter
+# keyword contained in it is accounted for by mapping each keyword to the
+# rules of all keywords that are substrings of it. The result is the same as
+# checking `keyword in text` for every keyword of every rule.
+
+
+def _trie_pattern(keywords):
+    """Build a regex alternation shaped like a prefix tree of the keywords."""
+    trie = {}
+    for keyword in keywords:
+        node = trie
+        for ch in keyword:
+            node = node.setdefault(ch, {})
+        node[''] = {}
+
+    def build(node):
+        branches = [re.escape(ch) + build(child) for ch, child in sorted(node.items()) if ch]
+        if not branches:
+            return ''
+        body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+        # A keyword ends here: the longer continuations are optional and
+        # tried first, so the longest keyword wins
+        return f'(?:{body})?' if '' in node else body
+
+    return build(trie)
+
+
+def compile_matcher(rules, lowercase=True):
+    """Compile a {rule name: [keywords]} table into a single matcher.
+
+    Returns a function mapping a text to the set of rule names with at least
+    one keyword occurring in it. With ``lowercase`` the text and keywords are
+    lowercased before matching; otherwise matching is case-sensitive.
+    """
+    keyword_rules = {}
+    for name, keywords in rules.items():
+        for keyword in keywords:
+            keyword = keyword.lower() if lowercase else keyword
+            keyword_rules.setdefault(keyword, set()).add(name)
+
+    # A keyword's match implies a match of every keyword it contains
+    closure = {
+        keyword: frozenset().union(*(names for other, names in keyword_rules.items() if other in keyword))
+        for keyword in keyword_rules
+    }
+
+    pattern = re.compile('(?=(' + _trie_pattern(keyword_rules) + '))')
+
+    def match(text):
+        if not isinstance(text, str):
+            return frozenset()
+        if lowercase:
+            text = text.lower()
+        return frozenset().union(*(closure[keyword] for keyword in set(pattern.findall(text))))
+
+    match.rules = list(rules)
+    return match
+
+
+def match_series(match, series):
+    """Apply a compiled matcher to a Series.
+
+    Returns a DataFrame with one boolean column per rule, aligned to the
+    Series index. Each distinct value is matched only once; missing values
+    match nothing.
+    """
+    codes, uniques = pd.factorize(series)
+    column = {name: i for i, name in enumerate(match.rules)}
+
+    # One extra all-False row at the end, which code -1 (missing) selects
+    table = np.zeros((len(uniques) + 1, len(column)), dtype=bool)
+    for i, text in enumerate(uniques):
+        for name in match(text):
+            table[i, column[name]] = True
+
+    return pd.DataFrame(table[codes], index=series.index, columns=match.rules)
@@ -0,0 +1,66 @@
+import json
+import pandas as pd
+from functools import lru_cache
+from ccc_data import file_hash
+from keyword_matcher import compile_matcher, match_series
+
+# Registry of every keyword rule set, loaded from keyword_rules.json.
+#
+# Each set is {"description", "rules": {rule name: [keywords]}} and may be
+# marked "case_sensitive". All case-insensitive sets are compiled together
+# into one matcher (and the case-sensitive ones into a second), so a single
+# scan of a text returns the matches of every rule of every set. Scripts pick
+# the sets they need from the result.
+
+RULES_FILE = 'keyword_rules.json'
+
+
+@lru_cache(maxsize=None)
+def load_rules():
+    """Return the rule sets of the registry, keyed by set name."""
+    with open(RULES_FILE, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def rule_set(name):
+    """Return the {rule name: [keywords]} table of one rule set."""
+    return load_rules()[name]['rules']
+
+
+def tag_column(tag):
+    """Name of a tag's column in the tagged CSV, e.g. 'LGBT+' -> 'tag_lgbtplus'."""
+    return f'tag_{tag.lower().replace("+", "plus").replace(" ", "_")}'
+
+
+def rules_hash():
+    """Short content hash of the registry, for caches of match results."""
+    return file_hash(RULES_FILE)[:16]
+
+
+# Compiled lazily so each worker process builds its own copy
+@lru_cache(maxsize=None)
+def registry_matchers():
+    matchers = []
+    for case_sensitive in (False, True):
+        rules = {
+            (set_name, rule): keywords
+            for set_name, rule_table in load_rules().items()
+            if rule_table.get('case_sensitive', False) == case_sensitive
+            for rule, keywords in rule_table['rules'].items()
+        }
+        if rules:
+            matchers.append(compile_matcher(rules, lowercase=not case_sensitive))
+    return matchers
+
+
+def match_rules(series):
+    """Match a Series of texts against every rule of every set.
+
+    Returns a boolean DataFrame aligned to the Series index with (set, rule)
+    column pairs, so ``match_rules(texts)['tags']`` has one column per tag.
+    Each distinct text is scanned once per matcher; missing values match
+    nothing.
+    """
+    matches = pd.concat([match_series(match, series) for match in registry_matchers()], axis=1)
+    matches.columns = pd.MultiIndex.from_tuples(matches.columns)
+    return matches
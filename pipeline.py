@@ -0,0 +1,304 @@
+import argparse
+import hashlib
+import json
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from pathlib import Path
+from ccc_data import CACHE_DIR, file_hash
+
+# Incremental build runner. Each stage declares the files it reads and writes;
+# a stage's own script (which holds its keyword tables) and the shared modules
+# it imports count as inputs too. Content hashes of inputs and outputs are
+# recorded after every successful run, and a stage is skipped when nothing it
+# depends on has changed. Stages whose inputs are ready run in parallel.
+# Inputs and outputs are files or directories (the tables of the store).
+
+STATE_FILE = CACHE_DIR / 'pipeline-state.json'
+
+STAGES = [
+    {
+        'name': 'filter',
+        'script': 'filter_left_protests.py',
+        'inputs': [
+            'ccc-phase3-public.csv', 'ccc_data.py', 'ccc_store.py', 'claims.py', 'claim_classifier.py',
+            'keyword_rules.json', 'keyword_rules.py', 'keyword_matcher.py',
+        ],
+        'outputs': ['store/left'],
+    },
+    {
+        'name': 'tag',
+        'script': 'analyze_protest_tags.py',
+        'inputs': ['store/left', 'ccc_store.py', 'keyword_rules.json', 'keyword_rules.py', 'keyword_matcher.py'],
+        'outputs': ['store/tagged', 'data/protest_tags.json'],
+    },
+    {
+        'name': 'dashboard',
+        'script': 'process_data.py',
+        'inputs': [
+            'store/tagged', 'ccc_store.py', 'ccc-phase3-public_details.json', 'aggregates.py', 'tactics.py',
+            'timeline.py',
+        ],
+        'outputs': [
+            'data/date_counts.json', 'data/events', 'data/timeline', 'data/summary_stats.json',
+            'data/event_types.json', 'data/states.json', 'data/states_size.json',
+            'data/tactics.json', 'data/tactics_analysis.json',
+        ],
+    },
+    {
+        'name': 'claims_with_tags',
+        'script': 'extract_claims_with_tags.py',
+        'inputs': ['store/tagged', 'ccc_store.py'],
+        'outputs': ['data/claims_with_tags.csv'],
+    },
+    {
+        'name': 'issue_summary',
+        'script': 'extract_issue_summary.py',
+        'inputs': ['store/tagged', 'ccc_store.py', 'data/claims_with_tags.csv', 'keyword_rules.json', 'keyword_rules.py'],
+        'outputs': [
+            'data/protest_issues_summary.csv', 'data/protest_issues_summary.json',
+            'data/detailed_claims_by_issue.csv', 'data/claims_issue_check.csv',
+        ],
+    },
+    {
+        'name': 'cube',
+        'script': 'build_cube.py',
+        'inputs': [
+            'store/tagged', 'ccc_store.py', 'columnar.py', 'tactics.py', 'extract_issue_summary.py',
+            'keyword_rules.json', 'keyword_rules.py',
+        ],
+        'outputs': ['data/cube.bin'],
+    },
+    {
+        'name': 'publish',
+        'script': 'publish.py',
+        'inputs': [
+            'data/summary_stats.json', 'data/states.json', 'data/states_size.json',
+            'data/tactics_analysis.json', 'data/protest_issues_summary.json', 'data/events', 'data/timeline', 'data/cube.bin',
+            'columnar.py', 'timeline.py',
+        ],
+        'outputs': ['data/manifest.json', 'data/dist'],
+    },
+    # Analysis stages over the full public dataset; not part of the default
+    # dashboard build, run them by name or with --all
+    {
+        'name': 'claims',
+        'script': 'extract_claims.py',
+        'inputs': ['ccc-phase3-public.csv', 'ccc_data.py', 'claims.py'],
+        'outputs': ['data/claims_counts.csv', 'data/claims_counts.json'],
+        'default': False,
+    },
+    {
+        'name': 'claims_detailed',
+        'script': 'extract_claims_detailed.py',
+        'inputs': [
+            'ccc-phase3-public.csv', 'ccc_data.py', 'claims.py', 'claim_classifier.py',
+            'keyword_rules.json', 'keyword_rules.py', 'keyword_matcher.py',
+        ],
+        'outputs': ['data/claims_detailed.csv', 'data/claims_detailed.json', 'data/claim_categories.csv'],
+        'default': False,
+    },
+    {
+        'name': 'political_claims',
+        'script': 'extract_political_claims.py',
+        'inputs': [
+            'ccc-phase3-public.csv', 'ccc_data.py', 'claims.py', 'claim_classifier.py',
+            'keyword_rules.json', 'keyword_rules.py', 'keyword_matcher.py',
+        ],
+        'outputs': [
+            'data/anti_trump_claims.csv', 'data/left_leaning_claims.csv',
+            'data/right_leaning_claims.csv', 'data/ambiguous_claims.csv',
+        ],
+        'default': False,
+    },
+    {
+        'name': 'event_types',
+        'script': 'extract_event_types.py',
+        'inputs': ['ccc-phase3-public.csv', 'ccc_data.py'],
+        'outputs': ['data/event_types_counts.csv'],
+        'default': False,
+    },
+    {
+        'name': 'tactics',
+        'script': 'extract_tactics.py',
+        'inputs': ['ccc-phase3-public.csv', 'ccc_data.py'],
+        'outputs': ['data/tactics_counts.csv'],
+        'default': False,
+    },
+]
+
+
+def stage_inputs(stage):
+    # The script itself is an input: editing a keyword table reruns the stage
+    return [stage['script']] + stage['inputs']
+
+
+def upstream(stage, stages):
+    # Names of the stages that produce any of this stage's inputs
+    return {
+        other['name'] for other in stages
+        if other is not stage and set(other['outputs']) & set(stage['inputs'])
+    }
+
+
+def select_stages(names, run_all):
+    # The requested stages plus everything they depend on, in declaration order
+    by_name = {stage['name']: stage for stage in STAGES}
+    unknown = [name for name in names if name not in by_name]
+    if unknown:
+        sys.exit(f"Unknown stage(s): {', '.join(unknown)}. Available: {', '.join(by_name)}")
+
+    if names:
+        wanted = set(names)
+    elif run_all:
+        wanted = set(by_name)
+    else:
+        wanted = {stage['name'] for stage in STAGES if stage.get('default', True)}
+
+    pending = list(wanted)
+    while pending:
+        for name in upstream(by_name[pending.pop()], STAGES):
+            if name not in wanted:
+                wanted.add(name)
+                pending.append(name)
+
+    return [stage for stage in STAGES if stage['name'] in wanted]
+
+
+def content_hash(path):
+    # A directory hashes the names and contents of the files in it
+    path = Path(path)
+    if not path.is_dir():
+        return file_hash(path)
+    digest = hashlib.sha256()
+    for file in sorted(p for p in path.rglob('*') if p.is_file()):
+        digest.update(f'{file.relative_to(path)}:{file_hash(file)}\n'.encode())
+    return digest.hexdigest()
+
+
+def fingerprint(paths):
+    # Content hashes of the given files and directories; None for those that don't exist
+    return {path: content_hash(path) if Path(path).exists() else None for path in paths}
+
+
+def load_state():
+    if STATE_FILE.exists():
+        with open(STATE_FILE, 'r') as f:
+            return json.load(f)
+    return {}
+
+
+def save_state(state):
+    CACHE_DIR.mkdir(exist_ok=True)
+    with open(STATE_FILE, 'w') as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+
+
+def run_script(stage):
+    start = time.time()
+    result = subprocess.run(
+        [sys.executable, stage['script']],
+        capture_output=True, text=True
+    )
+    return result, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the data processing pipeline, skipping up-to-date stages.")
+    parser.add_argument('stages', nargs='*', help="stages to build (default: the dashboard stages)")
+    parser.add_argument('--all', action='store_true', help="also build the analysis stages")
+    parser.add_argument('--force', action='store_true', help="rerun stages even if their inputs are unchanged")
+    parser.add_argument('--jobs', type=int, default=4, help="maximum number of stages to run at once")
+    parser.add_argument('--dry-run', action='store_true', help="only report which stages would run")
+    args = parser.parse_args()
+
+    stages = select_stages(args.stages, args.all)
+    state = load_state()
+
+    waiting = {stage['name']: upstream(stage, stages) for stage in stages}
+    by_name = {stage['name']: stage for stage in stages}
+    failed = set()
+    would_run = set()
+    running = {}
+
+    print("Starting build process...")
+    with ThreadPoolExecutor(max_workers=max(1, args.jobs)) as pool:
+        while waiting or running:
+            # Start every stage whose upstream stages have all finished
+            unfinished = set(waiting) | {name for name, _ in running.values()}
+            for name in [name for name, deps in waiting.items() if not deps & unfinished]:
+                del waiting[name]
+                stage = by_name[name]
+
+                if upstream(stage, stages) & failed:
+                    print(f"[{name}] skipped: an upstream stage failed")
+                    failed.add(name)
+                    continue
+
+                # In a dry run, upstream stages that would run haven't
+                # rewritten their outputs yet, so the inputs can't be compared
+                rerun_upstream = upstream(stage, stages) & would_run
+                if args.dry_run and rerun_upstream:
+                    print(f"[{name}] would run {stage['script']} (after {', '.join(sorted(rerun_upstream))})")
+                    would_run.add(name)
+                    continue
+
+                inputs = fingerprint(stage_inputs(stage))
+                outputs = fingerprint(stage['outputs'])
+                missing = [path for path, digest in inputs.items() if digest is None]
+
+                if missing:
+                    # Without its inputs a stage can't run, but existing outputs
+                    # (e.g. committed intermediates) are still usable downstream
+                    if all(outputs.values()):
+                        print(f"[{name}] missing {', '.join(missing)}; keeping existing outputs")
+                    else:
+                        print(f"[{name}] failed: missing {', '.join(missing)}")
+                        failed.add(name)
+                    continue
+
+                previous = state.get(name, {})
+                if (not args.force and previous.get('inputs') == inputs
+                        and previous.get('outputs') == outputs):
+                    print(f"[{name}] up to date")
+                    continue
+
+                if args.dry_run:
+                    print(f"[{name}] would run {stage['script']}")
+                    would_run.add(name)
+                    continue
+
+                print(f"[{name}] running {stage['script']}...")
+                running[pool.submit(run_script, stage)] = (name, inputs)
+
+            if not running:
+                continue
+
+            done, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in done:
+                name, inputs = running.pop(future)
+                result, elapsed = future.result()
+
+                # Print each stage's output in one block so parallel stages don't interleave
+                for line in (result.stdout + result.stderr).splitlines():
+                    print(f"[{name}] {line}")
+
+                if result.returncode != 0:
+                    print(f"[{name}] failed with exit code {result.returncode}")
+                    failed.add(name)
+                    state.pop(name, None)
+                    continue
+
+                print(f"[{name}] finished in {elapsed:.1f}s")
+                state[name] = {'inputs': inputs, 'outputs': fingerprint(by_name[name]['outputs'])}
+                save_state(state)
+
+    if failed:
+        print(f"Build failed: {', '.join(sorted(failed))}")
+        sys.exit(1)
+
+    print("Build process completed successfully!")
+
+if __name__ == "__main__":
+    main()
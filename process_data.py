@@ -1,7 +1,101 @@
 import pandas as pd
 import json
 import os
+import re
 from pathlib import Path
+from aggregates import aggregate
+from ccc_store import read_table, table_exists
+from tactics import COLUMNS as TACTIC_COLUMNS, tactic_bitmask, tactics_analysis
+from timeline import TIMELINE_DIR, daily_totals, write_timeline
+
+# Number of events per shard of the events table
+EVENTS_PAGE_SIZE = 100
+
+# Fields of the events table covered by the search index, and what counts as
+# a token in them (runs of letters and digits, matched the same way in the
+# dashboard). Each event's date is indexed as a single token as well.
+SEARCH_FIELDS = ['locality', 'state', 'event_type', 'targets', 'claims_summary']
+TOKEN_PATTERN = re.compile(r'[^\W_]+')
+
+# Columns of the tagged events the dashboard uses; no other columns are read
+EVENT_COLUMNS = sorted({
+    'date', 'locality', 'state', 'event_type', 'size_mean', 'targets', 'claims_summary',
+    'participant_measures', *TACTIC_COLUMNS
+})
+
+# Counts, sums and means behind the dashboard JSON files, all computed in one
+# grouped pass over date, state and event type. Events without a size
+# estimate count as 11 participants.
+AGGREGATE_DIMS = ['date', 'state', 'event_type']
+DASHBOARD_AGGREGATES = {
+    'events_by_date': {'agg': 'count', 'by': 'date', 'order': 'key'},
+    'participants_by_date': {'agg': 'sum', 'by': 'date', 'column': 'size_mean', 'fill': 11, 'order': 'key'},
+    'events_by_state': {'agg': 'count', 'by': 'state', 'order': 'desc'},
+    'mean_size_by_state': {'agg': 'mean', 'by': 'state', 'column': 'size_mean', 'fill': 11, 'order': 'key'},
+    'events_by_type': {'agg': 'count', 'by': 'event_type', 'order': 'desc'},
+    'total_events': {'agg': 'count'},
+    'total_size': {'agg': 'sum', 'column': 'size_mean', 'fill': 11},
+}
+
+def write_events_pages(events, events_dir='data/events', page_size=EVENTS_PAGE_SIZE):
+    # Write the events table as fixed-size JSON shards plus a manifest so the
+    # dashboard only downloads the pages it displays
+    events_dir = Path(events_dir)
+    events_dir.mkdir(parents=True, exist_ok=True)
+
+    # Remove shards left over from a larger previous build
+    for old_page in events_dir.glob('page-*.json'):
+        old_page.unlink()
+
+    pages = []
+    for page, start in enumerate(range(0, len(events), page_size)):
+        name = f'page-{page:05d}.json'
+        with open(events_dir / name, 'w') as f:
+            json.dump(events.iloc[start:start + page_size].to_dict(orient='records'), f)
+        pages.append(name)
+
+    manifest = {
+        'total': len(events),
+        'pageSize': page_size,
+        'sortedBy': 'date',
+        'pages': pages,
+        'searchIndex': 'search-index.json'
+    }
+    with open(events_dir / 'manifest.json', 'w') as f:
+        json.dump(manifest, f)
+
+    return manifest
+
+def write_search_index(events, path='data/events/search-index.json', fields=SEARCH_FIELDS):
+    # Inverted index over the events table: each lowercased token maps to the
+    # positions (event IDs) of the events containing it, in the order of the
+    # events shards. Tokens are sorted so the dashboard can find all tokens
+    # starting with a prefix by binary search, and each posting list is
+    # stored as the gaps between consecutive IDs to keep the file small.
+    ids = pd.RangeIndex(len(events))
+    parts = [pd.DataFrame({'token': events['date'].astype(str).str.lower().to_numpy(), 'event': ids})]
+    for field in fields:
+        tokens = events[field].astype(str).str.lower().str.findall(TOKEN_PATTERN)
+        parts.append(pd.DataFrame({'token': tokens.to_numpy(), 'event': ids}).explode('token'))
+
+    pairs = (pd.concat(parts, ignore_index=True)
+             .dropna()
+             .drop_duplicates()
+             .sort_values(['token', 'event'], kind='stable'))
+    # First gap of each list is the first ID itself
+    pairs['gap'] = pairs.groupby('token', sort=False)['event'].diff().fillna(pairs['event']).astype(int)
+    postings = pairs.groupby('token', sort=False)['gap'].agg(list)
+
+    index = {
+        'total': len(events),
+        'fields': ['date'] + list(fields),
+        'tokens': postings.index.tolist(),
+        'postings': postings.tolist()
+    }
+    with open(path, 'w') as f:
+        json.dump(index, f, separators=(',', ':'))
+
+    return index
 
 def main():
     # Create directories for output
@@ -13,25 +107,22 @@ def main():
     with open('ccc-phase3-public_details.json', 'r') as f:
         dataset_details = json.load(f)
 
-    print("Loading CSV data...")
-    # Load the tagged left-leaning protests data with Latin encoding
-    if Path('ccc-phase3-left-tagged.csv').exists():
-        df = pd.read_csv('ccc-phase3-left-tagged.csv', encoding='latin1')
-        print(f"Loaded {len(df)} tagged left-leaning events from CSV")
-    else:
-        df = pd.read_csv('ccc-phase3-left.csv', encoding='latin1')
-        print(f"Loaded {len(df)} left-leaning events from CSV (untagged)")
+    print("Loading event data...")
+    # Load the left-leaning protests from the store, tagged if available
+    table = 'tagged' if table_exists('tagged') else 'left'
+    df = read_table(table, columns=EVENT_COLUMNS)
+    print(f"Loaded {len(df)} left-leaning events from store/{table}")
+
+    # Dates are keyed as text in every output
+    df['date'] = df['date'].dt.strftime('%Y-%m-%d')
+
+    print("Computing aggregates...")
+    aggregates = aggregate(df, DASHBOARD_AGGREGATES, AGGREGATE_DIMS)
 
     # 1. Generate events by day count and participants by day
     print("Generating events by day count and participants by day...")
-    date_counts = df['date'].value_counts().sort_index().to_dict()
-    
-    # Calculate participants by date
-    # Fill missing size values with 11 (default size)
-    df['size_for_calc'] = df['size_mean'].fillna(11)
-    
-    # Group by date and sum the sizes
-    participants_by_date = df.groupby('date')['size_for_calc'].sum().round().astype(int).to_dict()
+    date_counts = aggregates['events_by_date'].to_dict()
+    participants_by_date = aggregates['participants_by_date'].round().astype(int).to_dict()
     
     # Create a combined dictionary with both counts and participants
     date_data = {
@@ -44,29 +135,33 @@ def main():
         json.dump(date_data, f)
     print(f"Saved date counts and participant counts for {len(date_counts)} days")
 
+    # 1b. Timeline series of the events chart by day, week and month, plus
+    # downsampled overviews (see timeline.py)
+    write_timeline(daily_totals(df['date'], df['size_mean']))
+    print(f"Saved timeline series to {TIMELINE_DIR}")
+
     # 2. Create a table of events with key fields
     print("Creating events table...")
     # Select important columns
     key_columns = ['date', 'locality', 'state', 'event_type', 'size_mean', 'targets', 'claims_summary']
-    # Include all events, not just the first 100
-    events_table = df[key_columns].fillna('Unknown').to_dict(orient='records')
+    # Include all events, sorted by date (ties keep their original order)
+    events_table = df[key_columns].sort_values('date', kind='stable').fillna('Unknown')
 
-    # Save events table to JSON
-    with open('data/events_table.json', 'w') as f:
-        json.dump(events_table, f)
-    print(f"Saved details for {len(events_table)} events")
+    # Save events table as paged JSON shards
+    manifest = write_events_pages(events_table)
+    print(f"Saved details for {manifest['total']} events in {len(manifest['pages'])} pages")
+
+    # Search index over the same event IDs
+    search_index = write_search_index(events_table)
+    print(f"Saved search index with {len(search_index['tokens'])} tokens")
 
     # 3. Generate summary statistics
     print("Generating summary statistics...")
     
-    # Calculate total size, using 11 as default where size is unknown
-    df['size_for_total'] = df['size_mean'].fillna(11)
-    total_size = int(df['size_for_total'].sum())
-    
     summary_stats = {
-        'total_events': len(df),
+        'total_events': aggregates['total_events'],
         'unique_locations': df['locality'].nunique(),
-        'total_size': total_size,
+        'total_size': int(aggregates['total_size']),
         'top_targets': df['targets'].value_counts().head(5).to_dict() if 'targets' in df.columns else {},
         'top_claims': {k[:50] + '...' if len(k) > 50 else k: v 
                       for k, v in df['claims_summary'].value_counts().head(5).to_dict().items()},
@@ -77,20 +172,17 @@ def main():
         json.dump(summary_stats, f)
     
     # 4. Generate event types breakdown
-    event_types_data = df['event_type'].value_counts().to_dict()
+    event_types_data = aggregates['events_by_type'].to_dict()
     with open('data/event_types.json', 'w') as f:
         json.dump(event_types_data, f)
     
     # 5. Generate state breakdown
-    state_data = df['state'].value_counts().to_dict()
+    state_data = aggregates['events_by_state'].to_dict()
     with open('data/states.json', 'w') as f:
         json.dump(state_data, f)
     
     # 5b. Generate state size averages
-    # Fill missing size values with 11
-    df['size_for_avg'] = df['size_mean'].fillna(11)
-    # Group by state and calculate average size
-    state_size_data = df.groupby('state')['size_for_avg'].mean().to_dict()
+    state_size_data = aggregates['mean_size_by_state'].to_dict()
     with open('data/states_size.json', 'w') as f:
         json.dump(state_size_data, f)
     
@@ -104,65 +196,9 @@ def main():
     # 7. Generate new tactics analysis
     print("Generating tactics analysis...")
     
-    # Initialize tactics columns
-    df['tactic_demonstration'] = 0
-    df['tactic_march'] = 0
-    df['tactic_counter_protest'] = 0
-    df['tactic_civil_disobedience'] = 0
-    df['tactic_arrests'] = 0
-    df['tactic_vigil'] = 0
-    
-    # Demonstration: includes demonstration, rally, protest
-    demonstration_terms = ['demonstration', 'rally', 'protest']
-    df['tactic_demonstration'] = df['event_type'].fillna('').apply(
-        lambda x: 1 if any(term in x.lower() for term in demonstration_terms) else 0
-    )
-    
-    # March
-    df['tactic_march'] = df['event_type'].fillna('').apply(
-        lambda x: 1 if 'march' in x.lower() else 0
-    )
-    
-    # Counter-protest
-    df['tactic_counter_protest'] = df['event_type'].fillna('').apply(
-        lambda x: 1 if 'counter' in x.lower() else 0
-    )
-    
-    # Civil disobedience
-    df['tactic_civil_disobedience'] = df['event_type'].fillna('').apply(
-        lambda x: 1 if 'civil disobedience' in x.lower() or 'disobedience' in x.lower() else 0
-    )
-    
-    # Arrests (from arrests_any)
-    df['tactic_arrests'] = df['arrests_any']
-    
-    # Vigil (from participant_measures)
-    df['tactic_vigil'] = df['participant_measures'].fillna('').apply(
-        lambda x: 1 if 'vigil' in x.lower() else 0
-    )
-    
-    # Calculate percentages
-    total_events = len(df)
-    tactics_percentages = {
-        'March': (df['tactic_march'].sum() / total_events) * 100,
-        'Counter-Protest': (df['tactic_counter_protest'].sum() / total_events) * 100,
-        'Civil Disobedience': (df['tactic_civil_disobedience'].sum() / total_events) * 100,
-        'Arrests': (df['tactic_arrests'].sum() / total_events) * 100,
-        'Vigil': (df['tactic_vigil'].sum() / total_events) * 100
-    }
-    
-    # Save tactics data to JSON for the dashboard
-    tactics_json = {
-        'labels': list(tactics_percentages.keys()),
-        'percentages': list(tactics_percentages.values()),
-        'counts': [
-            int(df['tactic_march'].sum()),
-            int(df['tactic_counter_protest'].sum()),
-            int(df['tactic_civil_disobedience'].sum()),
-            int(df['tactic_arrests'].sum()),
-            int(df['tactic_vigil'].sum())
-        ]
-    }
+    # One bitmask per event; see tactics.py for the bits
+    df['tactics'] = tactic_bitmask(df)
+    tactics_json = tactics_analysis(df['tactics'])
     
     with open('data/tactics_analysis.json', 'w') as f:
         json.dump(tactics_json, f)
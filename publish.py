@@ -0,0 +1,170 @@
+import hashlib
+import json
+from pathlib import Path
+from columnar import write_precompressed
+from timeline import SERIES_NAMES, TIMELINE_DIR
+
+# Publishes the dashboard's data files under content-addressed names.
+#
+# Each JSON file is re-serialized compactly (no whitespace, floats rounded)
+# and written to data/dist/ as <name>.<hash>.json, with precompressed .gz and
+# .br copies; binary files such as the aggregate cube are copied as they
+# are. A file's name changes exactly when its content does, so browsers
+# and CDNs can cache the files indefinitely. data/manifest.json maps each
+# logical name to its current file; it is the only file the dashboard has to
+# revalidate on every visit.
+#
+# The manifest also bundles the data of the dashboard's summary cards and
+# charts, so the first paint takes a single small request whatever the size
+# of the dataset; the events table and the crossfilter cube are fetched
+# separately afterwards.
+
+DATA_DIR = Path('data')
+DIST_DIR = DATA_DIR / 'dist'
+MANIFEST_FILE = DATA_DIR / 'manifest.json'
+EVENTS_DIR = DATA_DIR / 'events'
+
+# Logical names of the dashboard's files
+ARTIFACTS = {
+    'summary_stats': DATA_DIR / 'summary_stats.json',
+    'states': DATA_DIR / 'states.json',
+    'states_size': DATA_DIR / 'states_size.json',
+    'tactics_analysis': DATA_DIR / 'tactics_analysis.json',
+    'protest_issues_summary': DATA_DIR / 'protest_issues_summary.json',
+    # Series of the events chart; the dashboard fetches the one it shows
+    **{f"timeline_{name.replace('-', '_')}": TIMELINE_DIR / f'{name}.json' for name in SERIES_NAMES},
+}
+
+# Files bundled into the manifest for the dashboard's first paint. The
+# events chart starts from the overview series that fits its width, so all
+# of them are bundled; their size doesn't grow with the span of the data.
+BUNDLED = [
+    'summary_stats', 'states', 'states_size', 'tactics_analysis', 'protest_issues_summary',
+    *[f"timeline_{name.replace('-', '_')}" for name in SERIES_NAMES if name.startswith('overview-')],
+]
+
+# Binary files published as they are
+BINARY_ARTIFACTS = {
+    'cube': DATA_DIR / 'cube.bin',
+}
+
+# Decimal places kept in published floats
+FLOAT_DIGITS = 2
+
+HASH_LENGTH = 12
+
+# Brotli quality of the .br copies. The top quality only pays off for the
+# small chart files; the events shards, search index, cube and manifest are
+# larger or rewritten with every data release, and quality 11 would cost
+# seconds per build for a few percent smaller files.
+BROTLI_QUALITY = 11
+BULK_BROTLI_QUALITY = 9
+
+
+def round_floats(value, digits=FLOAT_DIGITS):
+    # Floats rounded to a few decimals, and written as integers when whole
+    if isinstance(value, float):
+        if value != value or value in (float('inf'), float('-inf')):
+            return value
+        value = round(value, digits)
+        return int(value) if value.is_integer() else value
+    if isinstance(value, dict):
+        return {key: round_floats(item, digits) for key, item in value.items()}
+    if isinstance(value, list):
+        return [round_floats(item, digits) for item in value]
+    return value
+
+
+def publish_bytes(name, payload, suffix, dist_dir=DIST_DIR, brotli_quality=BROTLI_QUALITY):
+    """Write ``payload`` as dist/<name>.<hash><suffix> with .gz/.br copies; return its path under data/."""
+    digest = hashlib.sha256(payload).hexdigest()[:HASH_LENGTH]
+    path = Path(dist_dir) / f'{name}.{digest}{suffix}'
+    # Same name, same content: an existing file is already up to date
+    if not path.exists():
+        path.write_bytes(payload)
+        write_precompressed(path, payload, brotli_quality)
+    return path.relative_to(DATA_DIR).as_posix()
+
+
+def publish(name, data, dist_dir=DIST_DIR, brotli_quality=BROTLI_QUALITY):
+    """Publish ``data`` as compact JSON; return its path under data/."""
+    payload = json.dumps(round_floats(data), separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return publish_bytes(name, payload, '.json', dist_dir, brotli_quality)
+
+
+def publish_events(events_dir=EVENTS_DIR):
+    # The events shards and search index are published first, since the
+    # events manifest lists their published names
+    with open(events_dir / 'manifest.json', 'r') as f:
+        manifest = json.load(f)
+
+    pages = []
+    for page in manifest['pages']:
+        with open(events_dir / page, 'r') as f:
+            pages.append(publish(Path(page).stem, json.load(f), brotli_quality=BULK_BROTLI_QUALITY))
+    with open(events_dir / manifest['searchIndex'], 'r') as f:
+        search_index = publish('search-index', json.load(f), brotli_quality=BULK_BROTLI_QUALITY)
+
+    return publish('events', dict(manifest, pages=pages, searchIndex=search_index), brotli_quality=BULK_BROTLI_QUALITY)
+
+
+def referenced_files(manifest):
+    # Published files a manifest points to, directly or through the events manifest
+    files = set(manifest['files'].values())
+    events = DATA_DIR / manifest['files'].get('events', '')
+    if events.is_file():
+        with open(events, 'r') as f:
+            events_manifest = json.load(f)
+        files |= set(events_manifest['pages']) | {events_manifest['searchIndex']}
+    return files
+
+
+def remove_unreferenced(keep, dist_dir=DIST_DIR):
+    # Files of earlier builds that no manifest points to any more, with
+    # their compressed copies
+    removed = 0
+    for path in dist_dir.iterdir():
+        if path.suffix in ('.gz', '.br'):
+            continue
+        if path.relative_to(DATA_DIR).as_posix() not in keep:
+            for copy in (path, Path(f'{path}.gz'), Path(f'{path}.br')):
+                copy.unlink(missing_ok=True)
+            removed += 1
+    return removed
+
+
+def main():
+    DIST_DIR.mkdir(parents=True, exist_ok=True)
+
+    # Files of the previous manifest stay available, so a page loaded just
+    # before a deploy can still fetch what that manifest points to
+    keep = set()
+    if MANIFEST_FILE.exists():
+        with open(MANIFEST_FILE, 'r') as f:
+            keep = referenced_files(json.load(f))
+
+    files = {}
+    bundle = {}
+    for name, path in ARTIFACTS.items():
+        with open(path, 'r') as f:
+            data = json.load(f)
+        files[name] = publish(name, data)
+        if name in BUNDLED:
+            bundle[name] = round_floats(data)
+    for name, path in BINARY_ARTIFACTS.items():
+        files[name] = publish_bytes(name, path.read_bytes(), path.suffix, brotli_quality=BULK_BROTLI_QUALITY)
+    files['events'] = publish_events()
+
+    manifest = {'files': files, 'bundle': bundle}
+    payload = json.dumps(manifest, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    MANIFEST_FILE.write_bytes(payload)
+    write_precompressed(MANIFEST_FILE, payload, BULK_BROTLI_QUALITY)
+    print(f"Published {len(files)} data files to {DIST_DIR}")
+
+    removed = remove_unreferenced(keep | referenced_files(manifest))
+    if removed:
+        print(f"Removed {removed} files of earlier builds")
+    print(f"Saved manifest with the first-paint bundle ({len(payload) / 1024:.1f} KB) to {MANIFEST_FILE}")
+
+if __name__ == "__main__":
+    main()
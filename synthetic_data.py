@@ -0,0 +1,161 @@
+import argparse
+import csv
+import json
+import numpy as np
+import pandas as pd
+import zlib
+from keyword_rules import load_rules
+
+# Synthetic CCC-shaped datasets for benchmarking.
+#
+# Rows are drawn column by column from the profile of the real dataset in
+# ccc-phase3-public_details.json: each column gets the profiled share of
+# missing values, numbers follow the profiled mean, spread and range, and
+# text columns repeat their profiled top values at the observed rates. The
+# rest of a text column's values are drawn from a long tail of distinct
+# values; for semicolon-separated lists (claims, targets, event types, ...)
+# those are new combinations of the parts of the top values and of claims
+# built from the keyword registry, so filtering and tagging see keyword hits
+# at a realistic rate. Tails of free-text columns grow with the square root
+# of the row count, the way new claims and places keep appearing as a dataset
+# grows.
+
+PROFILE_FILE = 'ccc-phase3-public_details.json'
+
+# Rows generated and written at a time, so 10M-row files fit in memory
+CHUNK_SIZE = 100_000
+
+
+def load_profile(path=PROFILE_FILE):
+    with open(path, 'r') as f:
+        details = json.load(f)
+    return details['basic_info']['num_rows'], details['column_analysis']
+
+
+def keyword_claims():
+    # Claims mentioning each keyword of the registry
+    keywords = sorted({
+        keyword
+        for rule_table in load_rules().values()
+        for keywords in rule_table['rules'].values()
+        for keyword in keywords
+    })
+    claims = [keyword for keyword in keywords if keyword.startswith(('for ', 'against '))]
+    claims += [f'{stance} {keyword}' for keyword in keywords if keyword not in claims for stance in ('for', 'against')]
+    return claims
+
+
+def date_values(stats):
+    # Consecutive days covering the profiled top dates, as many as there
+    # were distinct dates
+    top = pd.to_datetime(list(stats.get('top_3_values', {})) or ['2025-01-20'])
+    span = (top.max() - top.min()).days + 1
+    start = top.min() - pd.Timedelta(days=max(stats['unique_value_count'] - span, 0) // 2)
+    return pd.date_range(start, periods=max(stats['unique_value_count'], span)).strftime('%Y-%m-%d').to_numpy()
+
+
+def numeric_column(rng, stats, n):
+    low, high = stats.get('min_value'), stats.get('max_value')
+    if low is None:
+        return np.full(n, np.nan)
+    mean, median, std = stats['mean_value'], stats.get('median', stats['mean_value']), stats.get('std_dev', 0)
+    if high - low <= 1:
+        # Flags: the high value at the profiled rate
+        values = np.where(rng.random(n) < (mean - low) / max(high - low, 1), high, low)
+    elif median > 0 and mean > median:
+        # Skewed counts such as crowd sizes: lognormal with the profiled median and mean
+        values = rng.lognormal(np.log(median), np.sqrt(2 * np.log(mean / median)), n)
+    else:
+        values = rng.normal(mean, std, n)
+    values = np.clip(values, low, high)
+    if stats['unique_value_count'] <= 10 or stats['data_type'] == 'int64':
+        values = np.round(values)
+    return values.astype('float64')
+
+
+def text_vocabulary(name, stats, rows, scale, claims):
+    # Top values with their share of the present values, and the long tail
+    # of other values of a text column
+    top = stats.get('top_3_values', {})
+    present = rows * max(100 - stats['missing_percentage'], 1e-9) / 100
+    shares = np.array(list(top.values()), dtype='float64') / present
+    p = np.append(shares, max(1 - shares.sum(), 0))
+
+    # Categorical columns (states, dates) don't grow with the data
+    if stats['data_type'] == 'category':
+        scale = 1
+    tail_size = max(int((stats['unique_value_count'] - len(top)) * scale), 1)
+    if any(';' in value for value in top):
+        # Each tail value is a fixed combination of up to four parts
+        parts = sorted({part.strip() for value in top for part in value.split(';')})
+        if name == 'claims_summary':
+            parts += claims
+        rng = np.random.default_rng(zlib.crc32(name.encode()))
+        tail = ['; '.join(rng.choice(parts, size=min(rng.integers(1, 5), len(parts)), replace=False))
+                for _ in range(tail_size)]
+    else:
+        tail = [f'{name} {i}' for i in range(tail_size)]
+    return np.array(list(top), dtype=object), p / p.sum(), np.array(tail, dtype=object)
+
+
+def text_column(rng, vocabulary, n):
+    top, p, tail = vocabulary
+    choice = rng.choice(len(p), size=n, p=p)
+    values = tail[rng.integers(0, len(tail), n)]
+    is_top = choice < len(top)
+    values[is_top] = top[choice[is_top]]
+    return values
+
+
+def generate(rows, seed=0, chunk_size=CHUNK_SIZE, profile=None):
+    """Yield DataFrames of synthetic events, ``chunk_size`` rows at a time."""
+    profiled_rows, columns = profile or load_profile()
+    scale = np.sqrt(rows / profiled_rows)
+    claims = keyword_claims()
+
+    # Value tables of the date and text columns, shared by every chunk
+    vocabularies = {}
+    for name, stats in columns.items():
+        if name == 'date':
+            vocabularies[name] = date_values(stats)
+        elif 'mean_value' not in stats and stats['unique_value_count'] > 0:
+            vocabularies[name] = text_vocabulary(name, stats, profiled_rows, scale, claims)
+
+    for chunk, start in enumerate(range(0, rows, chunk_size)):
+        n = min(chunk_size, rows - start)
+        rng = np.random.default_rng([seed, chunk])
+        data = {}
+        for name, stats in columns.items():
+            if name == 'date':
+                values = rng.choice(vocabularies[name], n)
+            elif name in vocabularies:
+                values = text_column(rng, vocabularies[name], n)
+            else:
+                values = numeric_column(rng, stats, n)
+
+            # Missing values at the profiled rate
+            values = pd.Series(values)
+            values[rng.random(n) < stats['missing_percentage'] / 100] = np.nan
+            data[name] = values
+        yield pd.DataFrame(data)
+
+
+def write_dataset(path, rows, seed=0):
+    """Write a synthetic dataset of ``rows`` events as a CCC CSV."""
+    for i, chunk in enumerate(generate(rows, seed)):
+        chunk.to_csv(path, mode='w' if i == 0 else 'a', header=i == 0, index=False,
+                     encoding='latin1', errors='replace', quoting=csv.QUOTE_MINIMAL)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Write a synthetic CCC-shaped dataset from the profile of the real one.")
+    parser.add_argument('rows', type=int, help="number of events")
+    parser.add_argument('-o', '--output', default='ccc-synthetic.csv', help="CSV file to write")
+    parser.add_argument('--seed', type=int, default=0, help="random seed")
+    args = parser.parse_args()
+
+    write_dataset(args.output, args.rows, args.seed)
+    print(f"Saved {args.rows} synthetic events to {args.output}")
+
+if __name__ == "__main__":
+    main()
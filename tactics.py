@@ -0,0 +1,76 @@
+import re
+import numpy as np
+import pandas as pd
+
+# Tactic classification shared by process_data.py and extract_tactics_new.py.
+#
+# Every event gets a uint8 bitmask with one bit per tactic, in the order of
+# TACTICS below, so counts for any grouping (state, day, ...) only need a
+# bitwise test of the stored mask rather than another pass over the text.
+
+# Tactics in bit order. Keyword tactics match when any keyword occurs in the
+# lowercased column; flag tactics are set when the numeric column is positive.
+TACTICS = [
+    {'name': 'demonstration', 'label': 'Demonstration', 'column': 'event_type',
+     'keywords': ['demonstration', 'rally', 'protest']},
+    {'name': 'march', 'label': 'March', 'column': 'event_type', 'keywords': ['march']},
+    {'name': 'counter_protest', 'label': 'Counter-Protest', 'column': 'event_type', 'keywords': ['counter']},
+    {'name': 'civil_disobedience', 'label': 'Civil Disobedience', 'column': 'event_type',
+     'keywords': ['civil disobedience', 'disobedience']},
+    {'name': 'arrests', 'label': 'Arrests', 'column': 'arrests_any'},
+    {'name': 'vigil', 'label': 'Vigil', 'column': 'participant_measures', 'keywords': ['vigil']},
+]
+
+BITS = {tactic['name']: 1 << i for i, tactic in enumerate(TACTICS)}
+
+# Tactics shown in the dashboard's tactics chart, in display order
+DASHBOARD_TACTICS = ['march', 'counter_protest', 'civil_disobedience', 'arrests', 'vigil']
+
+# Columns needed to classify an event
+COLUMNS = sorted({tactic['column'] for tactic in TACTICS})
+
+
+def tactic_bitmask(df):
+    """Return a uint8 Series with the bit of every tactic found in each event."""
+    mask = np.zeros(len(df), dtype='uint8')
+
+    for column in dict.fromkeys(tactic['column'] for tactic in TACTICS if 'keywords' in tactic):
+        # Text columns repeat a small set of values: lowercase and match each
+        # distinct value once, then map the hits back to the rows
+        codes, uniques = pd.factorize(df[column].astype(object).fillna(''))
+        lowered = pd.Series(uniques, dtype=object).astype(str).str.lower()
+        for tactic in TACTICS:
+            if tactic['column'] == column and 'keywords' in tactic:
+                pattern = re.compile('|'.join(re.escape(keyword) for keyword in tactic['keywords']))
+                hits = lowered.str.contains(pattern).to_numpy(dtype=bool)
+                mask[hits[codes]] |= BITS[tactic['name']]
+
+    for tactic in TACTICS:
+        if 'keywords' not in tactic:
+            flags = pd.to_numeric(df[tactic['column']], errors='coerce').fillna(0).to_numpy() > 0
+            mask[flags] |= BITS[tactic['name']]
+
+    return pd.Series(mask, index=df.index, name='tactics')
+
+
+def has_tactic(mask, name):
+    """Boolean Series of the events with the named tactic."""
+    return (mask & BITS[name]) != 0
+
+
+def tactic_counts(mask):
+    """Number of events with each tactic, keyed by tactic name."""
+    bits = np.unpackbits(mask.to_numpy(dtype='uint8')[:, None], axis=1, bitorder='little')
+    totals = bits.sum(axis=0)
+    return {tactic['name']: int(totals[i]) for i, tactic in enumerate(TACTICS)}
+
+
+def tactics_analysis(mask):
+    """Labels, percentages and counts of the dashboard tactics."""
+    counts = tactic_counts(mask)
+    labels = {tactic['name']: tactic['label'] for tactic in TACTICS}
+    return {
+        'labels': [labels[name] for name in DASHBOARD_TACTICS],
+        'percentages': [(counts[name] / len(mask)) * 100 for name in DASHBOARD_TACTICS],
+        'counts': [counts[name] for name in DASHBOARD_TACTICS]
+    }
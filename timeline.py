@@ -0,0 +1,120 @@
+import json
+import numpy as np
+import pandas as pd
+from pathlib import Path
+
+# Timeline series of the dashboard's events chart.
+#
+# Events and participants per day, week and month, plus overview series: the
+# daily ones downsampled with Largest-Triangle-Three-Buckets (LTTB) to point
+# counts that fit common chart widths. LTTB keeps the points that shape the
+# line, so single-day peaks survive downsampling, where weekly or monthly
+# totals would smooth them away. js/timeline.js does the same for the
+# crossfilter mode's series.
+#
+# Each series is written as
+#   {"resolution", "counts": {"dates", "values"}, "participants": {"dates", "values"}}
+# with days and weeks labelled 'YYYY-MM-DD' (weeks by their Monday) and
+# months 'YYYY-MM'. Counts and participants have their own dates since an
+# overview keeps different points of each.
+
+# pandas resampling rule and label format of each resolution
+RESOLUTIONS = {
+    'day': ('D', '%Y-%m-%d'),
+    'week': ('W-MON', '%Y-%m-%d'),
+    'month': ('MS', '%Y-%m'),
+}
+
+# Directory of the series files
+TIMELINE_DIR = Path('data/timeline')
+
+# Points of the overview series; the dashboard picks one by chart width
+OVERVIEW_POINTS = [150, 300, 600]
+
+# Names of the series files
+SERIES_NAMES = list(RESOLUTIONS) + [f'overview-{points}' for points in OVERVIEW_POINTS]
+
+
+def daily_totals(dates, sizes, fill=11):
+    """Events and participants of every day from the first to the last date.
+
+    ``dates`` are the event dates and ``sizes`` their size estimates;
+    missing sizes count as ``fill`` participants.
+    """
+    frame = pd.DataFrame({'events': 1, 'participants': sizes.fillna(fill).to_numpy()},
+                         index=pd.DatetimeIndex(dates))
+    frame = frame[frame.index.notna()]
+    return frame.resample('D').sum()
+
+
+def resample(daily, resolution):
+    # Totals per period; weeks start on Monday and are labelled by it
+    rule, _ = RESOLUTIONS[resolution]
+    return daily.resample(rule, label='left', closed='left').sum()
+
+
+def lttb(x, y, threshold):
+    """Indices of the points of (x, y) kept by LTTB downsampling to ``threshold`` points."""
+    n = len(x)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    # The first and last points are kept; the rest are split into
+    # threshold - 2 buckets, each contributing the point that forms the
+    # largest triangle with the previous pick and the next bucket's average
+    x = np.asarray(x, dtype='float64')
+    y = np.asarray(y, dtype='float64')
+    buckets = threshold - 2
+    picked = np.empty(threshold, dtype='int64')
+    picked[0], picked[-1] = 0, n - 1
+    a = 0
+    for i in range(buckets):
+        start = i * (n - 2) // buckets + 1
+        end = (i + 1) * (n - 2) // buckets + 1
+        next_end = min((i + 2) * (n - 2) // buckets + 1, n)
+        avg_x, avg_y = x[end:next_end].mean(), y[end:next_end].mean()
+        area = np.abs((x[a] - avg_x) * (y[start:end] - y[a]) - (x[a] - x[start:end]) * (avg_y - y[a]))
+        a = start + int(np.argmax(area))
+        picked[i + 1] = a
+    return picked
+
+
+def series_json(resolution, dates, counts, participants):
+    # One series in the dashboard's form
+    return {
+        'resolution': resolution,
+        'counts': {'dates': list(dates), 'values': [int(value) for value in counts]},
+        'participants': {'dates': list(dates), 'values': [int(round(value)) for value in participants]},
+    }
+
+
+def timeline_series(daily):
+    """Return the series of every resolution and overview size, by file name."""
+    series = {}
+    for resolution, (_, label) in RESOLUTIONS.items():
+        totals = daily if resolution == 'day' else resample(daily, resolution)
+        series[resolution] = series_json(resolution, totals.index.strftime(label),
+                                         totals['events'], totals['participants'])
+
+    days = daily.index.strftime('%Y-%m-%d').to_numpy()
+    x = np.arange(len(daily))
+    for points in OVERVIEW_POINTS:
+        overview = {'resolution': 'overview'}
+        for key, column in (('counts', 'events'), ('participants', 'participants')):
+            values = daily[column].to_numpy()
+            kept = lttb(x, values, points)
+            overview[key] = {
+                'dates': days[kept].tolist(),
+                'values': [int(round(value)) for value in values[kept]],
+            }
+        series[f'overview-{points}'] = overview
+    return series
+
+
+def write_timeline(daily, timeline_dir=TIMELINE_DIR):
+    """Write the series of ``daily`` totals to <timeline_dir>/<name>.json."""
+    timeline_dir = Path(timeline_dir)
+    timeline_dir.mkdir(parents=True, exist_ok=True)
+    for name, series in timeline_series(daily).items():
+        with open(timeline_dir / f'{name}.json', 'w') as f:
+            json.dump(series, f, separators=(',', ':'))